@@ -0,0 +1,303 @@
+"""
+Módulo: benchmark.py
+Benchmarks sin ventana de generación, transformación, clipping, normales y
+sombreado sobre toroides de densidad creciente (del neumático actual de
+64x24 hasta ~1M de triángulos), con comparación contra una línea base
+
+Uso:
+    python benchmark.py --guardar-base benchmarks/base.json
+    python benchmark.py --base benchmarks/base.json
+    python benchmark.py --tamanos 64x24 256x96 --etapas recorte normales --repeticiones 9
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+from materials import MATERIAL_GOMA
+from geometry import (generar_toroide_array, calcular_normales_array, calcular_normales,
+                      calcular_centroides)
+from clipping import PlanoClipping, recortar_malla_con_plano, recortar_malla_con_plano_lote
+from lighting import (phong_shading, spotlight_shading, phong_shading_lote, spotlight_shading_lote,
+                      luces_escena, sombrear_luces)
+from transforms import aplicar_transformacion, matriz_rotacion_x
+
+
+# Segmentos (mayor x menor) del toroide; 64x24 es el neumático de componentes.py
+TAMANOS = ((64, 24), (128, 48), (256, 96), (512, 192), (1024, 512))
+RADIO_MAYOR = 2.8
+RADIO_MENOR = 0.5
+
+# Planos z = d: d=0 corta a la mitad, ±2 cortan cerca de los bordes
+DESPLAZAMIENTOS_CORTE = (-2.0, 0.0, 2.0)
+
+# Las versiones por cara (Python puro) solo se miden hasta este tamaño
+MAXIMO_REFERENCIA = 12288
+
+# Cada muestra repite las etapas muy cortas hasta durar al menos esto
+DURACION_MUESTRA = 0.002  # Segundos
+
+TOLERANCIA = 0.15  # Fracción de aumento sobre la línea base que cuenta como regresión
+
+# Aumento mínimo de memoria pico (MB) para contar como regresión: en etapas
+# que asignan pocos KB la razón varía con el ruido del asignador
+AUMENTO_MEMORIA_MINIMO = 0.1
+
+LUZ_POS = np.array([10.0, 10.0, 10.0])
+LUZ_DIR = -LUZ_POS / np.linalg.norm(LUZ_POS)
+CAMARA_POS = np.array([0.0, 0.0, 20.0])
+LUZ_COLOR = np.array([1.0, 1.0, 1.0])
+LUZ_AMBIENTE = np.array([0.4, 0.4, 0.4])
+
+
+# ========== ETAPAS ==========
+
+def _etapas(segmentos_mayor, segmentos_menor, referencia):
+    """
+    Prepara las entradas de cada etapa para un tamaño de toroide
+    
+    Args:
+        segmentos_mayor: Subdivisiones alrededor del círculo mayor
+        segmentos_menor: Subdivisiones alrededor del tubo
+        referencia: Si se incluyen las versiones por cara
+    
+    Returns:
+        Lista de (nombre, función sin argumentos)
+    """
+    vertices, caras = generar_toroide_array(RADIO_MAYOR, RADIO_MENOR, segmentos_mayor, segmentos_menor)
+    normales = calcular_normales_array(vertices, caras)
+    centroides = calcular_centroides(vertices, caras)
+    matriz = matriz_rotacion_x(90)
+    luces, luz_ambiente = luces_escena('garage', CAMARA_POS, LUZ_COLOR)
+    
+    etapas = [
+        ('generacion', lambda: generar_toroide_array(RADIO_MAYOR, RADIO_MENOR,
+                                                     segmentos_mayor, segmentos_menor)),
+        ('transformacion', lambda: aplicar_transformacion(vertices, matriz)),
+    ]
+    for d in DESPLAZAMIENTOS_CORTE:
+        plano = PlanoClipping(0, 0, 1, -d)
+        etapas.append((f"recorte_z{d:+g}",
+                       lambda plano=plano: recortar_malla_con_plano_lote(vertices, caras, plano)))
+    etapas += [
+        ('normales', lambda: calcular_normales_array(vertices, caras)),
+        ('phong', lambda: phong_shading_lote(centroides, normales, MATERIAL_GOMA, LUZ_POS,
+                                             CAMARA_POS, LUZ_COLOR, LUZ_AMBIENTE)),
+        ('spotlight', lambda: spotlight_shading_lote(centroides, normales, MATERIAL_GOMA, LUZ_POS,
+                                                     LUZ_DIR, CAMARA_POS, LUZ_COLOR, LUZ_AMBIENTE)),
+        ('luces_garage', lambda: sombrear_luces(centroides, normales, MATERIAL_GOMA, luces,
+                                                CAMARA_POS, luz_ambiente)),
+    ]
+    
+    if referencia:
+        lista_vertices, lista_caras = vertices.tolist(), caras.tolist()
+        plano_medio = PlanoClipping(0, 0, 1, 0)
+        etapas += [
+            ('ref_recorte_z+0', lambda: recortar_malla_con_plano(lista_vertices, lista_caras, plano_medio)),
+            ('ref_normales', lambda: calcular_normales(lista_vertices, lista_caras)),
+            ('ref_phong', lambda: [phong_shading(p, n, MATERIAL_GOMA, LUZ_POS, CAMARA_POS,
+                                                 LUZ_COLOR, LUZ_AMBIENTE)
+                                   for p, n in zip(centroides, normales)]),
+            ('ref_spotlight', lambda: [spotlight_shading(p, n, MATERIAL_GOMA, LUZ_POS, LUZ_DIR,
+                                                         CAMARA_POS, LUZ_COLOR, LUZ_AMBIENTE)
+                                       for p, n in zip(centroides, normales)]),
+        ]
+    
+    return etapas
+
+
+# ========== MEDICIÓN ==========
+
+def medir(funcion, repeticiones):
+    """
+    Mide una función sin argumentos
+    
+    Los tiempos se toman sin tracemalloc (que hace más lenta cada
+    asignación); la memoria pico se mide en una corrida aparte. Las
+    funciones que tardan menos de DURACION_MUESTRA se repiten dentro de
+    cada muestra y se promedian, como hace timeit.
+    
+    Args:
+        funcion: Función a medir
+        repeticiones: Muestras cronometradas (después de una corrida de calentamiento)
+    
+    Returns:
+        Diccionario con la mediana y el mínimo en ms y la memoria pico en MB
+    """
+    inicio = time.perf_counter()
+    funcion()
+    llamadas = max(1, int(DURACION_MUESTRA / max(time.perf_counter() - inicio, 1e-9)))
+    
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        for _ in range(llamadas):
+            funcion()
+        tiempos.append((time.perf_counter() - inicio) / llamadas)
+    
+    tracemalloc.start()
+    try:
+        base, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        funcion()
+        _, pico = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    
+    return {
+        'mediana_ms': float(np.median(tiempos)) * 1000.0,
+        'minimo_ms': min(tiempos) * 1000.0,
+        'pico_mb': (pico - base) / 1e6,
+    }
+
+
+def ejecutar(tamanos, etapas=None, repeticiones=5, maximo_referencia=MAXIMO_REFERENCIA):
+    """
+    Corre el barrido completo
+    
+    Args:
+        tamanos: Secuencia de (segmentos_mayor, segmentos_menor)
+        etapas: Nombres (o prefijos) de etapas a medir; None mide todas
+        repeticiones: Corridas cronometradas por etapa
+        maximo_referencia: Triángulos hasta los que se miden las versiones por cara
+    
+    Returns:
+        Lista de resultados {'tamano', 'triangulos', 'etapa', 'mediana_ms', ...}
+    """
+    resultados = []
+    for segmentos_mayor, segmentos_menor in tamanos:
+        triangulos = 2 * segmentos_mayor * segmentos_menor
+        tamano = f"{segmentos_mayor}x{segmentos_menor}"
+        lista = _etapas(segmentos_mayor, segmentos_menor, triangulos <= maximo_referencia)
+        
+        for nombre, funcion in lista:
+            if etapas and not any(nombre.startswith(e) or nombre.startswith('ref_' + e) for e in etapas):
+                continue
+            medida = medir(funcion, repeticiones)
+            medida.update(tamano=tamano, triangulos=triangulos, etapa=nombre,
+                          triangulos_por_s=triangulos / (medida['mediana_ms'] / 1000.0))
+            resultados.append(medida)
+            print(f"   {tamano:>9} {nombre:<16}{medida['mediana_ms']:>10.2f} ms"
+                  f"{medida['triangulos_por_s'] / 1e6:>10.2f} Mtri/s{medida['pico_mb']:>9.1f} MB")
+    return resultados
+
+
+# ========== LÍNEA BASE ==========
+
+def entorno():
+    """Versiones de Python, NumPy y plataforma, para saber si dos corridas son comparables"""
+    return {
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'plataforma': platform.platform(),
+        'procesador': platform.processor() or platform.machine(),
+    }
+
+
+def comparar(resultados, base, tolerancia=TOLERANCIA):
+    """
+    Compara un barrido contra una línea base guardada
+    
+    Una etapa es regresión si su tiempo mínimo o su memoria pico crecen
+    más de `tolerancia` respecto de la base para el mismo tamaño (el
+    mínimo es menos sensible al ruido que la mediana en etapas cortas).
+    La memoria además debe crecer al menos AUMENTO_MEMORIA_MINIMO MB.
+    
+    Args:
+        resultados: Lista retornada por ejecutar()
+        base: Diccionario leído de un JSON guardado con --guardar-base
+        tolerancia: Aumento relativo permitido
+    
+    Returns:
+        Lista de (tamano, etapa, razón de tiempo, razón de memoria, es_regresion)
+    """
+    anteriores = {(r['tamano'], r['etapa']): r for r in base['resultados']}
+    comparaciones = []
+    for r in resultados:
+        anterior = anteriores.get((r['tamano'], r['etapa']))
+        if anterior is None:
+            continue
+        razon_tiempo = r['minimo_ms'] / max(anterior['minimo_ms'], 1e-9)
+        razon_memoria = (r['pico_mb'] + 1e-3) / (anterior['pico_mb'] + 1e-3)
+        regresion_memoria = (razon_memoria > 1.0 + tolerancia
+                             and r['pico_mb'] - anterior['pico_mb'] > AUMENTO_MEMORIA_MINIMO)
+        regresion = razon_tiempo > 1.0 + tolerancia or regresion_memoria
+        comparaciones.append((r['tamano'], r['etapa'], razon_tiempo, razon_memoria, regresion))
+    return comparaciones
+
+
+# ========== LÍNEA DE COMANDOS ==========
+
+def _tamano(texto):
+    try:
+        mayor, menor = (int(n) for n in texto.lower().split('x'))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"tamaño inválido '{texto}' (se espera MAYORxMENOR, p. ej. 64x24)")
+    return mayor, menor
+
+
+def _argumentos():
+    parser = argparse.ArgumentParser(description="Benchmarks de geometría, clipping, normales y sombreado")
+    parser.add_argument('--tamanos', nargs='+', type=_tamano, default=list(TAMANOS),
+                        help="Segmentos del toroide como MAYORxMENOR (por defecto 64x24 ... 1024x512)")
+    parser.add_argument('--etapas', nargs='+',
+                        help="Etapas a medir (generacion, transformacion, recorte, normales, "
+                             "phong, spotlight, luces_garage); por defecto todas")
+    parser.add_argument('--repeticiones', type=int, default=5)
+    parser.add_argument('--referencia-maxima', type=int, default=MAXIMO_REFERENCIA,
+                        help="Triángulos hasta los que se miden las versiones por cara (0 las omite)")
+    parser.add_argument('--json', help="Guardar los resultados en este archivo")
+    parser.add_argument('--guardar-base', help="Guardar los resultados como línea base")
+    parser.add_argument('--base', help="Línea base contra la que se comparan los resultados")
+    parser.add_argument('--tolerancia', type=float, default=TOLERANCIA,
+                        help="Aumento relativo que cuenta como regresión (0.15 = 15%%)")
+    return parser.parse_args()
+
+
+def _guardar(ruta, datos):
+    carpeta = os.path.dirname(ruta)
+    if carpeta:
+        os.makedirs(carpeta, exist_ok=True)
+    with open(ruta, 'w', encoding='utf-8') as archivo:
+        json.dump(datos, archivo, indent=1)
+
+
+def main():
+    args = _argumentos()
+    
+    print(f"⏱️ Benchmark: {len(args.tamanos)} tamaños, {args.repeticiones} repeticiones por etapa")
+    print(f"   {'tamaño':>9} {'etapa':<16}{'mediana':>13}{'rendimiento':>16}{'pico':>12}")
+    resultados = ejecutar(args.tamanos, args.etapas, args.repeticiones, args.referencia_maxima)
+    datos = {'entorno': entorno(), 'repeticiones': args.repeticiones, 'resultados': resultados}
+    
+    for ruta in (args.json, args.guardar_base):
+        if ruta:
+            _guardar(ruta, datos)
+            print(f"💾 Resultados guardados en {ruta}")
+    
+    if not args.base:
+        return 0
+    
+    with open(args.base, encoding='utf-8') as archivo:
+        base = json.load(archivo)
+    if base.get('entorno') != datos['entorno']:
+        print("⚠️ La línea base se tomó en otro entorno; las diferencias pueden no ser regresiones")
+    
+    comparaciones = comparar(resultados, base, args.tolerancia)
+    regresiones = [c for c in comparaciones if c[4]]
+    print(f"\n📊 Comparación con {args.base} (tolerancia {args.tolerancia:.0%})")
+    for tamano, etapa, razon_tiempo, razon_memoria, regresion in comparaciones:
+        marca = "❌ REGRESIÓN" if regresion else ("✅ mejora" if razon_tiempo < 1.0 - args.tolerancia else "")
+        print(f"   {tamano:>9} {etapa:<16} tiempo x{razon_tiempo:5.2f}  memoria x{razon_memoria:5.2f}  {marca}")
+    print(f"\n{len(regresiones)} regresiones en {len(comparaciones)} etapas comparadas")
+    return 1 if regresiones else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
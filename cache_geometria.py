@@ -0,0 +1,146 @@
+"""
+Módulo: cache_geometria.py
+Cache en disco de la geometría generada (vértices, caras y normales)
+Las mallas se guardan como .npy y se cargan con np.load(mmap_mode='r')
+"""
+
+import hashlib
+import inspect
+import json
+import os
+
+import numpy as np
+
+from geometry import calcular_normales_array
+from transforms import aplicar_transformacion
+
+
+# Incrementar si cambia el formato de los archivos de cache
+VERSION_CACHE = 1
+
+DIRECTORIO_CACHE = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache_geometria')
+
+
+def _huella_fuente(generador):
+    """
+    Hash del código fuente del módulo donde vive el generador, para que
+    cualquier cambio en geometry.py invalide las mallas guardadas
+    """
+    try:
+        with open(inspect.getsourcefile(generador), 'rb') as archivo:
+            return hashlib.sha1(archivo.read()).hexdigest()
+    except (OSError, TypeError):
+        return ''
+
+
+def clave_geometria(generador, params, matriz=None):
+    """
+    Construye el nombre de archivo de una malla en cache
+    
+    Args:
+        generador: Función generadora (p. ej. generar_toroide_array)
+        params: Diccionario de parámetros del generador
+        matriz: Matriz 4x4 aplicada a los vértices (opcional)
+    
+    Returns:
+        String "<generador>_<hash>" único para esa combinación
+    """
+    descripcion = {
+        'version': VERSION_CACHE,
+        'generador': generador.__name__,
+        'params': {k: params[k] for k in sorted(params)},
+        'matriz': None if matriz is None else np.round(np.asarray(matriz, dtype=np.float64), 12).tolist(),
+        'fuente': _huella_fuente(generador),
+    }
+    texto = json.dumps(descripcion, sort_keys=True, default=str)
+    return f"{generador.__name__}_{hashlib.sha1(texto.encode('utf-8')).hexdigest()[:16]}"
+
+
+class CacheGeometria:
+    """
+    Cache en disco de mallas generadas y pre-transformadas
+    
+    Cada malla se guarda como tres archivos .npy (vértices, caras y
+    normales) con una clave formada por el nombre del generador y un hash
+    de sus parámetros. Las cargas usan memoria mapeada, así que un
+    arranque en caliente no vuelve a generar ni a copiar la geometría.
+    """
+    
+    def __init__(self, directorio=None, habilitada=True):
+        """
+        Args:
+            directorio: Carpeta de la cache (por defecto .cache_geometria/)
+            habilitada: Si es False siempre se genera y no se escribe nada
+        """
+        self.directorio = directorio or DIRECTORIO_CACHE
+        self.habilitada = habilitada
+        self.cargadas = 0
+        self.generadas = 0
+    
+    def _rutas(self, clave):
+        return [os.path.join(self.directorio, f"{clave}.{parte}.npy")
+                for parte in ('vertices', 'caras', 'normales')]
+    
+    def _cargar(self, clave):
+        rutas = self._rutas(clave)
+        if not all(os.path.exists(ruta) for ruta in rutas):
+            return None
+        try:
+            return tuple(np.load(ruta, mmap_mode='r') for ruta in rutas)
+        except (OSError, ValueError):
+            return None
+    
+    def _guardar(self, clave, arrays):
+        os.makedirs(self.directorio, exist_ok=True)
+        for ruta, array in zip(self._rutas(clave), arrays):
+            # Escritura atómica: un arranque interrumpido no deja archivos a medias
+            temporal = f"{ruta}.{os.getpid()}.tmp"
+            with open(temporal, 'wb') as archivo:
+                np.save(archivo, array)
+            os.replace(temporal, ruta)
+    
+    def obtener(self, generador, params, matriz=None):
+        """
+        Retorna una malla desde la cache, generándola y guardándola si falta
+        
+        Args:
+            generador: Función generadora que retorna (vertices, caras)
+            params: Diccionario de parámetros del generador
+            matriz: Matriz 4x4 a aplicar a los vértices tras generarlos (opcional)
+        
+        Returns:
+            Tupla (vertices float32 (N,3), caras int32 (M,3), normales float32 (M,3));
+            de solo lectura si vienen de disco
+        """
+        clave = clave_geometria(generador, params, matriz)
+        
+        if self.habilitada:
+            arrays = self._cargar(clave)
+            if arrays is not None:
+                self.cargadas += 1
+                return arrays
+        
+        vertices, caras = generador(**params)
+        vertices = np.asarray(vertices, dtype=np.float32)
+        if matriz is not None:
+            vertices = aplicar_transformacion(vertices, matriz)
+        caras = np.ascontiguousarray(caras, dtype=np.int32)
+        normales = calcular_normales_array(vertices, caras)
+        arrays = (vertices, caras, normales)
+        self.generadas += 1
+        
+        if self.habilitada:
+            try:
+                self._guardar(clave, arrays)
+            except OSError as error:
+                print(f"⚠️ No se pudo escribir la cache de geometría: {error}")
+        
+        return arrays
+    
+    def limpiar(self):
+        """Borra todos los archivos de la cache"""
+        if not os.path.isdir(self.directorio):
+            return
+        for nombre in os.listdir(self.directorio):
+            if nombre.endswith('.npy'):
+                os.remove(os.path.join(self.directorio, nombre))
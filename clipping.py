@@ -4,8 +4,13 @@ Implementa el algoritmo Sutherland-Hodgman para clipping 3D
 """
 
 import math
+from collections import OrderedDict
+
 import numpy as np
 
+from geometry import calcular_normales_array, Malla
+from perfilador import PERFILADOR
+
 
 class PlanoClipping:
     """Representa un plano de clipping definido por Ax + By + Cz + D = 0"""
@@ -31,6 +36,21 @@ class PlanoClipping:
     def esta_dentro(self, punto):
         """Determina si un punto está en el lado positivo del plano"""
         return self.distancia(punto) >= 0
+    
+    def eje_alineado(self):
+        """
+        Detecta si el plano es perpendicular a un eje coordenado
+        
+        Returns:
+            Tupla (eje, signo) con eje 0/1/2 y signo ±1 de la normal,
+            o None si el plano es oblicuo
+        """
+        componentes = (self.A, self.B, self.C)
+        no_nulos = [i for i, c in enumerate(componentes) if c != 0]
+        if len(no_nulos) != 1:
+            return None
+        eje = no_nulos[0]
+        return eje, (1 if componentes[eje] > 0 else -1)
 
 
 def calcular_interseccion_plano(p1, p2, plano):
@@ -112,6 +132,12 @@ def recortar_malla_con_plano(vertices, caras, plano):
     """
     Recorta una malla completa usando un plano de clipping
     
+    Aplica Sutherland-Hodgman sobre los índices de cada cara. Los vértices
+    originales se identifican por su índice de origen y las intersecciones
+    por su arista (i, j) ordenada, de modo que dos caras que comparten una
+    arista reutilizan exactamente el mismo vértice nuevo y la malla
+    resultante queda cerrada a lo largo del corte.
+    
     Args:
         vertices: Lista de vértices de la malla
         caras: Lista de caras (triángulos)
@@ -124,24 +150,46 @@ def recortar_malla_con_plano(vertices, caras, plano):
     vertices_usados = []
     mapa_vertices = {}
     
+    def indice_de(clave):
+        # clave: ('v', i) vértice original, ('e', i, j) intersección de la arista i < j
+        if clave not in mapa_vertices:
+            if clave[0] == 'v':
+                punto = vertices[clave[1]]
+            else:
+                # Siempre en el mismo sentido para que la arista dé un único punto
+                punto = calcular_interseccion_plano(vertices[clave[1]], vertices[clave[2]], plano)
+            if punto is None:
+                mapa_vertices[clave] = None
+            else:
+                mapa_vertices[clave] = len(vertices_usados)
+                vertices_usados.append(punto)
+        return mapa_vertices[clave]
+    
     for cara in caras:
-        # Obtener vértices de la cara
-        vertices_cara = [vertices[idx] for idx in cara]
-        
-        # Recortar polígono
-        vertices_recortados = sutherland_hodgman_clip_poligono(vertices_cara, plano)
+        claves_recortadas = []
         
-        if len(vertices_recortados) >= 3:
-            indices_nuevos = []
+        # Sutherland-Hodgman sobre los índices de la cara
+        for k in range(len(cara)):
+            i_actual = cara[k]
+            i_siguiente = cara[(k + 1) % len(cara)]
+            arista = ('e', min(i_actual, i_siguiente), max(i_actual, i_siguiente))
             
-            # Agregar o reusar vértices
-            for v in vertices_recortados:
-                v_tuple = tuple(v)
-                if v_tuple not in mapa_vertices:
-                    mapa_vertices[v_tuple] = len(vertices_usados)
-                    vertices_usados.append(v)
-                indices_nuevos.append(mapa_vertices[v_tuple])
+            dentro_actual = plano.esta_dentro(vertices[i_actual])
+            dentro_siguiente = plano.esta_dentro(vertices[i_siguiente])
             
+            if dentro_actual and dentro_siguiente:
+                claves_recortadas.append(('v', i_siguiente))
+            elif dentro_actual and not dentro_siguiente:
+                claves_recortadas.append(arista)
+            elif not dentro_actual and dentro_siguiente:
+                claves_recortadas.append(arista)
+                claves_recortadas.append(('v', i_siguiente))
+        
+        # Agregar o reusar vértices (las intersecciones inválidas se descartan)
+        indices_nuevos = [indice_de(clave) for clave in claves_recortadas]
+        indices_nuevos = [idx for idx in indices_nuevos if idx is not None]
+        
+        if len(indices_nuevos) >= 3:
             # Triangular el polígono recortado (fan triangulation)
             for i in range(1, len(indices_nuevos) - 1):
                 nuevas_caras.append([
@@ -150,4 +198,583 @@ def recortar_malla_con_plano(vertices, caras, plano):
                     indices_nuevos[i+1]
                 ])
     
-    return vertices_usados, nuevas_caras
\ No newline at end of file
+    return vertices_usados, nuevas_caras
+
+
+# ========== CLIPPING POR LOTES ==========
+
+def _tabla_sutherland_hodgman():
+    """
+    Ejecuta Sutherland-Hodgman de forma simbólica sobre un triángulo para
+    cada uno de los 8 patrones dentro/fuera de sus vértices
+    
+    Returns:
+        Diccionario patron -> polígono recortado (lista de 3 o 4 esquinas, en
+        el orden de Sutherland-Hodgman); cada esquina es ('v', k) (vértice k
+        de la cara) o ('e', k, sig) (intersección de la arista dirigida
+        k -> sig). El patrón usa el bit k para el vértice k.
+    """
+    tabla = {}
+    for patron in range(8):
+        dentro = [(patron >> k) & 1 for k in range(3)]
+        poligono = []
+        for k in range(3):
+            sig = (k + 1) % 3
+            if dentro[k] and dentro[sig]:
+                poligono.append(('v', sig))
+            elif dentro[k]:
+                poligono.append(('e', k, sig))
+            elif dentro[sig]:
+                poligono.append(('e', k, sig))
+                poligono.append(('v', sig))
+        tabla[patron] = poligono
+    return tabla
+
+
+_TABLA_SH = _tabla_sutherland_hodgman()
+_PATRON_TODO_DENTRO = 7
+
+
+def _triangular_abanico(poligonos):
+    """
+    Fan triangulation desde la primera esquina, igual que la versión por cara
+    
+    Args:
+        poligonos: Array (G,P) de índices de esquinas
+    
+    Returns:
+        Array (G*(P-2),3) con los triángulos de cada polígono, en orden
+    """
+    num_esquinas = poligonos.shape[1]
+    if num_esquinas < 3:
+        return np.empty((0, 3), dtype=poligonos.dtype)
+    triangulos = [np.stack([poligonos[:, 0], poligonos[:, i], poligonos[:, i + 1]], axis=1)
+                  for i in range(1, num_esquinas - 1)]
+    return np.stack(triangulos, axis=1).reshape(-1, 3)
+
+
+def distancias_plano(vertices, plano):
+    """
+    Distancia con signo de todos los vértices al plano
+    
+    Args:
+        vertices: Array (N,3) de vértices
+        plano: PlanoClipping
+    
+    Returns:
+        Array float64 (N,)
+    """
+    normal = np.array([plano.A, plano.B, plano.C])
+    return np.asarray(vertices, dtype=np.float64) @ normal + plano.D
+
+
+def recortar_malla_con_plano_lote(vertices, caras, plano, indice=None):
+    """
+    Versión vectorizada de recortar_malla_con_plano
+    
+    1. Calcula la distancia con signo de todos los vértices a la vez
+    2. Clasifica cada triángulo según qué vértices quedan dentro
+    3. Los triángulos completamente dentro pasan sin tocarse
+    4. Las intersecciones de las aristas que cruzan el plano se calculan
+       en un solo paso, agrupando los triángulos por patrón
+    
+    Si se pasa un IndiceIntervalos y el plano es perpendicular a un eje,
+    la clasificación del paso 2 se hace con búsquedas binarias y solo se
+    calculan distancias para los triángulos que cruzan el plano.
+    
+    Produce los mismos triángulos (con el mismo sentido de giro y la misma
+    triangulación) que la versión por cara, también cuando el plano pasa
+    por vértices: una arista cuya intersección no es válida (denominador
+    casi nulo o t fuera de [0, 1]) se quita del polígono antes de
+    triangularlo, como en calcular_interseccion_plano.
+    
+    Args:
+        vertices: Array (N,3) o lista de vértices
+        caras: Array (M,3) o lista de caras (triángulos)
+        plano: PlanoClipping
+        indice: IndiceIntervalos de la malla (opcional)
+    
+    Returns:
+        Tupla (vertices float32 (N',3), caras int32 (M',3))
+    """
+    vertices = np.asarray(vertices, dtype=np.float32).reshape(-1, 3)
+    caras = np.asarray(caras).reshape(-1, 3)
+    num_vertices = len(vertices)
+    normal = np.array([plano.A, plano.B, plano.C])
+    
+    alineado = plano.eje_alineado() if indice is not None else None
+    if alineado is not None:
+        eje, signo = alineado
+        caras_dentro, caras_cruzan = indice.separar_caras(eje, signo, -plano.D)
+    else:
+        dentro = distancias_plano(vertices, plano)[caras] >= 0
+        todo_dentro = dentro.all(axis=1)
+        caras_dentro = caras[todo_dentro]
+        caras_cruzan = caras[~todo_dentro & dentro.any(axis=1)]
+    
+    # Distancias solo para los vértices de los triángulos que cruzan
+    triangulos_cruzan = vertices[caras_cruzan].astype(np.float64)
+    d_cruzan = triangulos_cruzan @ normal + plano.D
+    dentro = d_cruzan >= 0
+    patrones = dentro[:, 0] * 1 + dentro[:, 1] * 2 + dentro[:, 2] * 4
+    
+    # Las esquinas de los polígonos recortados se numeran así: [0, N)
+    # vértices originales (por índice de origen) y N + k la intersección de
+    # la k-ésima arista única (i, j), i < j, que cruza el plano
+    bloques_caras = [caras_cruzan[patrones == _PATRON_TODO_DENTRO].astype(np.int64)]
+    poligonos = []
+    bloques_aristas = []
+    
+    for patron in range(1, 7):
+        grupo = caras_cruzan[patrones == patron].astype(np.int64)
+        if len(grupo) == 0:
+            continue
+        
+        esquinas = []
+        for token in _TABLA_SH[patron]:
+            if token[0] == 'v':
+                esquinas.append(grupo[:, token[1]])
+            else:
+                a, b = grupo[:, token[1]], grupo[:, token[2]]
+                claves = np.minimum(a, b) * num_vertices + np.maximum(a, b)
+                bloques_aristas.append(claves)
+                # Marcador provisional: -1 - clave de arista
+                esquinas.append(-1 - claves)
+        poligonos.append(np.stack(esquinas, axis=1))
+    
+    # Una sola intersección por arista, calculada siempre de i hacia j (i < j)
+    if bloques_aristas:
+        aristas = np.unique(np.concatenate(bloques_aristas))
+        p1 = vertices[aristas // num_vertices].astype(np.float64)
+        p2 = vertices[aristas % num_vertices].astype(np.float64)
+        direccion = p2 - p1
+        denominador = direccion @ normal
+        valida = np.abs(denominador) >= 1e-10
+        t = np.divide(-(p1 @ normal + plano.D), denominador,
+                      out=np.zeros(len(aristas)), where=valida)
+        valida &= (t >= 0) & (t <= 1)
+        intersecciones = (p1 + t[:, None] * direccion)[valida]
+        # Índice final de cada arista; -1 si su intersección se descarta
+        indice_arista = np.where(valida, num_vertices + np.cumsum(valida) - 1, -1)
+    else:
+        intersecciones = np.zeros((0, 3))
+    
+    for poligono in poligonos:
+        es_arista = poligono < 0
+        poligono[es_arista] = indice_arista[np.searchsorted(aristas, -1 - poligono[es_arista])]
+        
+        invalidos = (poligono < 0).any(axis=1)
+        bloques_caras.append(_triangular_abanico(poligono[~invalidos]))
+        # Pocas caras (el plano pasa justo por un vértice): se quitan las
+        # esquinas descartadas y se triangula lo que queda
+        for fila in poligono[invalidos]:
+            bloques_caras.append(_triangular_abanico(fila[fila >= 0][None, :]))
+    
+    caras_cortadas = np.concatenate(bloques_caras).astype(np.int64)
+    
+    # Compactar: conservar solo los vértices originales usados
+    usados = np.zeros(num_vertices, dtype=bool)
+    usados[caras_dentro.reshape(-1)] = True
+    usados[caras_cortadas[caras_cortadas < num_vertices]] = True
+    nuevo_indice = np.concatenate([np.cumsum(usados) - 1,
+                                   np.count_nonzero(usados) + np.arange(len(intersecciones))])
+    
+    vertices_nuevos = np.concatenate([vertices[usados], intersecciones.astype(np.float32)])
+    caras_nuevas = np.concatenate([nuevo_indice[caras_dentro], nuevo_indice[caras_cortadas]])
+    
+    return (np.ascontiguousarray(vertices_nuevos, dtype=np.float32),
+            np.ascontiguousarray(caras_nuevas, dtype=np.int32))
+
+
+# ========== MALLAS Y VOLÚMENES ENVOLVENTES ==========
+
+def clasificar_volumen(malla, plano):
+    """
+    Prueba trivial de una malla contra un plano usando sus volúmenes envolventes
+    
+    Primero se prueba la esfera y, si no decide, la caja alineada a los
+    ejes (su radio proyectado sobre la normal es |A|·ex + |B|·ey + |C|·ez).
+    
+    Args:
+        malla: Malla
+        plano: PlanoClipping (normalizado)
+    
+    Returns:
+        1 si la malla queda entera del lado positivo, -1 si queda entera del
+        lado negativo y 0 si puede cruzar el plano
+    """
+    normal = np.array([plano.A, plano.B, plano.C])
+    
+    centro, radio = malla.esfera
+    distancia = float(centro @ normal) + plano.D
+    if distancia >= radio:
+        return 1
+    if distancia < -radio:
+        return -1
+    
+    minimo, maximo = malla.limites
+    centro_caja = (minimo.astype(np.float64) + maximo) / 2.0
+    extension = (maximo.astype(np.float64) - minimo) / 2.0
+    distancia = float(centro_caja @ normal) + plano.D
+    radio_proyectado = float(np.abs(normal) @ extension)
+    if distancia >= radio_proyectado:
+        return 1
+    if distancia < -radio_proyectado:
+        return -1
+    return 0
+
+
+def recortar_malla(malla, plano, indice=None):
+    """
+    Recorta una Malla con un plano
+    
+    Si los volúmenes envolventes muestran que la malla queda entera de un
+    lado, se retorna la misma malla o una malla vacía sin revisar sus caras.
+    
+    Args:
+        malla: Malla de origen
+        plano: PlanoClipping
+        indice: IndiceIntervalos de la malla (opcional, ver recortar_malla_con_plano_lote)
+    
+    Returns:
+        La misma Malla, una Malla vacía o una nueva Malla con la parte del
+        lado positivo del plano
+    """
+    clase = clasificar_volumen(malla, plano)
+    if clase > 0:
+        return malla
+    if clase < 0:
+        return Malla(np.empty((0, 3)), np.empty((0, 3)))
+    return Malla(*recortar_malla_con_plano_lote(malla.vertices, malla.caras, plano, indice))
+
+
+def recortar_malla_instanciada(malla, plano):
+    """
+    Recorta una MallaInstanciada clasificando instancias completas
+    
+    Con la esfera envolvente de cada instancia se separan las que quedan
+    enteras dentro (se expanden con sus normales ya rotadas), las que quedan
+    fuera (se descartan) y las que cruzan el plano, que son las únicas que
+    pasan por recortar_malla_con_plano_lote.
+    
+    Args:
+        malla: MallaInstanciada
+        plano: PlanoClipping
+    
+    Returns:
+        Tupla (vertices float32, caras int32, normales float32)
+    """
+    centros, radios = malla.esfera_envolvente()
+    distancias = centros @ np.array([plano.A, plano.B, plano.C]) + plano.D
+    
+    dentro = np.flatnonzero(distancias >= radios)
+    cruzan = np.flatnonzero(np.abs(distancias) < radios)
+    
+    vertices = [malla.expandir_vertices(dentro)]
+    caras = [malla.expandir_caras(len(dentro))]
+    normales = [malla.expandir_normales(dentro)]
+    
+    if len(cruzan) > 0:
+        vertices_cruzan = malla.expandir_vertices(cruzan)
+        vertices_recortados, caras_recortadas = recortar_malla_con_plano_lote(
+            vertices_cruzan, malla.expandir_caras(len(cruzan)), plano)
+        vertices.append(vertices_recortados)
+        caras.append(caras_recortadas + len(vertices[0]))
+        with PERFILADOR.etapa('normales'):
+            normales.append(calcular_normales_array(vertices_recortados, caras_recortadas))
+    
+    return (np.concatenate(vertices).astype(np.float32, copy=False),
+            np.concatenate(caras).astype(np.int32, copy=False),
+            np.concatenate(normales).astype(np.float32, copy=False))
+
+
+def planos_frustum(matriz):
+    """
+    Extrae los 6 planos del frustum de una matriz de proyección·vista
+    (método de Gribb-Hartmann); el interior queda del lado positivo
+    
+    Args:
+        matriz: Matriz 4x4 que lleva puntos del espacio de la malla a clip space
+    
+    Returns:
+        Lista de PlanoClipping (izquierdo, derecho, inferior, superior, cercano, lejano)
+    """
+    m = np.asarray(matriz, dtype=np.float64)
+    filas = [m[3] + m[0], m[3] - m[0],
+             m[3] + m[1], m[3] - m[1],
+             m[3] + m[2], m[3] - m[2]]
+    return [PlanoClipping(*fila) for fila in filas]
+
+
+def malla_visible(malla, planos):
+    """
+    Indica si una malla puede verse dentro del frustum
+    
+    Args:
+        malla: Malla
+        planos: Planos de planos_frustum
+    
+    Returns:
+        False solo si los volúmenes envolventes quedan enteros fuera de algún plano
+    """
+    if malla.num_caras == 0:
+        return False
+    return all(clasificar_volumen(malla, plano) >= 0 for plano in planos)
+
+
+# ========== ÍNDICE DE INTERVALOS PARA PLANOS ALINEADOS A LOS EJES ==========
+
+class IndiceIntervalos:
+    """
+    Índice de la extensión (mínimo/máximo) de cada triángulo a lo largo
+    de cada eje
+    
+    Para un plano perpendicular a un eje, un triángulo queda completamente
+    dentro si su mínimo (sobre el eje orientado según la normal) supera el
+    corte, completamente fuera si su máximo no lo alcanza, y cruza el
+    plano en otro caso. Con los mínimos ordenados, los triángulos dentro
+    son un sufijo del orden y los que cruzan están en una ventana de ancho
+    igual a la mayor extensión de un triángulo; los pocos triángulos muy
+    largos (p. ej. las tapas en abanico de un cilindro) se revisan aparte
+    para que no ensanchen esa ventana.
+    """
+    
+    def __init__(self, vertices, caras, factor_largo=4.0):
+        """
+        Args:
+            vertices: Array (N,3) de vértices
+            caras: Array (M,3) de caras
+            factor_largo: Un triángulo es "largo" si su extensión supera
+                          factor_largo veces la mediana en ese eje
+        """
+        self._caras = np.asarray(caras).reshape(-1, 3)
+        triangulos = np.asarray(vertices, dtype=np.float64)[self._caras]
+        self._minimos = triangulos.min(axis=1)
+        self._maximos = triangulos.max(axis=1)
+        self.factor_largo = factor_largo
+        self._ejes = {}
+    
+    def _eje(self, eje, signo):
+        """Construye (una sola vez) el índice para el eje orientado"""
+        clave = (eje, signo)
+        if clave not in self._ejes:
+            if signo > 0:
+                minimos, maximos = self._minimos[:, eje], self._maximos[:, eje]
+            else:
+                minimos, maximos = -self._maximos[:, eje], -self._minimos[:, eje]
+            
+            extension = maximos - minimos
+            umbral = self.factor_largo * np.median(extension) if len(extension) else 0.0
+            es_largo = extension > umbral
+            
+            orden = np.argsort(minimos, kind='stable')
+            self._ejes[clave] = {
+                'orden': orden,
+                'caras_ordenadas': np.ascontiguousarray(self._caras[orden]),
+                'minimos_ordenados': minimos[orden],
+                'maximos_ordenados': maximos[orden],
+                'largo_ordenado': es_largo[orden],
+                'extension_corta': float(extension[~es_largo].max()) if np.any(~es_largo) else 0.0,
+                'largos': np.flatnonzero(es_largo),
+                'minimos_largos': minimos[es_largo],
+                'maximos_largos': maximos[es_largo],
+            }
+        return self._ejes[clave]
+    
+    def separar_caras(self, eje, signo, corte):
+        """
+        Igual que clasificar, pero retorna directamente las caras
+        
+        Las caras completamente dentro salen como una vista contigua del
+        array de caras ordenado, sin copiar ni reunir índices.
+        
+        Returns:
+            Tupla (caras_dentro, caras_cruzan)
+        """
+        datos = self._eje(eje, signo)
+        inicio_dentro, indices_cruzan = self._buscar(datos, corte)
+        return datos['caras_ordenadas'][inicio_dentro:], self._caras[indices_cruzan]
+    
+    def clasificar(self, eje, signo, corte):
+        """
+        Clasifica los triángulos contra el plano signo * x[eje] >= corte
+        
+        Args:
+            eje: 0, 1 o 2
+            signo: +1 o -1 (sentido de la normal del plano)
+            corte: Valor del corte sobre el eje orientado
+        
+        Returns:
+            Tupla (indices_dentro, indices_cruzan); los triángulos que no
+            aparecen en ninguna quedan completamente fuera
+        """
+        datos = self._eje(eje, signo)
+        inicio_dentro, indices_cruzan = self._buscar(datos, corte)
+        return datos['orden'][inicio_dentro:], indices_cruzan
+    
+    def _buscar(self, datos, corte):
+        """Inicio del sufijo de triángulos dentro e índices de los que cruzan"""
+        minimos = datos['minimos_ordenados']
+        
+        # Completamente dentro: mínimo >= corte (sufijo del orden)
+        inicio_dentro = np.searchsorted(minimos, corte, side='left')
+        
+        # Cruzan: mínimo < corte <= máximo; los cortos están en una ventana
+        inicio_ventana = np.searchsorted(minimos, corte - datos['extension_corta'], side='left')
+        ventana = slice(inicio_ventana, inicio_dentro)
+        en_ventana = (datos['maximos_ordenados'][ventana] >= corte) & ~datos['largo_ordenado'][ventana]
+        cortos = datos['orden'][ventana][en_ventana]
+        
+        largos_cruzan = (datos['minimos_largos'] < corte) & (datos['maximos_largos'] >= corte)
+        indices_cruzan = np.concatenate([cortos, datos['largos'][largos_cruzan]])
+        
+        return inicio_dentro, indices_cruzan
+
+
+# ========== CACHE DE RESULTADOS DE CLIPPING ==========
+
+class CacheRecorte:
+    """
+    Cache LRU de resultados de clipping por malla
+    
+    Para cada malla guarda los últimos resultados (vértices, caras y
+    normales) indexados por los coeficientes del plano, además de su
+    IndiceIntervalos para recortar con planos alineados a los ejes. Una entrada solo
+    es válida mientras la malla de origen sea la misma (mismos objetos de
+    vértices/caras y misma versión), así que mover el plano de un lado a
+    otro reutiliza los recortes previos y una vista estática no recorta
+    de nuevo.
+    """
+    
+    def __init__(self, capacidad=8, decimales=6):
+        """
+        Args:
+            capacidad: Posiciones de plano recientes que se guardan por malla
+            decimales: Redondeo de los coeficientes del plano al formar la clave
+                       (evita fallos por el error acumulado de posicion_corte)
+        """
+        self.capacidad = capacidad
+        self.decimales = decimales
+        self._por_malla = {}
+        self._indices = {}
+    
+    def clave_plano(self, plano):
+        """Clave hashable con los coeficientes redondeados del plano"""
+        return tuple(round(float(c), self.decimales) + 0.0
+                     for c in (plano.A, plano.B, plano.C, plano.D))
+    
+    def obtener(self, clave, vertices, caras, plano, version=0):
+        """
+        Retorna el recorte de una malla, recalculándolo solo si no está en cache
+        
+        Args:
+            clave: Identificador de la malla
+            vertices: Vértices originales de la malla
+            caras: Caras originales de la malla
+            plano: PlanoClipping
+            version: Versión de la geometría de origen
+        
+        Returns:
+            Tupla (vertices, caras, normales) del resultado recortado
+        """
+        origen = (vertices, caras)
+        clave_plano = self.clave_plano(plano)
+        resultado = self._buscar(clave, origen, version, clave_plano)
+        if resultado is not None:
+            return resultado
+        
+        vertices_recortados, caras_recortadas = recortar_malla_con_plano_lote(
+            vertices, caras, plano, self._indice(clave, vertices, caras, version))
+        with PERFILADOR.etapa('normales'):
+            normales = calcular_normales_array(vertices_recortados, caras_recortadas)
+        resultado = (vertices_recortados, caras_recortadas, normales)
+        
+        self._guardar(clave, origen, version, clave_plano, resultado)
+        return resultado
+    
+    def obtener_malla(self, clave, malla, plano):
+        """
+        Igual que obtener, para una Malla (la versión se toma de la malla)
+        
+        Args:
+            clave: Identificador de la malla
+            malla: Malla de origen
+            plano: PlanoClipping
+        
+        Returns:
+            Malla recortada
+        """
+        origen = (malla, malla.vertices, malla.caras)
+        clave_plano = self.clave_plano(plano)
+        resultado = self._buscar(clave, origen, malla.version, clave_plano)
+        if resultado is None:
+            # El índice solo se construye si la malla puede cruzar el plano
+            indice = None
+            if clasificar_volumen(malla, plano) == 0:
+                indice = self._indice(clave, malla.vertices, malla.caras, malla.version)
+            resultado = recortar_malla(malla, plano, indice)
+            self._guardar(clave, origen, malla.version, clave_plano, resultado)
+        return resultado
+    
+    def obtener_instanciada(self, clave, malla, plano, version=0):
+        """
+        Igual que obtener, para una MallaInstanciada
+        
+        Args:
+            clave: Identificador de la malla
+            malla: MallaInstanciada
+            plano: PlanoClipping
+            version: Versión de la geometría de origen
+        
+        Returns:
+            Malla recortada
+        """
+        origen = (malla, malla.transformaciones)
+        clave_plano = self.clave_plano(plano)
+        resultado = self._buscar(clave, origen, version, clave_plano)
+        if resultado is None:
+            resultado = Malla(*recortar_malla_instanciada(malla, plano))
+            self._guardar(clave, origen, version, clave_plano, resultado)
+        return resultado
+    
+    def _buscar(self, clave, origen, version, clave_plano):
+        """Resultado guardado para el plano si la malla de origen no cambió"""
+        recientes = self._por_malla.setdefault(clave, OrderedDict())
+        entrada = recientes.get(clave_plano)
+        if entrada is not None:
+            origen_guardado, version_guardada, resultado = entrada
+            if (version_guardada == version
+                    and all(a is b for a, b in zip(origen_guardado, origen))):
+                recientes.move_to_end(clave_plano)
+                return resultado
+        return None
+    
+    def _guardar(self, clave, origen, version, clave_plano, resultado):
+        """Agrega un resultado y descarta el plano menos reciente si se excede la capacidad"""
+        recientes = self._por_malla.setdefault(clave, OrderedDict())
+        recientes[clave_plano] = (origen, version, resultado)
+        recientes.move_to_end(clave_plano)
+        while len(recientes) > self.capacidad:
+            recientes.popitem(last=False)
+    
+    def _indice(self, clave, vertices, caras, version):
+        """IndiceIntervalos de la malla, reconstruido solo si cambió la geometría"""
+        entrada = self._indices.get(clave)
+        if entrada is not None:
+            vertices_origen, caras_origen, version_origen, indice = entrada
+            if (vertices_origen is vertices and caras_origen is caras
+                    and version_origen == version):
+                return indice
+        
+        indice = IndiceIntervalos(vertices, caras)
+        self._indices[clave] = (vertices, caras, version, indice)
+        return indice
+    
+    def invalidar(self, clave=None):
+        """Descarta los recortes de una malla (o de todas si clave es None)"""
+        if clave is None:
+            self._por_malla.clear()
+            self._indices.clear()
+        else:
+            self._por_malla.pop(clave, None)
+            self._indices.pop(clave, None)
@@ -0,0 +1,84 @@
+"""
+Módulo: componentes.py
+Componentes de la llanta (generador, parámetros y material de cada pieza)
+No depende de OpenGL, así que lo usan tanto main.py como el render por lotes
+"""
+
+from materials import (MATERIAL_GOMA, MATERIAL_METAL_DORADO, MATERIAL_METAL_OSCURO,
+                       MATERIAL_BANDA_ROJA, MATERIAL_TORNILLOS,
+                       MATERIAL_ANILLO_HUB, MATERIAL_DISCO_RELLENO,
+                       MATERIAL_SIDEWALL_MARCAS)
+from geometry import (generar_vertices_cilindro_array, generar_toroide_array,
+                      generar_radios_aerodinamicos_instancias, Malla,
+                      generar_banda_color_neumatico_array,
+                      generar_tornillos_hub_instancias, generar_anillo_central_hub_array,
+                      generar_disco_relleno_array, generar_marcas_sidewall_instancias,
+                      GENERADORES_INSTANCIADOS)
+from lod import parametros_nivel
+
+
+# Componentes de la llanta en orden de dibujo:
+# (nombre, generador, parámetros, material, color wireframe, color mixto)
+COMPONENTES_LLANTA = [
+    ('neumatico', generar_toroide_array,
+     dict(radio_mayor=2.8, radio_menor=0.5, segmentos_mayor=64, segmentos_menor=24),
+     MATERIAL_GOMA, [0.0, 1.0, 0.0], [0.0, 0.5, 0.0]),
+    ('banda', generar_banda_color_neumatico_array,
+     dict(radio_mayor=2.8, radio_menor=0.5, posicion_y=0.0, ancho_banda=0.15, segmentos=64),
+     MATERIAL_BANDA_ROJA, [1.0, 0.0, 0.0], [0.6, 0.0, 0.0]),
+    ('rin', generar_vertices_cilindro_array,
+     dict(radio=2.2, altura=0.85, segmentos=64),
+     MATERIAL_METAL_DORADO, [1.0, 1.0, 0.0], [0.6, 0.6, 0.0]),
+    ('relleno', generar_disco_relleno_array,
+     dict(radio_interno=2.2, radio_externo=2.8, altura=0.85, segmentos=64),
+     MATERIAL_DISCO_RELLENO, [0.7, 0.6, 0.2], [0.5, 0.4, 0.15]),
+    ('sidewall', generar_marcas_sidewall_instancias,
+     dict(radio_mayor=2.8, radio_menor=0.5, num_marcas=12),
+     MATERIAL_SIDEWALL_MARCAS, [0.9, 0.9, 0.9], [0.6, 0.6, 0.6]),
+    ('radios', generar_radios_aerodinamicos_instancias,
+     dict(radio_interno=0.9, radio_externo=2.1, altura=0.8, num_radios=10),
+     MATERIAL_METAL_DORADO, [1.0, 1.0, 0.0], [0.6, 0.6, 0.0]),
+    ('anillo', generar_anillo_central_hub_array,
+     dict(radio_interno=0.65, radio_externo=0.77, altura=0.78, segmentos=32),
+     MATERIAL_ANILLO_HUB, [0.8, 0.7, 0.3], [0.5, 0.4, 0.2]),
+    ('centro', generar_vertices_cilindro_array,
+     dict(radio=0.8, altura=0.75, segmentos=32),
+     MATERIAL_METAL_OSCURO, [0.5, 0.5, 0.5], [0.3, 0.3, 0.3]),
+    ('tornillos', generar_tornillos_hub_instancias,
+     dict(radio=0.5, altura=0.8, num_tornillos=5),
+     MATERIAL_TORNILLOS, [0.6, 0.6, 0.6], [0.4, 0.4, 0.4]),
+]
+
+# Radio exterior del neumático (radio_mayor + radio_menor): todos los
+# componentes eligen su nivel de detalle con el tamaño de la llanta completa
+RADIO_LLANTA = 3.3
+
+# Parámetros del piso (generar_piso_array)
+PISO = dict(ancho=15, profundidad=15, posicion_y=-3.5)
+
+
+def construir_mallas(cache_geometria, matriz=None, factor=1.0):
+    """
+    Genera (o carga de la cache en disco) una Malla por componente, con un
+    solo nivel de detalle
+    
+    Args:
+        cache_geometria: CacheGeometria usada para generar/cargar las mallas
+        matriz: Matriz 4x4 aplicada a los vértices (opcional)
+        factor: Factor de densidad de la teselación (ver lod.parametros_nivel)
+    
+    Returns:
+        Diccionario nombre -> Malla, en el orden de COMPONENTES_LLANTA (las
+        piezas instanciadas se expanden)
+    """
+    mallas = {}
+    for nombre, generador, params, *_ in COMPONENTES_LLANTA:
+        if generador in GENERADORES_INSTANCIADOS:
+            instancias = generador(**params)
+            if matriz is not None:
+                instancias = instancias.transformar(matriz)
+            mallas[nombre] = instancias.expandir_malla()
+        else:
+            mallas[nombre] = Malla(*cache_geometria.obtener(
+                generador, parametros_nivel(params, factor), matriz))
+    return mallas
@@ -0,0 +1,146 @@
+"""
+Módulo: escena.py
+Grafo de escena: nodos con matriz local, matriz de mundo en cache y
+propagación de cambios (dirty flag) hacia los descendientes
+"""
+
+import numpy as np
+
+from transforms import crear_matriz_identidad, transformar_vertices, transformar_normales
+from perfilador import PERFILADOR
+
+
+class NodoEscena:
+    """
+    Nodo del grafo de escena
+    
+    Cada nodo guarda su matriz local y la matriz de mundo compuesta
+    (mundo del padre @ local). La matriz de mundo solo se recalcula cuando
+    el nodo o algún ancestro cambió: al modificar una matriz local el nodo
+    y todo su subárbol quedan marcados como sucios, y se recalculan de
+    forma perezosa al pedir `mundo`. Si un nodo está sucio, todos sus
+    descendientes también lo están, así que la propagación se detiene en
+    cuanto encuentra un nodo ya marcado.
+    """
+    
+    def __init__(self, nombre, matriz_local=None):
+        """
+        Args:
+            nombre: Identificador del nodo
+            matriz_local: Matriz 4x4 relativa al padre (identidad por defecto)
+        """
+        self.nombre = nombre
+        self.padre = None
+        self.hijos = []
+        self._local = crear_matriz_identidad() if matriz_local is None else np.array(matriz_local, dtype=np.float64)
+        self._mundo = None
+        self._sucio = True
+        self.version_mundo = 0  # Aumenta cada vez que se recalcula la matriz de mundo
+        self._datos_sombreado = None
+    
+    def agregar_hijo(self, nodo):
+        """Cuelga un nodo de este y lo retorna"""
+        if nodo.padre is not None:
+            nodo.padre.hijos.remove(nodo)
+        nodo.padre = self
+        self.hijos.append(nodo)
+        nodo.marcar_sucio()
+        return nodo
+    
+    @property
+    def local(self):
+        return self._local
+    
+    def establecer_local(self, matriz):
+        """
+        Reemplaza la matriz local; si no cambió no se invalida nada
+        
+        Args:
+            matriz: Nueva matriz 4x4 relativa al padre
+        """
+        matriz = np.asarray(matriz, dtype=np.float64)
+        if np.array_equal(matriz, self._local):
+            return
+        self._local = matriz.copy()
+        self.marcar_sucio()
+    
+    def marcar_sucio(self):
+        """Invalida la matriz de mundo de este nodo y de su subárbol"""
+        if self._sucio:
+            return
+        self._sucio = True
+        for hijo in self.hijos:
+            hijo.marcar_sucio()
+    
+    @property
+    def mundo(self):
+        """Matriz 4x4 de mundo (se recalcula solo si está sucia)"""
+        if self._sucio:
+            if self.padre is None:
+                self._mundo = self._local
+            else:
+                self._mundo = self.padre.mundo @ self._local
+            self._sucio = False
+            self.version_mundo += 1
+        return self._mundo
+    
+    def recorrer(self):
+        """Recorre el subárbol en profundidad (este nodo primero)"""
+        yield self
+        for hijo in self.hijos:
+            yield from hijo.recorrer()
+    
+    def buscar(self, nombre):
+        """Retorna el primer nodo del subárbol con ese nombre (o None)"""
+        for nodo in self.recorrer():
+            if nodo.nombre == nombre:
+                return nodo
+        return None
+    
+    def datos_sombreado(self, malla):
+        """
+        Centroides y normales de una malla colgada de este nodo, en espacio de mundo
+        
+        Se transforman en bloque con la matriz de mundo y se guardan
+        mientras no cambien la malla, su versión ni la matriz de mundo.
+        
+        Args:
+            malla: Malla en el espacio local del nodo
+        
+        Returns:
+            Tupla (centroides float64 (M,3), normales float32 (M,3))
+        """
+        mundo = self.mundo
+        entrada = self._datos_sombreado
+        if entrada is not None:
+            malla_origen, version, version_mundo, datos = entrada
+            if malla_origen is malla and version == malla.version and version_mundo == self.version_mundo:
+                return datos
+        
+        centroides = malla.centroides
+        normales = malla.normales
+        # La inversa transpuesta conserva el lado hacia el que apunta cada
+        # normal, también cuando la matriz de mundo incluye un reflejo
+        with PERFILADOR.etapa('transformacion'):
+            centroides = transformar_vertices(centroides, mundo)
+            normales = transformar_normales(normales, mundo)
+        
+        datos = (centroides, normales)
+        self._datos_sombreado = (malla, malla.version, self.version_mundo, datos)
+        return datos
+    
+    def esfera_mundo(self, malla):
+        """
+        Esfera envolvente de una malla colgada de este nodo, en espacio de mundo
+        
+        Args:
+            malla: Malla en el espacio local del nodo
+        
+        Returns:
+            Tupla (centro, radio); el radio se escala por la norma espectral
+            de la parte lineal de la matriz de mundo
+        """
+        mundo = self.mundo
+        centro, radio = malla.esfera
+        return (mundo[:3, :3] @ centro + mundo[:3, 3],
+                radio * np.linalg.norm(mundo[:3, :3], 2))
@@ -506,4 +506,852 @@ def calcular_normales(vertices, caras):
         
         normales.append(normal)
     
-    return normales
\ No newline at end of file
+    return normales
+
+# ========== GENERADORES VECTORIZADOS (ARRAYS NUMPY) ==========
+#
+# Versiones de los generadores que construyen la malla con rejillas
+# np.cos/np.sin y aritmética de índices en lugar de bucles de Python.
+# Producen exactamente los mismos vértices y caras (mismo orden) que las
+# versiones con listas, pero devuelven arrays contiguos:
+#   vertices: float32 (N, 3)
+#   caras:    int32   (M, 3)
+
+
+def _como_arrays(vertices, caras):
+    """Empaqueta vértices y caras como arrays contiguos float32/int32"""
+    vertices = np.ascontiguousarray(np.reshape(vertices, (-1, 3)), dtype=np.float32)
+    caras = np.ascontiguousarray(np.reshape(caras, (-1, 3)), dtype=np.int32)
+    return vertices, caras
+
+
+def _angulos(segmentos):
+    """Ángulos 2πi/segmentos para i = 0..segmentos-1"""
+    return 2.0 * np.pi * np.arange(segmentos) / segmentos
+
+
+def _caras_cilindro(segmentos, desplazamiento=0):
+    """
+    Caras de un cilindro con tapas cuyos vértices siguen el orden de
+    generar_vertices_cilindro: anillo superior, anillo inferior, centro
+    superior y centro inferior
+    
+    Args:
+        segmentos: Número de subdivisiones
+        desplazamiento: Índice del primer vértice del cilindro
+    
+    Returns:
+        Array int64 (4*segmentos, 3) con las caras
+    """
+    i = np.arange(segmentos)
+    sig = (i + 1) % segmentos
+    centro_sup = np.full(segmentos, 2 * segmentos)
+    centro_inf = centro_sup + 1
+    
+    laterales = np.stack([
+        np.stack([i, i + segmentos, sig], axis=1),
+        np.stack([sig, i + segmentos, sig + segmentos], axis=1),
+    ], axis=1).reshape(-1, 3)
+    tapas = np.stack([
+        np.stack([centro_sup, i, sig], axis=1),
+        np.stack([centro_inf, sig + segmentos, i + segmentos], axis=1),
+    ], axis=1).reshape(-1, 3)
+    
+    return np.concatenate([laterales, tapas]) + desplazamiento
+
+
+def _vertices_cilindro(radio, altura, segmentos, centro_x=0.0, centro_z=0.0):
+    """Vértices de un cilindro en el orden de generar_vertices_cilindro"""
+    angulos = _angulos(segmentos)
+    x = centro_x + radio * np.cos(angulos)
+    z = centro_z + radio * np.sin(angulos)
+    y = np.full(segmentos, altura / 2)
+    
+    superiores = np.stack([x, y, z], axis=1)
+    inferiores = np.stack([x, -y, z], axis=1)
+    centros = np.array([[centro_x, altura / 2, centro_z],
+                        [centro_x, -altura / 2, centro_z]])
+    return np.concatenate([superiores, inferiores, centros])
+
+
+def generar_vertices_cilindro_array(radio, altura, segmentos=64):
+    """
+    Versión vectorizada de generar_vertices_cilindro
+    
+    Args:
+        radio: Radio del cilindro
+        altura: Altura del cilindro
+        segmentos: Número de subdivisiones alrededor del cilindro
+    
+    Returns:
+        Tupla (vertices float32 (N,3), caras int32 (M,3))
+    """
+    return _como_arrays(_vertices_cilindro(radio, altura, segmentos),
+                        _caras_cilindro(segmentos))
+
+
+def generar_toroide_array(radio_mayor, radio_menor, segmentos_mayor=32, segmentos_menor=16):
+    """
+    Versión vectorizada de generar_toroide
+    
+    Args:
+        radio_mayor: Radio del círculo central
+        radio_menor: Radio del tubo
+        segmentos_mayor: Subdivisiones alrededor del círculo mayor
+        segmentos_menor: Subdivisiones alrededor del tubo
+    
+    Returns:
+        Tupla (vertices float32 (N,3), caras int32 (M,3))
+    """
+    theta = _angulos(segmentos_mayor)[:, None]
+    phi = _angulos(segmentos_menor)[None, :]
+    
+    anillo = radio_mayor + radio_menor * np.cos(phi)
+    x = anillo * np.cos(theta)
+    y = np.broadcast_to(radio_menor * np.sin(phi), x.shape)
+    z = anillo * np.sin(theta)
+    vertices = np.stack([x, y, z], axis=-1)
+    
+    i = np.arange(segmentos_mayor)[:, None]
+    j = np.arange(segmentos_menor)[None, :]
+    i_sig = (i + 1) % segmentos_mayor
+    j_sig = (j + 1) % segmentos_menor
+    p1 = i * segmentos_menor + j
+    p2 = i * segmentos_menor + j_sig
+    p3 = i_sig * segmentos_menor + j_sig
+    p4 = i_sig * segmentos_menor + j
+    
+    caras = np.stack([
+        np.stack([p1, p2, p3], axis=-1),
+        np.stack([p1, p3, p4], axis=-1),
+    ], axis=2)
+    
+    return _como_arrays(vertices, caras)
+
+
+def generar_banda_color_neumatico_array(radio_mayor, radio_menor, posicion_y, ancho_banda,
+                                        segmentos=64):
+    """
+    Versión vectorizada de generar_banda_color_neumatico
+    
+    Args:
+        radio_mayor: Radio del toroide
+        radio_menor: Radio del tubo del toroide
+        posicion_y: Posición Y de la banda
+        ancho_banda: Ancho de la banda
+        segmentos: Subdivisiones
+    
+    Returns:
+        Tupla (vertices float32 (N,3), caras int32 (M,3))
+    """
+    phi_centro = math.asin(posicion_y / radio_menor)
+    delta_phi = ancho_banda / radio_menor / 2
+    
+    theta = _angulos(segmentos)[:, None]
+    phi = np.array([phi_centro + delta_phi, phi_centro - delta_phi])[None, :]
+    
+    anillo = radio_mayor + radio_menor * np.cos(phi)
+    x = anillo * np.cos(theta)
+    y = np.broadcast_to(radio_menor * np.sin(phi), x.shape)
+    z = anillo * np.sin(theta)
+    vertices = np.stack([x, y, z], axis=-1)
+    
+    i = np.arange(segmentos)
+    sig = (i + 1) % segmentos
+    idx1 = i * 2
+    idx2 = i * 2 + 1
+    idx3 = sig * 2 + 1
+    idx4 = sig * 2
+    caras = np.stack([
+        np.stack([idx1, idx2, idx3], axis=1),
+        np.stack([idx1, idx3, idx4], axis=1),
+    ], axis=1)
+    
+    return _como_arrays(vertices, caras)
+
+
+# Caras de un radio aerodinámico (8 vértices por radio)
+_CARAS_RADIO = np.array([
+    [0, 1, 2], [0, 2, 3],
+    [4, 6, 5], [4, 7, 6],
+    [0, 3, 7], [0, 7, 4],
+    [1, 5, 6], [1, 6, 2],
+    [3, 2, 6], [3, 6, 7],
+    [0, 4, 5], [0, 5, 1],
+])
+
+
+def generar_radios_aerodinamicos_array(radio_interno, radio_externo, altura, num_radios=10):
+    """
+    Versión vectorizada de generar_radios_aerodinamicos
+    
+    Args:
+        radio_interno: Radio donde comienzan los radios
+        radio_externo: Radio donde terminan los radios
+        altura: Grosor del rin
+        num_radios: Número de radios
+    
+    Returns:
+        Tupla (vertices float32 (N,3), caras int32 (M,3))
+    """
+    return generar_radios_aerodinamicos_instancias(
+        radio_interno, radio_externo, altura, num_radios).expandir_arrays()
+
+
+def generar_tornillos_hub_array(radio, altura, num_tornillos=5):
+    """
+    Versión vectorizada de generar_tornillos_hub
+    
+    Args:
+        radio: Radio donde se colocan los tornillos
+        altura: Grosor del hub
+        num_tornillos: Número de tornillos
+    
+    Returns:
+        Tupla (vertices float32 (N,3), caras int32 (M,3))
+    """
+    return generar_tornillos_hub_instancias(radio, altura, num_tornillos).expandir_arrays()
+
+
+def _anillo_grueso(radio_interno, radio_externo, altura, segmentos):
+    """Vértices y caras compartidos por el anillo del hub y el disco relleno"""
+    angulos = _angulos(segmentos)[:, None]
+    cos_a = np.cos(angulos)
+    sin_a = np.sin(angulos)
+    
+    # 4 capas por segmento: interno-sup, externo-sup, interno-inf, externo-inf
+    radios = np.array([radio_interno, radio_externo, radio_interno, radio_externo])[None, :]
+    x = radios * cos_a
+    z = radios * sin_a
+    y = np.broadcast_to(np.array([altura/2, altura/2, -altura/2, -altura/2])[None, :], x.shape)
+    vertices = np.stack([x, y, z], axis=-1)
+    
+    base = np.arange(segmentos) * 4
+    sig = ((np.arange(segmentos) + 1) % segmentos) * 4
+    caras = np.stack([
+        # Cara superior
+        np.stack([base, base+1, sig+1], axis=1),
+        np.stack([base, sig+1, sig], axis=1),
+        # Cara inferior
+        np.stack([base+2, sig+2, base+3], axis=1),
+        np.stack([base+3, sig+2, sig+3], axis=1),
+        # Cara exterior
+        np.stack([base+1, base+3, sig+3], axis=1),
+        np.stack([base+1, sig+3, sig+1], axis=1),
+        # Cara interior
+        np.stack([base, sig, base+2], axis=1),
+        np.stack([base+2, sig, sig+2], axis=1),
+    ], axis=1)
+    
+    return _como_arrays(vertices, caras)
+
+
+def generar_anillo_central_hub_array(radio_interno, radio_externo, altura, segmentos=32):
+    """
+    Versión vectorizada de generar_anillo_central_hub
+    
+    Args:
+        radio_interno: Radio interior del anillo
+        radio_externo: Radio exterior del anillo
+        altura: Grosor del anillo
+        segmentos: Subdivisiones
+    
+    Returns:
+        Tupla (vertices float32 (N,3), caras int32 (M,3))
+    """
+    return _anillo_grueso(radio_interno, radio_externo, altura, segmentos)
+
+
+def generar_disco_relleno_array(radio_interno, radio_externo, altura, segmentos=32):
+    """
+    Versión vectorizada de generar_disco_relleno
+    
+    Args:
+        radio_interno: Radio interior
+        radio_externo: Radio exterior
+        altura: Grosor
+        segmentos: Subdivisiones
+    
+    Returns:
+        Tupla (vertices float32 (N,3), caras int32 (M,3))
+    """
+    return _anillo_grueso(radio_interno, radio_externo, altura, segmentos)
+
+
+def generar_marcas_sidewall_array(radio_mayor, radio_menor, num_marcas=8):
+    """
+    Versión vectorizada de generar_marcas_sidewall
+    
+    Args:
+        radio_mayor: Radio del toroide
+        radio_menor: Radio del tubo
+        num_marcas: Número de marcas alrededor
+    
+    Returns:
+        Tupla (vertices float32 (N,3), caras int32 (M,3))
+    """
+    return generar_marcas_sidewall_instancias(radio_mayor, radio_menor, num_marcas).expandir_arrays()
+
+
+def generar_piso_array(ancho=10, profundidad=10, posicion_y=-3.5):
+    """
+    Versión en arrays de generar_piso
+    
+    Args:
+        ancho: Ancho del piso en X
+        profundidad: Profundidad del piso en Z
+        posicion_y: Altura del piso (Y)
+    
+    Returns:
+        Tupla (vertices float32 (4,3), caras int32 (2,3))
+    """
+    return _como_arrays(*generar_piso(ancho, profundidad, posicion_y))
+
+
+# ========== NORMALES VECTORIZADAS + CACHE ==========
+
+def calcular_normales_array(vertices, caras):
+    """
+    Versión vectorizada de calcular_normales: reúne los vértices de todas
+    las caras, hace un solo np.cross y normaliza en bloque
+    
+    Args:
+        vertices: Array (N,3) o lista de vértices
+        caras: Array (M,3) o lista de caras (triángulos)
+    
+    Returns:
+        Array float32 (M,3) con la normal unitaria de cada cara
+        (las caras degeneradas conservan normal cero)
+    """
+    vertices = np.asarray(vertices, dtype=np.float32)
+    caras = np.asarray(caras, dtype=np.int32).reshape(-1, 3)
+    
+    triangulos = vertices[caras]
+    normales = np.cross(triangulos[:, 1] - triangulos[:, 0],
+                        triangulos[:, 2] - triangulos[:, 0])
+    
+    longitudes = np.linalg.norm(normales, axis=1, keepdims=True)
+    np.divide(normales, longitudes, out=normales, where=longitudes > 0)
+    return np.ascontiguousarray(normales, dtype=np.float32)
+
+
+def calcular_centroides(vertices, caras):
+    """
+    Calcula el centroide de cada cara de forma vectorizada
+    
+    Args:
+        vertices: Array (N,3) o lista de vértices
+        caras: Array (M,3) o lista de caras (triángulos)
+    
+    Returns:
+        Array float64 (M,3) con el centro de cada triángulo
+    """
+    vertices = np.asarray(vertices, dtype=np.float64)
+    caras = np.asarray(caras, dtype=np.int32).reshape(-1, 3)
+    triangulos = vertices[caras]
+    return (triangulos[:, 0] + triangulos[:, 1] + triangulos[:, 2]) / 3.0
+
+
+def calcular_orientacion(vertices, caras):
+    """
+    Determina si una malla es cerrada y hacia dónde apunta su sentido de giro
+    
+    La malla es cerrada y consistente si cada arista dirigida aparece una
+    sola vez y su arista inversa también aparece. En ese caso el signo del
+    volumen con signo indica si las normales apuntan hacia afuera o hacia
+    adentro.
+    
+    Args:
+        vertices: Array (N,3) de vértices
+        caras: Array (M,3) de caras
+    
+    Returns:
+        1 (cerrada, normales hacia afuera), -1 (cerrada, normales hacia
+        adentro) o 0 (abierta o con orientación inconsistente)
+    """
+    vertices = np.asarray(vertices, dtype=np.float64)
+    caras = np.asarray(caras, dtype=np.int64).reshape(-1, 3)
+    if len(caras) == 0:
+        return 0
+    
+    num_vertices = len(vertices)
+    origen = caras.ravel()
+    destino = caras[:, [1, 2, 0]].ravel()
+    aristas = np.sort(origen * num_vertices + destino)
+    if (np.diff(aristas) == 0).any():
+        return 0
+    
+    inversas = destino * num_vertices + origen
+    posiciones = np.minimum(np.searchsorted(aristas, inversas), len(aristas) - 1)
+    if not (aristas[posiciones] == inversas).all():
+        return 0
+    
+    triangulos = vertices[caras]
+    volumen = np.einsum('ij,ij->', triangulos[:, 0],
+                        np.cross(triangulos[:, 1], triangulos[:, 2])) / 6.0
+    return 1 if volumen > 0 else (-1 if volumen < 0 else 0)
+
+
+def mascara_caras_frontales(centroides, normales, ojo, orientacion=1):
+    """
+    Marca las caras que miran hacia el observador con un solo producto punto
+    
+    Args:
+        centroides: Array (M,3) con el centro de cada cara
+        normales: Array (M,3) con la normal de cada cara
+        ojo: Posición del observador en el mismo espacio que la malla
+        orientacion: 1 si las normales apuntan hacia afuera, -1 si apuntan hacia adentro
+    
+    Returns:
+        Array bool (M,) con True para las caras frontales
+    """
+    hacia_ojo = np.asarray(ojo, dtype=np.float64) - centroides
+    return orientacion * np.einsum('ij,ij->i', normales, hacia_ojo) > 0
+
+
+# ========== ARISTAS ==========
+
+# Ángulo diedro (grados) a partir del cual una arista se considera de contorno
+ANGULO_CONTORNO = 30.0
+
+
+def _aristas_unicas(caras):
+    """
+    Aristas no dirigidas sin repetir
+    
+    Returns:
+        Tupla (aristas int32 (E,2) con el índice menor primero, inversa
+        (3M,) con la arista única de cada arista dirigida caras[f, k] -> caras[f, k+1])
+    """
+    caras = np.asarray(caras, dtype=np.int64).reshape(-1, 3)
+    if len(caras) == 0:
+        return np.empty((0, 2), dtype=np.int32), np.empty(0, dtype=np.int64)
+    
+    origen = caras.ravel()
+    destino = caras[:, [1, 2, 0]].ravel()
+    menor = np.minimum(origen, destino)
+    mayor = np.maximum(origen, destino)
+    
+    base = int(caras.max()) + 1
+    claves, inversa = np.unique(menor * base + mayor, return_inverse=True)
+    aristas = np.stack([claves // base, claves % base], axis=1)
+    return np.ascontiguousarray(aristas, dtype=np.int32), inversa.ravel()
+
+
+def extraer_aristas(caras):
+    """
+    Lista de aristas únicas de una malla (cada arista compartida aparece una vez)
+    
+    Args:
+        caras: Array (M,3) o lista de caras (triángulos)
+    
+    Returns:
+        Array int32 (E,2) ordenado, con el índice menor primero
+    """
+    return _aristas_unicas(caras)[0]
+
+
+def extraer_aristas_caracteristicas(vertices, caras, angulo=ANGULO_CONTORNO, normales=None):
+    """
+    Aristas de contorno: bordes abiertos (una sola cara), aristas no
+    manifold y aristas cuyo ángulo diedro supera el umbral
+    
+    Args:
+        vertices: Array (N,3) de vértices
+        caras: Array (M,3) de caras
+        angulo: Ángulo mínimo (grados) entre las normales de las dos caras
+        normales: Normales por cara ya calculadas (opcional)
+    
+    Returns:
+        Array int32 (E',2), subconjunto de extraer_aristas(caras)
+    """
+    aristas, inversa = _aristas_unicas(caras)
+    if len(aristas) == 0:
+        return aristas
+    if normales is None:
+        normales = calcular_normales_array(vertices, caras)
+    
+    # Caras adyacentes de cada arista: las aristas dirigidas agrupadas por arista única
+    orden = np.argsort(inversa, kind='stable')
+    caras_orden = orden // 3
+    conteos = np.bincount(inversa, minlength=len(aristas))
+    inicios = np.cumsum(conteos) - conteos
+    
+    caracteristicas = conteos != 2
+    dos = np.flatnonzero(~caracteristicas)
+    cara_1 = caras_orden[inicios[dos]]
+    cara_2 = caras_orden[inicios[dos] + 1]
+    cosenos = np.einsum('ij,ij->i', normales[cara_1], normales[cara_2])
+    caracteristicas[dos] = cosenos < math.cos(math.radians(angulo))
+    
+    return np.ascontiguousarray(aristas[caracteristicas])
+
+
+# ========== CONTENEDOR DE MALLA ==========
+
+class Malla:
+    """
+    Malla triangular compacta
+    
+    Guarda vértices float32 (N,3) y caras int32 (M,3) contiguos, y calcula
+    bajo demanda normales por cara, centroides, volúmenes envolventes (caja
+    alineada a los ejes y esfera), su orientación (ver calcular_orientacion)
+    y sus aristas únicas y de contorno. Esos datos derivados se guardan hasta
+    que la malla se modifica con actualizar(), que además incrementa
+    `version` para que las caches externas (buffers, recortes) sepan que
+    deben recalcular.
+    """
+    
+    __slots__ = ('vertices', 'caras', 'version', '_normales', '_centroides', '_limites', '_esfera',
+                 '_orientacion', '_aristas', '_contorno')
+    
+    def __init__(self, vertices, caras, normales=None):
+        """
+        Args:
+            vertices: Array (N,3) o lista de vértices
+            caras: Array (M,3) o lista de caras (triángulos)
+            normales: Normales por cara ya calculadas (opcional)
+        """
+        self.vertices, self.caras = _como_arrays(vertices, caras)
+        self.version = 0
+        self._normales = None if normales is None else np.ascontiguousarray(normales, dtype=np.float32)
+        self._centroides = None
+        self._limites = None
+        self._esfera = None
+        self._orientacion = None
+        self._aristas = None
+        self._contorno = None
+    
+    @property
+    def num_vertices(self):
+        return len(self.vertices)
+    
+    @property
+    def num_caras(self):
+        return len(self.caras)
+    
+    @property
+    def normales(self):
+        """Normales unitarias por cara, float32 (M,3)"""
+        if self._normales is None:
+            self._normales = calcular_normales_array(self.vertices, self.caras)
+        return self._normales
+    
+    @property
+    def centroides(self):
+        """Centroide de cada cara, float64 (M,3)"""
+        if self._centroides is None:
+            self._centroides = calcular_centroides(self.vertices, self.caras)
+        return self._centroides
+    
+    @property
+    def limites(self):
+        """Tupla (minimo, maximo) de la caja envolvente alineada a los ejes"""
+        if self._limites is None:
+            if len(self.vertices) == 0:
+                self._limites = (np.zeros(3, dtype=np.float32), np.zeros(3, dtype=np.float32))
+            else:
+                self._limites = (self.vertices.min(axis=0), self.vertices.max(axis=0))
+        return self._limites
+    
+    @property
+    def esfera(self):
+        """Tupla (centro float64 (3,), radio) de una esfera que contiene la malla"""
+        if self._esfera is None:
+            minimo, maximo = self.limites
+            centro = (minimo.astype(np.float64) + maximo) / 2.0
+            radio = float(np.linalg.norm(self.vertices - centro, axis=1).max()) if len(self.vertices) else 0.0
+            self._esfera = (centro, radio)
+        return self._esfera
+    
+    @property
+    def orientacion(self):
+        """1/-1 si la malla es cerrada con normales hacia afuera/adentro, 0 si es abierta"""
+        if self._orientacion is None:
+            self._orientacion = calcular_orientacion(self.vertices, self.caras)
+        return self._orientacion
+    
+    @property
+    def aristas(self):
+        """Aristas únicas, int32 (E,2)"""
+        if self._aristas is None:
+            self._aristas = extraer_aristas(self.caras)
+        return self._aristas
+    
+    def aristas_contorno(self, angulo=ANGULO_CONTORNO):
+        """Aristas de contorno para el ángulo diedro dado (se guarda el último ángulo usado)"""
+        if self._contorno is None or self._contorno[0] != angulo:
+            self._contorno = (angulo, extraer_aristas_caracteristicas(
+                self.vertices, self.caras, angulo, self.normales))
+        return self._contorno[1]
+    
+    def fijar_volumenes(self, limites, esfera):
+        """
+        Asigna volúmenes envolventes ya conocidos (p. ej. transformados desde
+        los de otra malla) para no recorrer los vértices
+        
+        Args:
+            limites: Tupla (minimo, maximo) de la caja envolvente
+            esfera: Tupla (centro, radio)
+        """
+        self._limites = (np.asarray(limites[0], dtype=np.float32), np.asarray(limites[1], dtype=np.float32))
+        self._esfera = (np.asarray(esfera[0], dtype=np.float64), float(esfera[1]))
+    
+    def actualizar(self, vertices=None, caras=None, normales=None):
+        """
+        Reemplaza vértices y/o caras, descarta los datos derivados e
+        incrementa la versión
+        """
+        nuevos_vertices = self.vertices if vertices is None else vertices
+        nuevas_caras = self.caras if caras is None else caras
+        self.vertices, self.caras = _como_arrays(nuevos_vertices, nuevas_caras)
+        self._normales = None if normales is None else np.ascontiguousarray(normales, dtype=np.float32)
+        self._centroides = None
+        self._limites = None
+        self._esfera = None
+        self._orientacion = None
+        self._aristas = None
+        self._contorno = None
+        self.version += 1
+    
+    def a_listas(self):
+        """Tupla (vertices, caras) como listas, para las funciones con listas"""
+        return self.vertices.tolist(), self.caras.tolist()
+
+
+# ========== MALLAS INSTANCIADAS ==========
+#
+# Radios, tornillos y marcas del sidewall son la misma pieza repetida N
+# veces. Se representan como un prototipo (vértices, caras y normales
+# calculados una sola vez) más un array (N,4,4) de transformaciones
+# afines; la malla completa se obtiene con un matmul por lotes.
+
+
+class MallaInstanciada:
+    """
+    Prototipo + transformaciones por instancia
+    
+    Las transformaciones deben ser afines (última fila [0, 0, 0, 1]).
+    La expansión se guarda mientras no se reemplace el array de
+    transformaciones.
+    """
+    
+    def __init__(self, vertices, caras, transformaciones, normales=None):
+        """
+        Args:
+            vertices: Vértices del prototipo (V,3)
+            caras: Caras del prototipo (F,3)
+            transformaciones: Array (N,4,4) con la matriz de cada instancia
+            normales: Normales del prototipo (se calculan si no se dan)
+        """
+        self.vertices, self.caras = _como_arrays(vertices, caras)
+        self.transformaciones = np.asarray(transformaciones, dtype=np.float64).reshape(-1, 4, 4)
+        if normales is None:
+            normales = calcular_normales_array(self.vertices, self.caras)
+        self.normales = normales
+        self._expansion = None
+    
+    @property
+    def num_instancias(self):
+        return len(self.transformaciones)
+    
+    def transformar(self, matriz):
+        """
+        Aplica una matriz 4x4 a todas las instancias (matriz @ T_i) sin
+        tocar los vértices del prototipo
+        
+        Returns:
+            Nueva MallaInstanciada que comparte el prototipo
+        """
+        return MallaInstanciada(self.vertices, self.caras,
+                                np.asarray(matriz) @ self.transformaciones,
+                                self.normales)
+    
+    def esfera_envolvente(self):
+        """
+        Esferas envolventes de las instancias
+        
+        Returns:
+            Tupla (centros (N,3), radios (N,)) a partir de la esfera del
+            prototipo escalada por la mayor dilatación de cada matriz
+        """
+        minimo = self.vertices.min(axis=0).astype(np.float64)
+        maximo = self.vertices.max(axis=0).astype(np.float64)
+        centro = (minimo + maximo) / 2.0
+        radio = float(np.linalg.norm(self.vertices - centro, axis=1).max())
+        
+        lineales = self.transformaciones[:, :3, :3]
+        centros = lineales @ centro + self.transformaciones[:, :3, 3]
+        radios = radio * np.linalg.norm(lineales, ord=2, axis=(1, 2))
+        return centros, radios
+    
+    def expandir_vertices(self, indices=None):
+        """
+        Vértices de las instancias indicadas (todas por defecto)
+        
+        Returns:
+            Array float32 (n*V, 3), instancia por instancia
+        """
+        transformaciones = self.transformaciones if indices is None else self.transformaciones[indices]
+        lineales = transformaciones[:, :3, :3].transpose(0, 2, 1)
+        vertices = np.matmul(self.vertices[None, :, :], lineales) + transformaciones[:, None, :3, 3]
+        return np.ascontiguousarray(vertices.reshape(-1, 3), dtype=np.float32)
+    
+    def expandir_caras(self, num_instancias=None):
+        """Caras de n instancias consecutivas, desplazadas por bloque de vértices"""
+        if num_instancias is None:
+            num_instancias = self.num_instancias
+        desplazamientos = (np.arange(num_instancias, dtype=np.int32) * len(self.vertices))[:, None, None]
+        return np.ascontiguousarray((self.caras[None, :, :] + desplazamientos).reshape(-1, 3))
+    
+    def expandir_normales(self, indices=None):
+        """
+        Normales de las instancias: las del prototipo multiplicadas por la
+        inversa transpuesta de la parte lineal de cada matriz
+        
+        Returns:
+            Array float32 (n*F, 3) con normales unitarias
+        """
+        transformaciones = self.transformaciones if indices is None else self.transformaciones[indices]
+        # (M^-T)^T = M^-1 para multiplicar vectores fila
+        inversas = np.linalg.inv(transformaciones[:, :3, :3])
+        normales = np.matmul(self.normales[None, :, :], inversas).reshape(-1, 3)
+        longitudes = np.linalg.norm(normales, axis=1, keepdims=True)
+        np.divide(normales, longitudes, out=normales, where=longitudes > 0)
+        return np.ascontiguousarray(normales, dtype=np.float32)
+    
+    def expandir_arrays(self):
+        """Tupla (vertices float32 (N,3), caras int32 (M,3)) de la malla completa"""
+        return self.expandir_vertices(), self.expandir_caras()
+    
+    def expandir_malla(self):
+        """
+        Malla completa con normales, guardada hasta que cambien las transformaciones
+        
+        Returns:
+            Malla
+        """
+        if self._expansion is None or self._expansion[0] is not self.transformaciones:
+            self._expansion = (self.transformaciones,
+                               Malla(*self.expandir_arrays(), self.expandir_normales()))
+        return self._expansion[1]
+    
+    def expandir(self):
+        """Tupla (vertices, caras, normales) de la malla completa"""
+        malla = self.expandir_malla()
+        return malla.vertices, malla.caras, malla.normales
+
+
+def _rotaciones_y(angulos):
+    """
+    Matrices (N,4,4) que llevan el eje +X al ángulo a del plano XZ
+    (x = cos a, z = sin a), es decir, rotaciones de -a alrededor de Y
+    """
+    cos_a = np.cos(angulos)
+    sin_a = np.sin(angulos)
+    matrices = np.zeros((len(angulos), 4, 4))
+    matrices[:, 0, 0] = cos_a
+    matrices[:, 0, 2] = -sin_a
+    matrices[:, 1, 1] = 1.0
+    matrices[:, 2, 0] = sin_a
+    matrices[:, 2, 2] = cos_a
+    matrices[:, 3, 3] = 1.0
+    return matrices
+
+
+def _traslaciones(posiciones):
+    """Matrices (N,4,4) de traslación a cada posición (N,3)"""
+    posiciones = np.asarray(posiciones, dtype=np.float64).reshape(-1, 3)
+    matrices = np.tile(np.identity(4), (len(posiciones), 1, 1))
+    matrices[:, :3, 3] = posiciones
+    return matrices
+
+
+def generar_radios_aerodinamicos_instancias(radio_interno, radio_externo, altura, num_radios=10):
+    """
+    Radios aerodinámicos como prototipo (el radio sobre el eje +X) y
+    una rotación por radio
+    
+    Args:
+        radio_interno: Radio donde comienzan los radios
+        radio_externo: Radio donde terminan los radios
+        altura: Grosor del rin
+        num_radios: Número de radios
+    
+    Returns:
+        MallaInstanciada
+    """
+    grosor_radio = 0.08
+    grosor_int = grosor_radio * 1.2
+    grosor_ext = grosor_radio * 0.7
+    
+    # Perfil de un radio: 4 vértices arriba y 4 abajo, en el orden de la versión con listas
+    x = np.array([radio_interno, radio_interno, radio_externo, radio_externo] * 2)
+    z = np.array([grosor_int, -grosor_int, -grosor_ext, grosor_ext] * 2)
+    y = np.repeat([altura/2, -altura/2], 4)
+    prototipo = np.stack([x, y, z], axis=1)
+    
+    return MallaInstanciada(prototipo, _CARAS_RADIO, _rotaciones_y(_angulos(num_radios)))
+
+
+def generar_tornillos_hub_instancias(radio, altura, num_tornillos=5):
+    """
+    Tornillos del hub como un cilindro pequeño trasladado a cada posición
+    
+    Args:
+        radio: Radio donde se colocan los tornillos
+        altura: Grosor del hub
+        num_tornillos: Número de tornillos
+    
+    Returns:
+        MallaInstanciada
+    """
+    radio_tornillo = 0.12
+    segmentos = 8
+    
+    angulos = _angulos(num_tornillos)
+    centros = np.stack([radio * np.cos(angulos),
+                        np.zeros(num_tornillos),
+                        radio * np.sin(angulos)], axis=1)
+    
+    return MallaInstanciada(_vertices_cilindro(radio_tornillo, altura, segmentos),
+                            _caras_cilindro(segmentos), _traslaciones(centros))
+
+
+def generar_marcas_sidewall_instancias(radio_mayor, radio_menor, num_marcas=8):
+    """
+    Marcas del sidewall como un rectángulo (la marca en θ = 0) y una
+    rotación por marca
+    
+    Args:
+        radio_mayor: Radio del toroide
+        radio_menor: Radio del tubo
+        num_marcas: Número de marcas alrededor
+    
+    Returns:
+        MallaInstanciada
+    """
+    phi_marca = math.pi * 0.4
+    ancho_marca = 0.08
+    alto_marca = 0.3
+    factor = 1.02
+    
+    # Desplazamientos (dy, dt) de las 4 esquinas, en el orden de la versión con listas
+    dy = np.array([-alto_marca/2, -alto_marca/2, alto_marca/2, alto_marca/2])
+    dt = np.array([-ancho_marca/2, ancho_marca/2, -ancho_marca/2, ancho_marca/2])
+    
+    x = (radio_mayor + radio_menor * math.cos(phi_marca) - math.sin(phi_marca) * dy) * factor
+    y = radio_menor * math.sin(phi_marca) + math.cos(phi_marca) * dy
+    z = dt * factor
+    prototipo = np.stack([x, y, z], axis=1)
+    caras = np.array([[0, 1, 2], [1, 3, 2]])
+    
+    return MallaInstanciada(prototipo, caras, _rotaciones_y(_angulos(num_marcas)))
+
+
+# Generadores que devuelven una MallaInstanciada en lugar de (vertices, caras)
+GENERADORES_INSTANCIADOS = frozenset({
+    generar_radios_aerodinamicos_instancias,
+    generar_tornillos_hub_instancias,
+    generar_marcas_sidewall_instancias,
+})
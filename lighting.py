@@ -7,6 +7,12 @@ Versión 5.1: Agregado modo linterna
 import numpy as np
 
 
+# Fracción de pares (cara, luz) dentro de los conos a partir de la cual se
+# evalúan todos los pares en bloque: el indexado por pares cuesta más que
+# los cálculos que ahorra cuando quedan pocas caras fuera
+LLENADO_DENSO = 0.75
+
+
 def normalizar(vector):
     """Normaliza un vector a longitud unitaria"""
     norma = np.linalg.norm(vector)
@@ -115,4 +121,504 @@ def spotlight_shading(punto, normal, material, luz_pos, luz_dir, camara_pos,
     
     # Color final
     color_final = I_ambiente + I_difusa + I_especular
-    return np.clip(color_final, 0.0, 1.0)
\ No newline at end of file
+    return np.clip(color_final, 0.0, 1.0)
+
+# ========== SOMBREADO POR LOTES ==========
+
+def normalizar_filas(vectores):
+    """
+    Normaliza cada fila de un array (M,3); las filas de norma cero
+    se dejan igual, como en normalizar()
+    """
+    vectores = np.asarray(vectores)
+    if vectores.dtype.kind != 'f':
+        vectores = vectores.astype(np.float64)
+    normas = np.linalg.norm(vectores, axis=-1, keepdims=True)
+    return np.divide(vectores, normas, out=vectores.copy(), where=normas > 0)
+
+
+def phong_shading_lote(puntos, normales, material, luz_pos, camara_pos, luz_color, luz_ambiente):
+    """
+    Versión vectorizada de phong_shading: sombrea todas las caras de una
+    malla en una sola pasada de NumPy
+    
+    Args:
+        puntos: Array (M,3) con el punto a sombrear de cada cara (centroides)
+        normales: Array (M,3) con la normal de cada cara
+        material: Objeto Material con propiedades
+        luz_pos: Posición de la fuente de luz
+        camara_pos: Posición de la cámara
+        luz_color: Color de la luz (RGB)
+        luz_ambiente: Color de la luz ambiental (RGB)
+    
+    Returns:
+        Array (M,3) con el color de cada cara; coincide con llamar a
+        phong_shading cara por cara (salvo redondeo de punto flotante)
+    """
+    puntos = np.asarray(puntos, dtype=np.float64)
+    N = normalizar_filas(normales)
+    L = normalizar_filas(luz_pos - puntos)
+    V = normalizar_filas(camara_pos - puntos)
+    
+    # Componente ambiental (igual para todas las caras)
+    I_ambiente = material.ka * luz_ambiente * material.color
+    
+    # Componente difusa (Lambert)
+    dot_NL = np.maximum(0.0, np.einsum('ij,ij->i', N, L))
+    I_difusa = (material.kd * luz_color * material.color) * dot_NL[:, None]
+    
+    # Componente especular
+    R = normalizar_filas(2.0 * dot_NL[:, None] * N - L)
+    dot_RV = np.maximum(0.0, np.einsum('ij,ij->i', R, V))
+    especular_intensity = np.power(dot_RV, material.shininess)
+    I_especular = (material.ks * luz_color) * especular_intensity[:, None]
+    
+    color_final = I_ambiente + I_difusa + I_especular
+    return np.clip(color_final, 0.0, 1.0)
+
+
+def umbrales_cono(apertura, suavizado):
+    """
+    Precalcula los cosenos que delimitan el cono del spotlight
+    
+    Args:
+        apertura: Ángulo del cono en grados
+        suavizado: Suavizado del borde en grados
+    
+    Returns:
+        Tupla (cos_interno, cos_externo): dentro del cono principal si
+        cos_angulo >= cos_interno, fuera por completo si cos_angulo < cos_externo
+    """
+    cos_interno = np.cos(np.radians(apertura))
+    cos_externo = np.cos(np.radians(min(apertura + suavizado, 180.0)))
+    return cos_interno, cos_externo
+
+
+def intensidad_spotlight_lote(puntos, luz_pos, luz_dir, apertura=20.0, suavizado=5.0):
+    """
+    Factor del spotlight (cono + falloff cuadrático + atenuación) por cara
+    
+    Clasifica las caras comparando cosenos contra los umbrales del cono;
+    solo las caras en la zona de transición necesitan el ángulo exacto
+    para el falloff.
+    
+    Args:
+        puntos: Array (M,3) con el punto a sombrear de cada cara
+        luz_pos: Posición de la fuente de luz
+        luz_dir: Dirección del spotlight
+        apertura: Ángulo del cono en grados
+        suavizado: Suavizado del borde en grados
+    
+    Returns:
+        Array (M,) con la intensidad del spotlight de cada cara
+    """
+    puntos = np.asarray(puntos, dtype=np.float64)
+    hacia_luz = luz_pos - puntos
+    distancia = np.linalg.norm(hacia_luz, axis=1)
+    L = normalizar_filas(hacia_luz)
+    
+    cos_angulo = np.clip(-L @ normalizar(np.asarray(luz_dir, dtype=np.float64)), -1.0, 1.0)
+    cos_interno, cos_externo = umbrales_cono(apertura, suavizado)
+    
+    intensidad_spot = np.zeros(len(puntos))
+    intensidad_spot[cos_angulo >= cos_interno] = 1.0
+    
+    # Zona de transición suave (falloff cuadrático)
+    transicion = (cos_angulo >= cos_externo) & (cos_angulo < cos_interno)
+    if suavizado > 0 and np.any(transicion):
+        angulo_punto = np.degrees(np.arccos(cos_angulo[transicion]))
+        factor = np.clip((apertura + suavizado - angulo_punto) / suavizado, 0.0, 1.0)
+        intensidad_spot[transicion] = factor * factor
+    
+    # Atenuación por distancia
+    atenuacion = 1.0 / (1.0 + 0.02 * distancia + 0.005 * distancia * distancia)
+    return intensidad_spot * atenuacion
+
+
+def spotlight_shading_lote(puntos, normales, material, luz_pos, luz_dir, camara_pos,
+                           luz_color, luz_ambiente, apertura=20.0, suavizado=5.0):
+    """
+    Versión vectorizada de spotlight_shading para todas las caras de una malla
+    
+    Args:
+        puntos: Array (M,3) con el punto a sombrear de cada cara (centroides)
+        normales: Array (M,3) con la normal de cada cara
+        material: Objeto Material con propiedades
+        luz_pos: Posición de la fuente de luz
+        luz_dir: Dirección del spotlight
+        camara_pos: Posición de la cámara
+        luz_color: Color de la luz (RGB)
+        luz_ambiente: Color de la luz ambiental (RGB)
+        apertura: Ángulo del cono en grados
+        suavizado: Suavizado del borde en grados
+    
+    Returns:
+        Array (M,3) con el color de cada cara
+    """
+    puntos = np.asarray(puntos, dtype=np.float64)
+    N = normalizar_filas(normales)
+    L = normalizar_filas(luz_pos - puntos)
+    V = normalizar_filas(camara_pos - puntos)
+    
+    intensidad_spot = intensidad_spotlight_lote(puntos, luz_pos, luz_dir, apertura, suavizado)
+    
+    # Componente ambiental (muy reducida para contraste dramático)
+    I_ambiente = material.ka * luz_ambiente * material.color * 0.15
+    
+    # Componente difusa (amplificada 2x)
+    dot_NL = np.maximum(0.0, np.einsum('ij,ij->i', N, L))
+    I_difusa = (material.kd * luz_color * material.color * 2.0) * (dot_NL * intensidad_spot)[:, None]
+    
+    # Componente especular (amplificada 1.5x)
+    R = normalizar_filas(2.0 * dot_NL[:, None] * N - L)
+    dot_RV = np.maximum(0.0, np.einsum('ij,ij->i', R, V))
+    especular_intensity = np.power(dot_RV, material.shininess)
+    I_especular = (material.ks * luz_color * 1.5) * (especular_intensity * intensidad_spot)[:, None]
+    
+    color_final = I_ambiente + I_difusa + I_especular
+    return np.clip(color_final, 0.0, 1.0)
+
+
+# ========== VARIAS LUCES POR LOTES ==========
+#
+# Cada cara se sombrea contra K luces a la vez: las direcciones, productos
+# punto y factores de cono se calculan como arrays (M, K) y las
+# contribuciones se suman con un producto matricial contra los colores de
+# las luces, sin bucles de Python por luz ni por cara.
+
+
+class Luz:
+    """Fuente de luz puntual o spotlight (si tiene dirección)"""
+    
+    def __init__(self, posicion, color=(1.0, 1.0, 1.0), direccion=None, apertura=20.0,
+                 suavizado=5.0, ganancia_difusa=1.0, ganancia_especular=1.0, nombre=""):
+        self.nombre = nombre
+        self.posicion = np.asarray(posicion, dtype=np.float64)
+        self.color = np.asarray(color, dtype=np.float64)
+        self.direccion = None if direccion is None else normalizar(np.asarray(direccion, dtype=np.float64))
+        self.apertura = apertura  # Ángulo del cono en grados (solo spotlight)
+        self.suavizado = suavizado  # Suavizado del borde en grados (solo spotlight)
+        self.ganancia_difusa = ganancia_difusa
+        self.ganancia_especular = ganancia_especular
+    
+    @property
+    def es_spot(self):
+        return self.direccion is not None
+    
+    def pose(self, decimales=6):
+        """
+        Clave hashable con todo lo que afecta a los términos geométricos del
+        sombreado (posición, dirección, cono y ganancias), sin el color
+        """
+        def redondear(v):
+            return tuple(round(float(c), decimales) + 0.0 for c in v)
+        direccion = None if self.direccion is None else redondear(self.direccion)
+        return (redondear(self.posicion), direccion, self.apertura, self.suavizado,
+                self.ganancia_difusa, self.ganancia_especular)
+    
+    def ilumina_esfera(self, centro, radio):
+        """
+        Test cono contra esfera: False si la esfera queda completamente fuera
+        del cono externo (apertura + suavizado) del spotlight
+        
+        Es conservador (puede dar True para esferas que solo rozan el borde);
+        una luz puntual ilumina cualquier esfera.
+        
+        Args:
+            centro: Centro de la esfera (mismo espacio que la luz)
+            radio: Radio de la esfera
+        """
+        if not self.es_spot:
+            return True
+        hacia_centro = np.asarray(centro, dtype=np.float64) - self.posicion
+        distancia = np.linalg.norm(hacia_centro)
+        if distancia <= radio:
+            return True  # La luz está dentro de la esfera
+        
+        cos_centro = np.clip(np.dot(hacia_centro, self.direccion) / distancia, -1.0, 1.0)
+        angulo_centro = np.degrees(np.arccos(cos_centro))
+        angulo_esfera = np.degrees(np.arcsin(radio / distancia))
+        return angulo_centro <= min(self.apertura + self.suavizado, 180.0) + angulo_esfera
+    
+    @classmethod
+    def linterna(cls, posicion, direccion, color=(1.0, 1.0, 1.0), apertura=20.0, suavizado=5.0):
+        """Spotlight con las ganancias de spotlight_shading (difusa 2x, especular 1.5x)"""
+        return cls(posicion, color, direccion, apertura, suavizado,
+                   ganancia_difusa=2.0, ganancia_especular=1.5, nombre="linterna")
+
+
+def luces_escena(modo, camara_pos, luz_color, apertura=20.0, suavizado=5.0):
+    """
+    Arma la lista de luces de los modos fijos de iluminación de la escena
+    
+    Args:
+        modo: 'normal' (luz puntual desde arriba), 'linterna' (spotlight
+              desde la cámara hacia el origen) o 'garage' (luz principal,
+              relleno frío y linterna)
+        camara_pos: Posición de la cámara
+        luz_color: Color de la luz principal (RGB)
+        apertura: Ángulo del cono de la linterna
+        suavizado: Suavizado del borde de la linterna
+    
+    Returns:
+        Tupla (luces, luz_ambiente)
+    """
+    camara_pos = np.asarray(camara_pos, dtype=np.float64)
+    hacia_origen = -camara_pos / np.linalg.norm(camara_pos)
+    
+    if modo == 'linterna':
+        luces = [Luz.linterna(camara_pos, hacia_origen, luz_color, apertura, suavizado)]
+        return luces, np.array([0.03, 0.03, 0.03])  # Ambiente oscuro del spotlight
+    
+    if modo == 'garage':
+        luces = [
+            Luz([10.0, 10.0, 10.0], luz_color, nombre="principal"),
+            Luz([-10.0, 6.0, -6.0], [0.25, 0.3, 0.4], nombre="relleno"),
+            Luz.linterna(camara_pos, hacia_origen, [1.0, 1.0, 1.0], apertura, suavizado),
+        ]
+        return luces, np.array([0.1, 0.1, 0.1])
+    
+    return [Luz([10.0, 10.0, 10.0], luz_color)], np.array([0.4, 0.4, 0.4])
+
+
+def _arreglos_luces(luces):
+    """Apila los parámetros de una lista de luces en arrays (K, ...)"""
+    cosenos = [umbrales_cono(luz.apertura, luz.suavizado) for luz in luces]
+    return {
+        'posiciones': np.array([luz.posicion for luz in luces], dtype=np.float64).reshape(-1, 3),
+        'colores': np.array([luz.color for luz in luces], dtype=np.float64).reshape(-1, 3),
+        'direcciones': np.array([luz.direccion if luz.es_spot else np.zeros(3) for luz in luces],
+                                dtype=np.float64).reshape(-1, 3),
+        'es_spot': np.array([luz.es_spot for luz in luces], dtype=bool),
+        'aperturas': np.array([luz.apertura for luz in luces], dtype=np.float64),
+        'suavizados': np.array([luz.suavizado for luz in luces], dtype=np.float64),
+        'cos_interno': np.array([c[0] for c in cosenos], dtype=np.float64),
+        'cos_externo': np.array([c[1] for c in cosenos], dtype=np.float64),
+        'ganancias_difusa': np.array([luz.ganancia_difusa for luz in luces], dtype=np.float64),
+        'ganancias_especular': np.array([luz.ganancia_especular for luz in luces], dtype=np.float64),
+    }
+
+
+def _factores_spot(hacia_luz, distancias, arreglos):
+    """
+    Factor de cono + atenuación (M, K); las luces puntuales tienen factor 1
+    
+    Args:
+        hacia_luz: Array (M,K,3) de vectores de cada cara hacia cada luz
+        distancias: Array (M,K) de distancias a cada luz
+        arreglos: Resultado de _arreglos_luces
+    """
+    factores = np.ones(distancias.shape)
+    spots = np.flatnonzero(arreglos['es_spot'])
+    if len(spots) == 0:
+        return factores
+    
+    d = distancias[:, spots]
+    proyeccion = -np.einsum('mkj,kj->mk', hacia_luz[:, spots], arreglos['direcciones'][spots])
+    cos_angulo = np.clip(np.divide(proyeccion, d, out=np.ones_like(d), where=d > 0), -1.0, 1.0)
+    cos_interno = arreglos['cos_interno'][spots]
+    cos_externo = arreglos['cos_externo'][spots]
+    
+    intensidad = (cos_angulo >= cos_interno).astype(np.float64)
+    
+    # Zona de transición suave (falloff cuadrático): solo aquí se necesita el ángulo
+    transicion = (cos_angulo >= cos_externo) & (cos_angulo < cos_interno)
+    if np.any(transicion):
+        _, columnas = np.nonzero(transicion)
+        apertura = arreglos['aperturas'][spots][columnas]
+        suavizado = arreglos['suavizados'][spots][columnas]
+        angulo_punto = np.degrees(np.arccos(cos_angulo[transicion]))
+        factor = np.clip((apertura + suavizado - angulo_punto) / suavizado, 0.0, 1.0)
+        intensidad[transicion] = factor * factor
+    
+    factores[:, spots] = intensidad / (1.0 + 0.02 * d + 0.005 * d * d)
+    return factores
+
+
+def _difuso_especular(N, L, V, shininess):
+    """dot_NL y (R·V)^shininess para arrays de vectores con la última dimensión 3"""
+    dot_NL = np.maximum(0.0, np.einsum('...j,...j->...', N, L))
+    R = normalizar_filas(2.0 * dot_NL[..., None] * N - L)
+    dot_RV = np.maximum(0.0, np.einsum('...j,...j->...', R, V))
+    return dot_NL, np.power(dot_RV, shininess)
+
+
+def terminos_luces(puntos, normales, luces, camara_pos, shininess, esfera=None):
+    """
+    Términos escalares por cara y por luz, sin colores de material ni de luz
+    
+    Los spotlights se descartan en dos niveles: si se da la esfera
+    envolvente y queda fuera del cono, la luz no se evalúa para ninguna
+    cara; si no, solo los pares (cara, luz) dentro del cono pasan por los
+    cálculos difuso y especular. El resto queda en cero (solo ambiente),
+    así que una linterna angosta cuesta menos que una abierta. Si más de
+    LLENADO_DENSO de los pares están dentro, se calculan todos en bloque
+    (los de fuera se anulan con su factor de cono igual a cero).
+    
+    Args:
+        puntos: Array (M,3) con el punto a sombrear de cada cara (centroides)
+        normales: Array (M,3) con la normal de cada cara
+        luces: Lista de Luz
+        camara_pos: Posición de la cámara
+        shininess: Brillo especular del material
+        esfera: Tupla (centro, radio) que envuelve los puntos, en su mismo
+                espacio (opcional)
+    
+    Returns:
+        Tupla (difuso, especular) de arrays (M,K): dot_NL y (R·V)^shininess
+        ya multiplicados por el factor de cono y la ganancia de cada luz
+    """
+    M, K = len(puntos), len(luces)
+    difuso = np.zeros((M, K))
+    especular = np.zeros((M, K))
+    
+    activas = [k for k, luz in enumerate(luces)
+               if esfera is None or luz.ilumina_esfera(*esfera)]
+    if M == 0 or not activas:
+        return difuso, especular
+    
+    arreglos = _arreglos_luces([luces[k] for k in activas])
+    puntos = np.asarray(puntos, dtype=np.float64)
+    
+    # Test del cono para todas las caras: solo vectores hacia la luz y distancias
+    hacia_luz = arreglos['posiciones'][None, :, :] - puntos[:, None, :]
+    distancias = np.sqrt(np.einsum('mkj,mkj->mk', hacia_luz, hacia_luz))
+    factores = _factores_spot(hacia_luz, distancias, arreglos)
+    
+    dentro = factores > 0.0
+    if dentro.mean() > LLENADO_DENSO:
+        N = normalizar_filas(normales)
+        V = normalizar_filas(camara_pos - puntos)
+        L = normalizar_filas(hacia_luz)
+        dot_NL, brillo = _difuso_especular(N[:, None, :], L, V[:, None, :], shininess)
+        difuso[:, activas] = dot_NL * factores * arreglos['ganancias_difusa']
+        especular[:, activas] = brillo * factores * arreglos['ganancias_especular']
+        return difuso, especular
+    
+    # Solo los pares (cara, luz) dentro de algún cono pasan por difusa y especular
+    filas, columnas = np.nonzero(dentro)
+    L = normalizar_filas(hacia_luz[filas, columnas])
+    N = normalizar_filas(np.asarray(normales)[filas])
+    V = normalizar_filas(camara_pos - puntos[filas])
+    dot_NL, brillo = _difuso_especular(N, L, V, shininess)
+    factor = factores[filas, columnas]
+    columnas_luz = np.asarray(activas)[columnas]
+    difuso[filas, columnas_luz] = dot_NL * factor * arreglos['ganancias_difusa'][columnas]
+    especular[filas, columnas_luz] = brillo * factor * arreglos['ganancias_especular'][columnas]
+    return difuso, especular
+
+
+def combinar_terminos(difuso, especular, material, luces, luz_ambiente):
+    """
+    Color final a partir de los términos de terminos_luces
+    
+    Args:
+        difuso: Array (M,K) de términos difusos
+        especular: Array (M,K) de términos especulares
+        material: Objeto Material con propiedades
+        luces: Lista de Luz (para sus colores)
+        luz_ambiente: Color de la luz ambiental (RGB)
+    
+    Returns:
+        Array (M,3) con el color de cada cara
+    """
+    colores_luz = np.array([luz.color for luz in luces], dtype=np.float64).reshape(-1, 3)
+    
+    I_ambiente = material.ka * luz_ambiente * material.color
+    I_difusa = (difuso @ colores_luz) * (material.kd * material.color)
+    I_especular = (especular @ colores_luz) * material.ks
+    
+    return np.clip(I_ambiente + I_difusa + I_especular, 0.0, 1.0)
+
+
+def sombrear_luces(puntos, normales, material, luces, camara_pos, luz_ambiente, esfera=None):
+    """
+    Sombrea todas las caras contra varias luces puntuales y spotlights
+    
+    Con una sola luz puntual coincide con phong_shading_lote, y con una
+    sola Luz.linterna coincide con spotlight_shading_lote si luz_ambiente
+    ya incluye el factor 0.15 de ese modo.
+    
+    Args:
+        puntos: Array (M,3) con el punto a sombrear de cada cara (centroides)
+        normales: Array (M,3) con la normal de cada cara
+        material: Objeto Material con propiedades
+        luces: Lista de Luz
+        camara_pos: Posición de la cámara
+        luz_ambiente: Color de la luz ambiental (RGB)
+        esfera: Esfera envolvente (centro, radio) para descartar spotlights (opcional)
+    
+    Returns:
+        Array (M,3) con el color de cada cara
+    """
+    difuso, especular = terminos_luces(puntos, normales, luces, camara_pos,
+                                       material.shininess, esfera)
+    return combinar_terminos(difuso, especular, material, luces, luz_ambiente)
+
+
+class CacheSombreado:
+    """
+    Cache de los términos geométricos del sombreado por malla
+    
+    Guarda los arrays (M,K) de terminos_luces, que solo dependen de la
+    geometría, la pose de las luces, la cámara y el brillo del material.
+    El color de las luces (teclas 1-6) y el color y los coeficientes
+    ka/kd/ks del material (temas) entran recién en combinar_terminos, así
+    que cambiarlos no vuelve a sombrear: con cámara y luces quietas un
+    frame es solo la recombinación lineal. El término ambiental es
+    uniforme (ka * ambiente) y no necesita guardarse por cara.
+    
+    Una entrada solo es válida mientras los arrays de origen sean los
+    mismos objetos (las mallas y los nodos de escena los reemplazan al
+    cambiar su versión).
+    """
+    
+    def __init__(self, decimales=6):
+        """
+        Args:
+            decimales: Redondeo de posiciones y direcciones al formar la clave
+        """
+        self.decimales = decimales
+        self._por_malla = {}
+    
+    def obtener(self, clave, puntos, normales, luces, camara_pos, shininess, indices=None,
+                esfera=None):
+        """
+        Retorna los términos (difuso, especular) de una malla, recalculándolos
+        solo si cambió la geometría, las luces, la cámara o el brillo
+        
+        Args:
+            clave: Identificador de la malla
+            puntos: Array (M,3) con los centroides de las caras
+            normales: Array (M,3) con las normales de las caras
+            luces: Lista de Luz
+            camara_pos: Posición de la cámara
+            shininess: Brillo especular del material
+            indices: Caras a sombrear (p. ej. las frontales), o None para todas
+            esfera: Esfera envolvente para descartar spotlights (no forma parte
+                    de la clave: solo evita cálculos, no cambia el resultado)
+        
+        Returns:
+            Tupla (difuso, especular) de arrays (M,K), ver terminos_luces
+        """
+        origen = (puntos, normales, indices)
+        parametros = (tuple(luz.pose(self.decimales) for luz in luces),
+                      tuple(round(float(c), self.decimales) + 0.0 for c in camara_pos),
+                      shininess)
+        
+        entrada = self._por_malla.get(clave)
+        if entrada is not None:
+            origen_guardado, parametros_guardados, terminos = entrada
+            if (all(a is b for a, b in zip(origen_guardado, origen))
+                    and parametros_guardados == parametros):
+                return terminos
+        
+        if indices is not None:
+            puntos, normales = puntos[indices], normales[indices]
+        terminos = terminos_luces(puntos, normales, luces, camara_pos, shininess, esfera)
+        self._por_malla[clave] = (origen, parametros, terminos)
+        return terminos
+    
+    def limpiar(self):
+        """Descarta todos los términos guardados"""
+        self._por_malla.clear()
@@ -0,0 +1,155 @@
+"""
+Módulo: lod.py
+Niveles de detalle (LOD): varias teselaciones de cada componente y
+selección del nivel según la distancia y el tamaño proyectado en pantalla
+"""
+
+import math
+
+import numpy as np
+
+from geometry import Malla
+
+
+# Factores aplicados a los parámetros "segmentos*" de cada generador,
+# del nivel más denso (0) al más simple
+FACTORES_LOD = (2.0, 1.0, 0.5, 0.25)
+
+# Diámetro proyectado mínimo (en píxeles) para usar cada nivel; el último
+# nivel se usa por debajo del último umbral
+UMBRALES_LOD_PX = (700.0, 350.0, 150.0)
+
+# Fracción de margen para no alternar de nivel en el borde de un umbral
+HISTERESIS_LOD = 0.15
+
+SEGMENTOS_MINIMOS = 4
+
+
+def parametros_nivel(params, factor):
+    """
+    Escala los parámetros de teselación (los que empiezan con "segmentos")
+    
+    Args:
+        params: Diccionario de parámetros del generador
+        factor: Factor de densidad del nivel
+    
+    Returns:
+        Nuevo diccionario de parámetros
+    """
+    return {clave: (max(SEGMENTOS_MINIMOS, int(round(valor * factor)))
+                    if clave.startswith('segmentos') else valor)
+            for clave, valor in params.items()}
+
+
+def tamano_proyectado(radio, distancia, alto_pantalla, fov_y=45.0):
+    """
+    Diámetro aproximado en píxeles de una esfera vista en perspectiva
+    
+    Args:
+        radio: Radio de la esfera envolvente
+        distancia: Distancia de la cámara al centro de la esfera
+        alto_pantalla: Alto del viewport en píxeles
+        fov_y: Campo de visión vertical en grados
+    
+    Returns:
+        Diámetro proyectado en píxeles
+    """
+    distancia = max(distancia, 1e-6)
+    return (2.0 * radio / distancia) * (alto_pantalla / 2.0) / math.tan(math.radians(fov_y) / 2.0)
+
+
+class ConjuntoLOD:
+    """
+    Teselaciones de un mismo componente, de la más densa a la más simple
+    
+    Cada nivel es una Malla. El nivel activo
+    se elige con el tamaño proyectado de la esfera envolvente y cambia con
+    histéresis: para pasar a un nivel más denso hay que superar su umbral
+    por un margen, y para pasar a uno más simple hay que bajar del umbral
+    del nivel actual por el mismo margen. Un salto grande de zoom puede
+    cruzar varios umbrales en un solo frame.
+    """
+    
+    def __init__(self, niveles, centro=(0.0, 0.0, 0.0), radio=1.0,
+                 umbrales=UMBRALES_LOD_PX, histeresis=HISTERESIS_LOD):
+        self.niveles = list(niveles)
+        self.centro = np.asarray(centro, dtype=np.float64)
+        self.radio = radio
+        self.umbrales = tuple(umbrales)[:max(0, len(self.niveles) - 1)]
+        self.histeresis = histeresis
+        self.nivel = min(1, len(self.niveles) - 1)
+    
+    def _nivel_objetivo(self, tamano_px):
+        for nivel, umbral in enumerate(self.umbrales):
+            if tamano_px >= umbral:
+                return nivel
+        return len(self.umbrales)
+    
+    def seleccionar(self, camara_pos, alto_pantalla, fov_y=45.0):
+        """
+        Actualiza y retorna el nivel activo para la posición de cámara dada
+        
+        Args:
+            camara_pos: Posición de la cámara en el espacio de la malla
+            alto_pantalla: Alto del viewport en píxeles
+            fov_y: Campo de visión vertical en grados
+        
+        Returns:
+            Índice del nivel activo
+        """
+        if len(self.niveles) <= 1:
+            return 0
+        
+        distancia = float(np.linalg.norm(np.asarray(camara_pos) - self.centro))
+        tamano_px = tamano_proyectado(self.radio, distancia, alto_pantalla, fov_y)
+        objetivo = self._nivel_objetivo(tamano_px)
+        
+        if objetivo < self.nivel:
+            # Más detalle: el nivel más denso cuyo umbral se supera con margen
+            for nivel in range(objetivo, self.nivel):
+                if tamano_px >= self.umbrales[nivel] * (1.0 + self.histeresis):
+                    self.nivel = nivel
+                    break
+        elif objetivo > self.nivel:
+            # Menos detalle: el nivel más simple cuyo umbral superior (el del
+            # nivel anterior) quedó atrás con margen
+            for nivel in range(objetivo, self.nivel, -1):
+                if tamano_px < self.umbrales[nivel - 1] * (1.0 - self.histeresis):
+                    self.nivel = nivel
+                    break
+        
+        return self.nivel
+    
+    def malla(self, nivel=None):
+        """Retorna la Malla del nivel indicado o del activo"""
+        return self.niveles[self.nivel if nivel is None else nivel]
+
+
+def crear_conjunto_lod(generador, params, cache_geometria, matriz=None, factores=FACTORES_LOD,
+                       radio=None):
+    """
+    Genera (o carga de la cache en disco) todos los niveles de un componente
+    
+    Args:
+        generador: Función generadora de geometry.py
+        params: Parámetros del nivel base (factor 1.0)
+        cache_geometria: CacheGeometria usada para generar/cargar cada nivel
+        matriz: Matriz 4x4 aplicada a los vértices (opcional)
+        factores: Factores de densidad por nivel
+        radio: Radio de la esfera (centrada en el origen) con que se elige el
+            nivel; por defecto el de la malla base. Las piezas de un mismo
+            objeto deben compartirlo para cambiar de nivel juntas
+    
+    Returns:
+        ConjuntoLOD; los generadores sin parámetros "segmentos*" tienen un solo nivel
+    """
+    if not any(clave.startswith('segmentos') for clave in params):
+        factores = (1.0,)
+    
+    niveles = [Malla(*cache_geometria.obtener(generador, parametros_nivel(params, factor), matriz))
+               for factor in factores]
+    
+    if radio is None:
+        vertices_base = niveles[factores.index(1.0) if 1.0 in factores else 0].vertices
+        radio = float(np.linalg.norm(vertices_base, axis=1).max()) if len(vertices_base) else 0.0
+    return ConjuntoLOD(niveles, radio=radio)
@@ -4,6 +4,8 @@ Versión 5.1: Spotlight + Temas de Color + Múltiples Luces
 Programa principal
 """
 
+import os
+import time
 import pygame
 from pygame.locals import *
 from OpenGL.GL import *
@@ -11,20 +13,43 @@ from OpenGL.GLU import *
 import numpy as np
 
 # Importar módulos del proyecto
-from materials import (MATERIAL_GOMA, MATERIAL_METAL_DORADO, MATERIAL_METAL_OSCURO, 
-                      MATERIAL_BANDA_ROJA, MATERIAL_TORNILLOS, 
-                      MATERIAL_ANILLO_HUB, MATERIAL_DISCO_RELLENO, 
-                      MATERIAL_SIDEWALL_MARCAS, get_material_neumatico,
-                      TEMAS, COLORES_LUZ, get_tema, get_color_luz)
-from clipping import PlanoClipping, recortar_malla_con_plano
-from geometry import (generar_vertices_cilindro, generar_toroide, 
-                     generar_radios_aerodinamicos, calcular_normales, generar_piso,
-                     generar_banda_color_neumatico, generar_tornillos_hub, 
-                     generar_anillo_central_hub, generar_disco_relleno,
-                     generar_marcas_sidewall)
-from rendering import (dibujar_malla_phong, dibujar_malla_spotlight, 
-                      dibujar_wireframe, dibujar_plano_corte_z)
-from transforms import (matriz_rotacion_x, aplicar_transformacion)
+from materials import TEMAS, COLORES_LUZ, get_tema, get_color_luz
+from clipping import PlanoClipping, CacheRecorte, malla_visible
+from geometry import Malla, ANGULO_CONTORNO, generar_piso_array, GENERADORES_INSTANCIADOS
+from componentes import COMPONENTES_LLANTA, PISO, RADIO_LLANTA
+from lighting import Luz, luces_escena
+from rendering import (dibujar_malla, dibujar_wireframe_malla, dibujar_plano_corte_z,
+                      planos_frustum_actuales, posicion_camara_actual, aplicar_matriz,
+                      establecer_backend, get_backend, liberar_buffers, dibujar_hud,
+                      BACKEND_BUFFERS, BACKEND_INMEDIATO)
+from transforms import matriz_rotacion_x, matriz_rotacion_y, matriz_rotacion_z
+from cache_geometria import CacheGeometria
+from lod import crear_conjunto_lod
+from escena import NodoEscena
+from perfilador import PERFILADOR
+
+
+CARPETA_PERFILES = "perfiles"
+INTERVALO_HUD = 0.5  # Segundos entre actualizaciones del texto del HUD
+
+
+def imagen_hud(fuente, lineas):
+    """
+    Renderiza líneas de texto sobre un fondo semi-transparente
+    
+    Returns:
+        Tupla (bytes RGBA con la fila inferior primero, ancho, alto)
+    """
+    renglones = [fuente.render(linea, True, (230, 230, 230)) for linea in lineas]
+    alto_linea = fuente.get_linesize()
+    ancho = max(renglon.get_width() for renglon in renglones) + 12
+    alto = alto_linea * len(renglones) + 12
+    
+    superficie = pygame.Surface((ancho, alto), pygame.SRCALPHA)
+    superficie.fill((0, 0, 0, 160))
+    for i, renglon in enumerate(renglones):
+        superficie.blit(renglon, (6, 6 + i * alto_linea))
+    return pygame.image.tostring(superficie, 'RGBA', True), ancho, alto
 
 
 def main():
@@ -52,61 +77,43 @@ def main():
     
     print("\n🔧 Generando geometría F1 realista...")
     
-    # Neumático
-    vertices_neumatico_orig, caras_neumatico_orig = generar_toroide(
-        radio_mayor=2.8, radio_menor=0.5, segmentos_mayor=64, segmentos_menor=24
-    )
-    
-    # Banda Pirelli
-    vertices_banda_orig, caras_banda_orig = generar_banda_color_neumatico(
-        radio_mayor=2.8, radio_menor=0.5, posicion_y=0.0, ancho_banda=0.15, segmentos=64
-    )
-    
-    # Rin
-    vertices_rin_orig, caras_rin_orig = generar_vertices_cilindro(2.2, 0.85, 64)
-    
-    # Radios aerodinámicos
-    vertices_radios_orig, caras_radios_orig = generar_radios_aerodinamicos(
-        radio_interno=0.9, radio_externo=2.1, altura=0.8, num_radios=10
-    )
-    
-    # Centro
-    vertices_centro_orig, caras_centro_orig = generar_vertices_cilindro(0.8, 0.75, 32)
-    
-    # Tornillos
-    vertices_tornillos_orig, caras_tornillos_orig = generar_tornillos_hub(
-        radio=0.5, altura=0.8, num_tornillos=5
-    )
-    
-    # Anillo decorativo
-    vertices_anillo_orig, caras_anillo_orig = generar_anillo_central_hub(
-        radio_interno=0.65, radio_externo=0.77, altura=0.78, segmentos=32
-    )
+    # Toda la geometría se rota 90° en X; las mallas ya rotadas (con sus
+    # normales) se guardan en disco y se reutilizan en los siguientes arranques.
+    # Cada componente teselado tiene varios niveles de detalle (LOD); las
+    # piezas repetidas (radios, tornillos, marcas) son un prototipo instanciado
+    matriz_correccion = matriz_rotacion_x(90)
+    cache_geometria = CacheGeometria()
     
-    # Disco relleno
-    vertices_relleno_orig, caras_relleno_orig = generar_disco_relleno(
-        radio_interno=2.2, radio_externo=2.8, altura=0.85, segmentos=64
-    )
+    conjuntos_lod = {}
+    instanciados = {}
+    for nombre, generador, params, *_ in COMPONENTES_LLANTA:
+        if generador in GENERADORES_INSTANCIADOS:
+            instanciados[nombre] = generador(**params).transformar(matriz_correccion)
+        else:
+            conjuntos_lod[nombre] = crear_conjunto_lod(generador, params, cache_geometria,
+                                                       matriz_correccion, radio=RADIO_LLANTA)
     
-    # Marcas sidewall
-    vertices_sidewall_orig, caras_sidewall_orig = generar_marcas_sidewall(
-        radio_mayor=2.8, radio_menor=0.5, num_marcas=12
-    )
+    print(f"💾 Cache de geometría: {cache_geometria.cargadas} mallas cargadas, "
+          f"{cache_geometria.generadas} generadas")
     
-    # Rotar geometría 90° en X
-    matriz_correccion = matriz_rotacion_x(90)
-    vertices_neumatico_orig = aplicar_transformacion(vertices_neumatico_orig, matriz_correccion)
-    vertices_banda_orig = aplicar_transformacion(vertices_banda_orig, matriz_correccion)
-    vertices_rin_orig = aplicar_transformacion(vertices_rin_orig, matriz_correccion)
-    vertices_centro_orig = aplicar_transformacion(vertices_centro_orig, matriz_correccion)
-    vertices_radios_orig = aplicar_transformacion(vertices_radios_orig, matriz_correccion)
-    vertices_tornillos_orig = aplicar_transformacion(vertices_tornillos_orig, matriz_correccion)
-    vertices_anillo_orig = aplicar_transformacion(vertices_anillo_orig, matriz_correccion)
-    vertices_relleno_orig = aplicar_transformacion(vertices_relleno_orig, matriz_correccion)
-    vertices_sidewall_orig = aplicar_transformacion(vertices_sidewall_orig, matriz_correccion)
+    niveles_caras = [sum(conjunto.niveles[min(n, len(conjunto.niveles) - 1)].num_caras
+                         for conjunto in conjuntos_lod.values())
+                     for n in range(max(len(c.niveles) for c in conjuntos_lod.values()))]
+    print(f"🔍 Niveles de detalle: {' / '.join(str(n) for n in niveles_caras)} triángulos")
+    print("🧩 Instancias: " + ", ".join(f"{nombre} {malla.num_instancias}x{len(malla.caras)}"
+                                      for nombre, malla in instanciados.items()))
     
     # Generar piso
-    vertices_piso, caras_piso = generar_piso(ancho=15, profundidad=15, posicion_y=-3.5)
+    piso = Malla(*generar_piso_array(**PISO))
+    
+    # Grafo de escena: el giro de la llanta es la matriz local de su nodo y
+    # los componentes cuelgan de él, así el sombreado usa posiciones y
+    # normales de mundo que incluyen el giro
+    escena = NodoEscena('escena')
+    nodo_piso = escena.agregar_hijo(NodoEscena('piso'))
+    nodo_llanta = escena.agregar_hijo(NodoEscena('llanta'))
+    nodos = {nombre: nodo_llanta.agregar_hijo(NodoEscena(nombre))
+             for nombre, *_ in COMPONENTES_LLANTA}
     
     print("\n" + "="*70)
     print("✅ GEOMETRÍA F1 REALISTA GENERADA")
@@ -118,12 +125,17 @@ def main():
     print("   [1-6] - Cambiar color de luz (blanca/roja/azul/amarilla/verde/morada)")
     print("   [[/]] - Ajustar apertura del spotlight")
     print("   [N] - Volver a luz NORMAL")
+    print("   [G] - Modo GARAGE (luz principal + relleno + linterna)")
     print("\n🎨 TEMAS:")
     print("   [T] - Cambiar tema (Oscuro/Negro/Garage/Claro)")
     print("\n🖼️ RENDERIZADO:")
     print("   [W] - Modo SÓLIDO (Phong shading)")
     print("   [E] - Modo WIREFRAME")
     print("   [Q] - Modo MIXTO")
+    print("   [B] - Alternar envío por buffers / modo inmediato")
+    print("   [F] - Toggle descarte de caras traseras")
+    print("   [O] - Toggle wireframe de CONTORNO (solo aristas marcadas)")
+    print("   [H] - Toggle perfilador + HUD de tiempos por etapa")
     print("\n✂️ CLIPPING:")
     print("   [↑/↓] - Mover plano de corte")
     print("   [C] - Toggle clipping ON/OFF")
@@ -149,6 +161,8 @@ def main():
     last_mouse_x, last_mouse_y = 0, 0
     
     modo_render = "solido"
+    culling_activo = True
+    modo_contorno = False
     clipping_activo = True
     mostrar_plano = True
     posicion_corte = 0.0
@@ -160,7 +174,7 @@ def main():
     mostrar_piso = True
     
     # 🔦 NUEVO: Variables de iluminación
-    modo_luz = "normal"  # "normal", "linterna", o "linterna_libre"
+    modo_luz = "normal"  # "normal", "linterna", "linterna_libre" o "garage"
     color_luz_actual = 'blanca'
     apertura_spotlight = 20.0
     suavizado_spotlight = 5.0
@@ -170,31 +184,22 @@ def main():
     angulo_luz_x = 0.0  # Ángulo vertical de la luz
     angulo_luz_y = 0.0  # Ángulo horizontal de la luz
     
-    # Copias de trabajo
-    vertices_neumatico = vertices_neumatico_orig.copy()
-    caras_neumatico = caras_neumatico_orig.copy()
-    vertices_banda = vertices_banda_orig.copy()
-    caras_banda = caras_banda_orig.copy()
-    vertices_rin = vertices_rin_orig.copy()
-    caras_rin = caras_rin_orig.copy()
-    vertices_centro = vertices_centro_orig.copy()
-    caras_centro = caras_centro_orig.copy()
-    vertices_radios = vertices_radios_orig.copy()
-    caras_radios = caras_radios_orig.copy()
-    vertices_tornillos = vertices_tornillos_orig.copy()
-    caras_tornillos = caras_tornillos_orig.copy()
-    vertices_anillo = vertices_anillo_orig.copy()
-    caras_anillo = caras_anillo_orig.copy()
-    vertices_relleno = vertices_relleno_orig.copy()
-    caras_relleno = caras_relleno_orig.copy()
-    vertices_sidewall = vertices_sidewall_orig.copy()
-    caras_sidewall = caras_sidewall_orig.copy()
+    # Cache de recortes por componente y nivel de detalle
+    cache_recorte = CacheRecorte(capacidad=8)
+    nivel_lod_mostrado = None
+    
+    # Perfilador: el HUD se vuelve a renderizar cada INTERVALO_HUD segundos
+    fuente_hud = pygame.font.SysFont("monospace", 14)
+    hud = None
+    ultimo_hud = 0.0
     
     clock = pygame.time.Clock()
     running = True
     
     # Bucle principal
     while running:
+        PERFILADOR.iniciar_frame()
+        
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 running = False
@@ -213,6 +218,22 @@ def main():
                 elif event.key == pygame.K_q:
                     modo_render = "mixto"
                     print("🎨🔲 Modo: MIXTO")
+                elif event.key == pygame.K_b:
+                    if get_backend() == BACKEND_BUFFERS:
+                        establecer_backend(BACKEND_INMEDIATO)
+                    else:
+                        establecer_backend(BACKEND_BUFFERS)
+                    print(f"🧱 Envío a GPU: {get_backend().upper()}")
+                elif event.key == pygame.K_f:
+                    culling_activo = not culling_activo
+                    print(f"🙈 Caras traseras: {'DESCARTADAS' if culling_activo else 'DIBUJADAS'}")
+                elif event.key == pygame.K_h:
+                    activo = PERFILADOR.alternar()
+                    hud = None
+                    print(f"⏱️ Perfilador: {'ON' if activo else 'OFF'}")
+                elif event.key == pygame.K_o:
+                    modo_contorno = not modo_contorno
+                    print(f"✏️ Wireframe: {'CONTORNO' if modo_contorno else 'COMPLETO'}")
                 
                 # 🔦 NUEVO: Controles de iluminación
                 elif event.key == pygame.K_l:
@@ -227,6 +248,10 @@ def main():
                     modo_luz = "normal"
                     luz_libre_activa = False
                     print(f"💡 Luz: NORMAL")
+                elif event.key == pygame.K_g:
+                    modo_luz = "garage"
+                    luz_libre_activa = False
+                    print(f"🏁 Luz: GARAGE (principal + relleno + linterna)")
                 
                 # Cambiar color de luz (teclas 1-6)
                 elif event.key == pygame.K_1:
@@ -340,61 +365,65 @@ def main():
             if angulo_rotacion_llanta >= 360:
                 angulo_rotacion_llanta -= 360
         
-        # Aplicar clipping
-        if clipping_activo:
-            plano = PlanoClipping(0, 0, 1, -posicion_corte)
+        nodo_llanta.establecer_local(matriz_rotacion_z(angulo_rotacion_llanta))
+        
+        # Posición de la cámara en el espacio de la escena (inversa de la vista)
+        camara_escena = (matriz_rotacion_y(-angulo_y) @ matriz_rotacion_x(-angulo_x)
+                         @ np.array([0.0, 0.0, -zoom, 1.0]))[:3]
+        
+        # Elegir nivel de detalle y aplicar clipping (los recortes se
+        # reutilizan mientras el plano y el nivel no cambien)
+        plano = PlanoClipping(0, 0, 1, -posicion_corte) if clipping_activo else None
+        geometria = {}
+        origenes = {}
+        with PERFILADOR.etapa('clipping'):
+            for nombre, conjunto in conjuntos_lod.items():
+                nivel = conjunto.seleccionar(camara_escena, display[1])
+                origenes[nombre] = conjunto.malla(nivel)
+                if clipping_activo:
+                    geometria[nombre] = cache_recorte.obtener_malla((nombre, nivel),
+                                                                    origenes[nombre], plano)
+                else:
+                    geometria[nombre] = origenes[nombre]
             
-            vertices_neumatico, caras_neumatico = recortar_malla_con_plano(
-                vertices_neumatico_orig, caras_neumatico_orig, plano)
-            vertices_banda, caras_banda = recortar_malla_con_plano(
-                vertices_banda_orig, caras_banda_orig, plano)
-            vertices_rin, caras_rin = recortar_malla_con_plano(
-                vertices_rin_orig, caras_rin_orig, plano)
-            vertices_centro, caras_centro = recortar_malla_con_plano(
-                vertices_centro_orig, caras_centro_orig, plano)
-            vertices_radios, caras_radios = recortar_malla_con_plano(
-                vertices_radios_orig, caras_radios_orig, plano)
-            vertices_tornillos, caras_tornillos = recortar_malla_con_plano(
-                vertices_tornillos_orig, caras_tornillos_orig, plano)
-            vertices_anillo, caras_anillo = recortar_malla_con_plano(
-                vertices_anillo_orig, caras_anillo_orig, plano)
-            vertices_relleno, caras_relleno = recortar_malla_con_plano(
-                vertices_relleno_orig, caras_relleno_orig, plano)
-            vertices_sidewall, caras_sidewall = recortar_malla_con_plano(
-                vertices_sidewall_orig, caras_sidewall_orig, plano)
-        else:
-            vertices_neumatico = vertices_neumatico_orig
-            caras_neumatico = caras_neumatico_orig
-            vertices_banda = vertices_banda_orig
-            caras_banda = caras_banda_orig
-            vertices_rin = vertices_rin_orig
-            caras_rin = caras_rin_orig
-            vertices_centro = vertices_centro_orig
-            caras_centro = caras_centro_orig
-            vertices_radios = vertices_radios_orig
-            caras_radios = caras_radios_orig
-            vertices_tornillos = vertices_tornillos_orig
-            caras_tornillos = caras_tornillos_orig
-            vertices_anillo = vertices_anillo_orig
-            caras_anillo = caras_anillo_orig
-            vertices_relleno = vertices_relleno_orig
-            caras_relleno = caras_relleno_orig
-            vertices_sidewall = vertices_sidewall_orig
-            caras_sidewall = caras_sidewall_orig
+            for nombre, instancias in instanciados.items():
+                origenes[nombre] = instancias.expandir_malla()
+                if clipping_activo:
+                    geometria[nombre] = cache_recorte.obtener_instanciada(nombre, instancias, plano)
+                else:
+                    geometria[nombre] = origenes[nombre]
         
-        # Calcular normales
-        normales_neumatico = calcular_normales(vertices_neumatico, caras_neumatico)
-        normales_banda = calcular_normales(vertices_banda, caras_banda)
-        normales_rin = calcular_normales(vertices_rin, caras_rin)
-        normales_centro = calcular_normales(vertices_centro, caras_centro)
-        normales_radios = calcular_normales(vertices_radios, caras_radios)
-        normales_tornillos = calcular_normales(vertices_tornillos, caras_tornillos)
-        normales_anillo = calcular_normales(vertices_anillo, caras_anillo)
-        normales_relleno = calcular_normales(vertices_relleno, caras_relleno)
-        normales_sidewall = calcular_normales(vertices_sidewall, caras_sidewall)
+        # Las normales por cara se calculan bajo demanda; se piden aquí para
+        # que su coste quede en su propia etapa y no dentro del dibujo
+        with PERFILADOR.etapa('normales'):
+            for malla in geometria.values():
+                malla.normales
         
-        if mostrar_piso:
-            normales_piso = calcular_normales(vertices_piso, caras_piso)
+        if PERFILADOR.activo:
+            PERFILADOR.contar('triangulos_entrada', sum(m.num_caras for m in origenes.values()))
+            PERFILADOR.contar('triangulos_salida', sum(m.num_caras for m in geometria.values()))
+        
+        # Back-face culling: solo para mallas cerradas (orientación ±1). Una
+        # malla recortada sigue ocultando sus caras traseras mientras la cámara
+        # esté del lado que se conserva (el rayo hacia cualquier cara trasera
+        # cruza primero una cara frontal que no se recortó); vista desde el
+        # lado del corte, el interior queda expuesto y se dibuja completo
+        orientaciones = {}
+        corte_visible = clipping_activo and plano.distancia(camara_escena) < 0
+        for nombre, malla in geometria.items():
+            recortada = malla is not origenes[nombre]
+            if culling_activo and not (recortada and corte_visible):
+                orientaciones[nombre] = origenes[nombre].orientacion
+            else:
+                orientaciones[nombre] = 0
+        
+        nivel_lod = conjuntos_lod['neumatico'].nivel
+        if nivel_lod != nivel_lod_mostrado:
+            nivel_lod_mostrado = nivel_lod
+            print(f"🔍 LOD: nivel {nivel_lod} "
+                  f"({sum(malla.num_caras for malla in geometria.values())} triángulos)")
+        
+        angulo_contorno = ANGULO_CONTORNO if modo_contorno else None
         
         # Renderizar
         glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
@@ -405,29 +434,11 @@ def main():
         glRotatef(angulo_y, 0, 1, 0)
         
         # 💡 Configurar luz según modo
-        camara_pos = np.array([0.0, 0.0, -zoom])
+        camara_pos = camara_escena
         luz_color = get_color_luz(color_luz_actual)
         
-        # 🎯 Calcular posición y dirección de la luz según el modo
-        if modo_luz == "linterna":
-            # 🔦 Modo linterna fija: luz sale DESDE la cámara hacia adelante
-            # La luz está en la posición de la cámara
-            luz_pos = camara_pos.copy()
-            
-            # Dirección: hacia donde mira la cámara (considerando rotaciones)
-            # Calcular vector "adelante" considerando las rotaciones de la vista
-            rad_x = np.radians(angulo_x)
-            rad_y = np.radians(angulo_y)
-            
-            # Vector adelante después de aplicar rotaciones (dirección de vista)
-            luz_dir = np.array([
-                np.sin(np.radians(angulo_y)),
-                -np.sin(np.radians(angulo_x)),
-                np.cos(np.radians(angulo_y)) * np.cos(np.radians(angulo_x))
-            ])
-            luz_dir = luz_dir / np.linalg.norm(luz_dir)
-            
-        elif luz_libre_activa:
+        # 🎯 Armar la lista de luces según el modo
+        if luz_libre_activa:
             # 🎯 Modo linterna libre: luz desde arriba, dirección controlable
             luz_pos = np.array([10.0, 10.0, 10.0])
             
@@ -441,76 +452,78 @@ def main():
                 -np.cos(rad_y) * np.cos(rad_x)
             ])
             luz_dir = luz_dir / np.linalg.norm(luz_dir)
+            
+            luces = [Luz.linterna(luz_pos, luz_dir, luz_color,
+                                  apertura_spotlight, suavizado_spotlight)]
+            luz_ambiente = np.array([0.03, 0.03, 0.03])
         else:
-            # 💡 Modo normal: luz estática desde arriba
-            luz_pos = np.array([10.0, 10.0, 10.0])
-            luz_dir = np.array([0.0, 0.0, -1.0])
+            # 🔦 Linterna fija (desde la cámara), 🏁 garage o 💡 normal
+            luces, luz_ambiente = luces_escena(modo_luz, camara_pos, luz_color,
+                                               apertura_spotlight, suavizado_spotlight)
         
         # Plano de corte
         if mostrar_plano and clipping_activo:
             dibujar_plano_corte_z(posicion_corte)
         
-        # Piso
-        if mostrar_piso:
+        # Piso (se descarta si queda fuera del frustum)
+        if mostrar_piso and malla_visible(piso, planos_frustum_actuales()):
             material_piso = tema_config['piso']
             if modo_render == "solido" or modo_render == "mixto":
-                if modo_luz in ["linterna", "linterna_libre"]:
-                    dibujar_malla_spotlight(vertices_piso, caras_piso, normales_piso,
-                                          material_piso, luz_pos, luz_dir, camara_pos,
-                                          luz_color, apertura=apertura_spotlight,
-                                          suavizado=suavizado_spotlight)
-                else:
-                    dibujar_malla_phong(vertices_piso, caras_piso, normales_piso,
-                                       material_piso, luz_pos, camara_pos, luz_color)
+                dibujar_malla(piso, material_piso, luces, camara_pos, luz_ambiente,
+                              clave='piso', datos_sombreado=nodo_piso.datos_sombreado(piso),
+                              esfera=nodo_piso.esfera_mundo(piso))
             if modo_render == "wireframe" or modo_render == "mixto":
-                dibujar_wireframe(vertices_piso, caras_piso, [0.3, 0.3, 0.3], 2.0)
+                dibujar_wireframe_malla(piso, [0.3, 0.3, 0.3], 2.0, clave='piso',
+                                        angulo_contorno=angulo_contorno)
         
-        # Llanta con rotación
+        # Llanta con rotación (matriz de mundo de su nodo)
         glPushMatrix()
-        glRotatef(angulo_rotacion_llanta, 0, 0, 1)
+        aplicar_matriz(nodo_llanta.mundo)
         
-        componentes = [
-            (vertices_neumatico, caras_neumatico, normales_neumatico, MATERIAL_GOMA,
-             [0.0, 1.0, 0.0], [0.0, 0.5, 0.0]),
-            (vertices_banda, caras_banda, normales_banda, MATERIAL_BANDA_ROJA,
-             [1.0, 0.0, 0.0], [0.6, 0.0, 0.0]),
-            (vertices_rin, caras_rin, normales_rin, MATERIAL_METAL_DORADO,
-             [1.0, 1.0, 0.0], [0.6, 0.6, 0.0]),
-            (vertices_relleno, caras_relleno, normales_relleno, MATERIAL_DISCO_RELLENO,
-             [0.7, 0.6, 0.2], [0.5, 0.4, 0.15]),
-            (vertices_sidewall, caras_sidewall, normales_sidewall, MATERIAL_SIDEWALL_MARCAS,
-             [0.9, 0.9, 0.9], [0.6, 0.6, 0.6]),
-            (vertices_radios, caras_radios, normales_radios, MATERIAL_METAL_DORADO,
-             [1.0, 1.0, 0.0], [0.6, 0.6, 0.0]),
-            (vertices_anillo, caras_anillo, normales_anillo, MATERIAL_ANILLO_HUB,
-             [0.8, 0.7, 0.3], [0.5, 0.4, 0.2]),
-            (vertices_centro, caras_centro, normales_centro, MATERIAL_METAL_OSCURO,
-             [0.5, 0.5, 0.5], [0.3, 0.3, 0.3]),
-            (vertices_tornillos, caras_tornillos, normales_tornillos, MATERIAL_TORNILLOS,
-             [0.6, 0.6, 0.6], [0.4, 0.4, 0.4]),
-        ]
+        # Frustum en el espacio de la llanta: los componentes que quedan
+        # completamente fuera de la vista no se sombrean ni se dibujan
+        planos_vista = planos_frustum_actuales()
+        ojo_llanta = posicion_camara_actual()
         
-        for verts, faces, norms, mat, wire_pure, wire_mixed in componentes:
-            if len(faces) > 0:
+        for nombre, _, _, mat, wire_pure, wire_mixed in COMPONENTES_LLANTA:
+            malla = geometria[nombre]
+            if malla_visible(malla, planos_vista):
                 if modo_render == "solido" or modo_render == "mixto":
-                    if modo_luz in ["linterna", "linterna_libre"]:
-                        dibujar_malla_spotlight(verts, faces, norms, mat, 
-                                              luz_pos, luz_dir, camara_pos, luz_color,
-                                              apertura=apertura_spotlight,
-                                              suavizado=suavizado_spotlight)
-                    else:
-                        dibujar_malla_phong(verts, faces, norms, mat, 
-                                          luz_pos, camara_pos, luz_color)
+                    dibujar_malla(malla, mat, luces, camara_pos, luz_ambiente, clave=nombre,
+                                  ojo=ojo_llanta, orientacion=orientaciones[nombre],
+                                  datos_sombreado=nodos[nombre].datos_sombreado(malla),
+                                  esfera=nodos[nombre].esfera_mundo(malla))
                 
                 if modo_render == "wireframe" or modo_render == "mixto":
                     color = wire_pure if modo_render == "wireframe" else wire_mixed
-                    dibujar_wireframe(verts, faces, color, 1.5)
+                    dibujar_wireframe_malla(malla, color, 1.5, clave=nombre,
+                                            angulo_contorno=angulo_contorno)
         
         glPopMatrix()
         
-        pygame.display.flip()
+        if PERFILADOR.activo:
+            ahora = time.perf_counter()
+            if (hud is None or ahora - ultimo_hud >= INTERVALO_HUD) and PERFILADOR.frames:
+                lineas = [f"{clock.get_fps():.1f} fps"] + PERFILADOR.resumen()
+                hud = imagen_hud(fuente_hud, lineas)
+                ultimo_hud = ahora
+            if hud is not None:
+                pixeles, ancho_hud, alto_hud = hud
+                dibujar_hud(pixeles, ancho_hud, alto_hud, 10, display[1] - alto_hud - 10)
+        
+        with PERFILADOR.etapa('flip'):
+            pygame.display.flip()
+        PERFILADOR.terminar_frame()
         clock.tick(60)
     
+    if PERFILADOR.frames:
+        os.makedirs(CARPETA_PERFILES, exist_ok=True)
+        base = os.path.join(CARPETA_PERFILES, time.strftime("perfil_%Y%m%d_%H%M%S"))
+        PERFILADOR.guardar_csv(base + ".csv")
+        PERFILADOR.guardar_json(base + ".json")
+        print(f"⏱️ Perfil guardado en {base}.csv / .json ({PERFILADOR.frames} frames)")
+    
+    liberar_buffers()
     pygame.quit()
     print("\n👋 Programa finalizado\n")
 
@@ -0,0 +1,196 @@
+"""
+Módulo: perfilador.py
+Perfilador por etapas del frame: tiempo de pared de cada etapa, contadores
+(triángulos antes y después del clipping, llamadas a OpenGL) y percentiles
+móviles, con volcado a CSV/JSON
+"""
+
+import contextlib
+import csv
+import json
+import time
+from collections import deque
+
+import numpy as np
+
+
+VENTANA_PERCENTILES = 240   # Frames que entran en los percentiles móviles (~4 s a 60 fps)
+MAXIMO_HISTORIAL = 36000    # Frames que se guardan para el volcado (~10 min a 60 fps)
+PERCENTILES = (50, 95, 99)
+
+# Contexto vacío que se reutiliza cuando el perfilador está apagado
+_ETAPA_NULA = contextlib.nullcontext()
+
+
+class _Etapa:
+    """Mide una etapa con `with` y suma su duración al frame en curso"""
+    
+    __slots__ = ('perfilador', 'nombre', 'inicio')
+    
+    def __init__(self, perfilador, nombre):
+        self.perfilador = perfilador
+        self.nombre = nombre
+        self.inicio = 0.0
+    
+    def __enter__(self):
+        self.inicio = time.perf_counter()
+        return self
+    
+    def __exit__(self, *excepcion):
+        tiempos = self.perfilador._tiempos
+        tiempos[self.nombre] = tiempos.get(self.nombre, 0.0) + time.perf_counter() - self.inicio
+        return False
+
+
+class Perfilador:
+    """
+    Tiempos y contadores por etapa de cada frame
+    
+    Las etapas se miden con `with perfilador.etapa('nombre'):` y los
+    contadores con `perfilador.contar('nombre', n)`. Una etapa que se
+    repite en el frame (p. ej. el sombreado de cada componente) acumula
+    su tiempo, y las etapas anidadas se miden de forma inclusiva.
+    
+    Apagado, `etapa` retorna siempre el mismo contexto vacío y `contar`
+    retorna de inmediato, así que los puntos de medición pueden quedarse en
+    el código sin costo apreciable.
+    """
+    
+    def __init__(self, activo=False, ventana=VENTANA_PERCENTILES, maximo_historial=MAXIMO_HISTORIAL):
+        """
+        Args:
+            activo: Si empieza midiendo
+            ventana: Frames recientes usados para los percentiles
+            maximo_historial: Frames que se guardan para guardar_csv/guardar_json
+        """
+        self.activo = activo
+        self.ventana = ventana
+        self._tiempos = {}
+        self._contadores = {}
+        self._inicio_frame = None
+        self._recientes = {}  # nombre -> deque de milisegundos
+        self.historial = deque(maxlen=maximo_historial)
+        self.frames = 0
+    
+    def alternar(self):
+        """Enciende o apaga la medición; retorna el nuevo estado"""
+        self.activo = not self.activo
+        self._inicio_frame = None
+        return self.activo
+    
+    def etapa(self, nombre):
+        """Context manager que mide una etapa del frame en curso"""
+        if not self.activo:
+            return _ETAPA_NULA
+        return _Etapa(self, nombre)
+    
+    def contar(self, nombre, cantidad=1):
+        """Suma `cantidad` a un contador del frame en curso"""
+        if not self.activo:
+            return
+        self._contadores[nombre] = self._contadores.get(nombre, 0) + cantidad
+    
+    def iniciar_frame(self):
+        """Marca el comienzo de un frame"""
+        if not self.activo:
+            return
+        self._tiempos = {}
+        self._contadores = {}
+        self._inicio_frame = time.perf_counter()
+    
+    def terminar_frame(self):
+        """Cierra el frame en curso y lo agrega a los percentiles y al historial"""
+        if not self.activo or self._inicio_frame is None:
+            return
+        total = time.perf_counter() - self._inicio_frame
+        self._inicio_frame = None
+        
+        # Las etapas conocidas que no corrieron este frame (p. ej. las normales
+        # con la cache llena) cuentan como 0 ms, así todas las ventanas cubren
+        # los mismos frames; una etapa nueva empieza con ceros en los anteriores
+        etapas = dict.fromkeys(self._recientes, 0.0)
+        etapas.update((nombre, segundos * 1000.0) for nombre, segundos in self._tiempos.items())
+        etapas['frame'] = total * 1000.0
+        for nombre, ms in etapas.items():
+            if nombre not in self._recientes:
+                self._recientes[nombre] = deque([0.0] * min(self.frames, self.ventana),
+                                                maxlen=self.ventana)
+            self._recientes[nombre].append(ms)
+        
+        self.frames += 1
+        self.historial.append({'frame': self.frames, 'etapas_ms': etapas,
+                               'contadores': dict(self._contadores)})
+    
+    # ========== CONSULTAS ==========
+    
+    def percentiles(self, nombre):
+        """
+        Percentiles móviles de una etapa
+        
+        Returns:
+            Diccionario {'p50': ms, 'p95': ms, 'p99': ms} (vacío si no hay datos)
+        """
+        valores = self._recientes.get(nombre)
+        if not valores:
+            return {}
+        resultado = np.percentile(np.fromiter(valores, dtype=np.float64), PERCENTILES)
+        return {f"p{p}": float(v) for p, v in zip(PERCENTILES, resultado)}
+    
+    def etapas(self):
+        """Nombres de las etapas medidas, en orden de aparición"""
+        return list(self._recientes)
+    
+    def ultimos_contadores(self):
+        """Contadores del último frame cerrado"""
+        return dict(self.historial[-1]['contadores']) if self.historial else {}
+    
+    def resumen(self):
+        """
+        Líneas de texto con los percentiles de cada etapa y los contadores
+        del último frame (para el HUD o la consola)
+        """
+        lineas = [f"{'etapa':<14}{'p50':>8}{'p95':>8}{'p99':>8}  ms"]
+        for nombre in self.etapas():
+            p = self.percentiles(nombre)
+            lineas.append(f"{nombre:<14}{p['p50']:>8.2f}{p['p95']:>8.2f}{p['p99']:>8.2f}")
+        contadores = self.ultimos_contadores()
+        if contadores:
+            lineas.append("")
+            lineas.extend(f"{nombre:<22}{valor:>10}" for nombre, valor in contadores.items())
+        return lineas
+    
+    # ========== VOLCADO ==========
+    
+    def _columnas(self):
+        etapas, contadores = {}, {}
+        for registro in self.historial:
+            etapas.update(dict.fromkeys(registro['etapas_ms']))
+            contadores.update(dict.fromkeys(registro['contadores']))
+        return list(etapas), list(contadores)
+    
+    def guardar_csv(self, ruta):
+        """Escribe un renglón por frame: tiempos de cada etapa (ms) y contadores"""
+        etapas, contadores = self._columnas()
+        with open(ruta, 'w', newline='', encoding='utf-8') as archivo:
+            escritor = csv.writer(archivo)
+            escritor.writerow(['frame'] + [f"{nombre}_ms" for nombre in etapas] + contadores)
+            for registro in self.historial:
+                escritor.writerow(
+                    [registro['frame']]
+                    + [f"{registro['etapas_ms'].get(nombre, 0.0):.4f}" for nombre in etapas]
+                    + [registro['contadores'].get(nombre, 0) for nombre in contadores])
+    
+    def guardar_json(self, ruta):
+        """Escribe los percentiles de cada etapa y el historial completo"""
+        etapas, _ = self._columnas()
+        datos = {
+            'frames': self.frames,
+            'percentiles_ms': {nombre: self.percentiles(nombre) for nombre in etapas},
+            'historial': list(self.historial),
+        }
+        with open(ruta, 'w', encoding='utf-8') as archivo:
+            json.dump(datos, archivo, indent=1)
+
+
+# Perfilador compartido por main.py, rendering.py y clipping.py
+PERFILADOR = Perfilador()
@@ -0,0 +1,308 @@
+"""
+Módulo: rasterizador.py
+Rasterizador por software en NumPy: dibuja las mismas mallas y colores por
+cara que rendering.py, pero sobre arrays (z-buffer + RGB) en lugar de una
+ventana de OpenGL, para renderizar sin pantalla
+"""
+
+import struct
+import zlib
+
+import numpy as np
+
+from transforms import matriz_traslacion, matriz_rotacion_x, matriz_rotacion_y
+
+
+ANCHO_DEFECTO = 1200
+ALTO_DEFECTO = 900
+TAMANO_TILE = 8  # Lado en píxeles de cada tile de la pantalla
+
+# Máximo de evaluaciones (triángulo x píxel) por lote de tiles; acota la
+# memoria de los arrays temporales de las funciones de arista
+MAXIMO_EVALUACIONES = 1 << 20
+
+
+# ========== MATRICES DE CÁMARA ==========
+
+def matriz_perspectiva(fov_y, aspecto, cerca, lejos):
+    """
+    Matriz de proyección en perspectiva (la misma que gluPerspective)
+    
+    Args:
+        fov_y: Campo de visión vertical en grados
+        aspecto: Relación ancho / alto
+        cerca, lejos: Distancias a los planos near y far
+    
+    Returns:
+        Matriz 4x4 de proyección
+    """
+    f = 1.0 / np.tan(np.radians(fov_y) / 2.0)
+    M = np.zeros((4, 4))
+    M[0, 0] = f / aspecto
+    M[1, 1] = f
+    M[2, 2] = (lejos + cerca) / (cerca - lejos)
+    M[2, 3] = 2.0 * lejos * cerca / (cerca - lejos)
+    M[3, 2] = -1.0
+    return M
+
+
+def matriz_vista(angulo_x, angulo_y, zoom):
+    """
+    Matriz de vista de la cámara orbital de main.py
+    (glTranslatef(0, 0, zoom); glRotatef(angulo_x, 1, 0, 0); glRotatef(angulo_y, 0, 1, 0))
+    
+    Args:
+        angulo_x, angulo_y: Ángulos de la vista en grados
+        zoom: Desplazamiento de la cámara en Z (negativo)
+    
+    Returns:
+        Matriz 4x4 de vista
+    """
+    return matriz_traslacion(0.0, 0.0, zoom) @ matriz_rotacion_x(angulo_x) @ matriz_rotacion_y(angulo_y)
+
+
+# ========== RASTERIZADOR ==========
+
+class Rasterizador:
+    """
+    Rasterizador de triángulos con color plano por cara
+    
+    Los triángulos se proyectan en bloque y se reparten en tiles de
+    TAMANO_TILE píxeles según su caja envolvente en pantalla. Cada par
+    (triángulo, tile) evalúa las tres funciones de arista y el plano de
+    profundidad contra todos los píxeles del tile, muchos tiles por lote,
+    y cada tile se queda con el más cercano por píxel. La prueba de
+    profundidad es estricta (como GL_LESS), así que ante un empate gana el
+    triángulo dibujado primero.
+    
+    Los triángulos con algún vértice detrás del plano near se descartan
+    enteros (no se recortan).
+    """
+    
+    def __init__(self, ancho=ANCHO_DEFECTO, alto=ALTO_DEFECTO, fov_y=45.0,
+                 cerca=0.1, lejos=50.0, tamano_tile=TAMANO_TILE):
+        """
+        Args:
+            ancho, alto: Tamaño de la imagen en píxeles
+            fov_y: Campo de visión vertical en grados
+            cerca, lejos: Planos near y far de la proyección
+            tamano_tile: Lado de los tiles en píxeles
+        """
+        self.ancho = ancho
+        self.alto = alto
+        self.cerca = cerca
+        self.tamano_tile = tamano_tile
+        self.proyeccion = matriz_perspectiva(fov_y, ancho / alto, cerca, lejos)
+        self.vista = np.identity(4)
+        
+        self.color = np.zeros((alto, ancho, 3), dtype=np.float32)
+        self.profundidad = np.ones((alto, ancho), dtype=np.float32)
+        self.triangulos_dibujados = 0  # Triángulos que llegaron a rasterizarse
+    
+    def establecer_vista(self, matriz):
+        """Fija la matriz de vista (ver matriz_vista)"""
+        self.vista = np.asarray(matriz, dtype=np.float64)
+    
+    def limpiar(self, fondo=(0.0, 0.0, 0.0)):
+        """Borra el color con el fondo y la profundidad con 1.0 (far)"""
+        self.color[...] = np.asarray(fondo, dtype=np.float32)
+        self.profundidad[...] = 1.0
+        self.triangulos_dibujados = 0
+    
+    def imagen(self):
+        """Retorna la imagen como array uint8 (alto, ancho, 3), fila 0 arriba"""
+        return (np.clip(self.color, 0.0, 1.0) * 255.0 + 0.5).astype(np.uint8)
+    
+    def dibujar_malla(self, malla, colores, modelo=None, caras=None):
+        """
+        Dibuja una Malla con un color por cara
+        
+        Args:
+            malla: Malla a dibujar
+            colores: Array (M,3) con el color de cada cara dibujada
+            modelo: Matriz de modelo 4x4 (identidad por defecto)
+            caras: Subconjunto de caras a dibujar (p. ej. las frontales)
+        """
+        self.dibujar_triangulos(malla.vertices, malla.caras if caras is None else caras,
+                                colores, modelo)
+    
+    def dibujar_triangulos(self, vertices, caras, colores, modelo=None):
+        """
+        Rasteriza triángulos con color plano
+        
+        Args:
+            vertices: Array (N,3) de vértices
+            caras: Array (M,3) de caras
+            colores: Array (M,3) con el color de cada cara
+            modelo: Matriz de modelo 4x4 (identidad por defecto)
+        """
+        caras = np.asarray(caras, dtype=np.int64).reshape(-1, 3)
+        if len(caras) == 0:
+            return
+        colores = np.asarray(colores, dtype=np.float32).reshape(-1, 3)
+        
+        mvp = self.proyeccion @ self.vista
+        if modelo is not None:
+            mvp = mvp @ np.asarray(modelo, dtype=np.float64)
+        
+        # Vértices a clip space y luego a pantalla (y hacia abajo, fila 0 arriba)
+        clip = np.asarray(vertices, dtype=np.float64) @ mvp[:, :3].T + mvp[:, 3]
+        w = clip[:, 3]
+        w_seguro = np.where(w > 0.0, w, 1.0)
+        x = (clip[:, 0] / w_seguro * 0.5 + 0.5) * self.ancho
+        y = (0.5 - clip[:, 1] / w_seguro * 0.5) * self.alto
+        z = clip[:, 2] / w_seguro * 0.5 + 0.5
+        
+        # Descartar triángulos que cruzan el plano near
+        validos = np.all(w[caras] >= self.cerca, axis=1)
+        caras, colores = caras[validos], colores[validos]
+        
+        tx, ty, tz = x[caras], y[caras], z[caras]
+        self._rasterizar(tx, ty, tz, colores)
+    
+    def _rasterizar(self, tx, ty, tz, colores):
+        """
+        Setup de triángulos, reparto en tiles y recorrido de los tiles
+        
+        Args:
+            tx, ty, tz: Arrays (M,3) con x, y (píxeles) y profundidad de cada vértice
+            colores: Array (M,3) con el color de cada triángulo
+        """
+        # Área doble con signo; los triángulos degenerados se descartan
+        area = ((tx[:, 1] - tx[:, 0]) * (ty[:, 2] - ty[:, 0])
+                - (tx[:, 2] - tx[:, 0]) * (ty[:, 1] - ty[:, 0]))
+        
+        # Píxeles cuyo centro (i + 0.5) cae dentro de la caja envolvente
+        px_min = np.maximum(np.ceil(tx.min(axis=1) - 0.5), 0).astype(np.int64)
+        px_max = np.minimum(np.floor(tx.max(axis=1) - 0.5), self.ancho - 1).astype(np.int64)
+        py_min = np.maximum(np.ceil(ty.min(axis=1) - 0.5), 0).astype(np.int64)
+        py_max = np.minimum(np.floor(ty.max(axis=1) - 0.5), self.alto - 1).astype(np.int64)
+        
+        visibles = (area != 0.0) & (px_min <= px_max) & (py_min <= py_max) & (tz.min(axis=1) < 1.0)
+        if not np.any(visibles):
+            return
+        tx, ty, tz, area, colores = tx[visibles], ty[visibles], tz[visibles], area[visibles], colores[visibles]
+        px_min, px_max, py_min, py_max = px_min[visibles], px_max[visibles], py_min[visibles], py_max[visibles]
+        self.triangulos_dibujados += len(area)
+        
+        # Funciones de arista E_i(x, y) = A_i x + B_i y + C_i (arista opuesta al
+        # vértice i), con el signo del área para que el interior sea E >= 0
+        signo = np.sign(area)[:, None]
+        siguiente = [1, 2, 0]
+        anterior = [2, 0, 1]
+        A = -(ty[:, anterior] - ty[:, siguiente]) * signo
+        B = (tx[:, anterior] - tx[:, siguiente]) * signo
+        C = -(A * tx[:, siguiente] + B * ty[:, siguiente])
+        
+        # Plano de profundidad por coordenadas baricéntricas: z = E·z / área
+        inv_area = (1.0 / np.abs(area))[:, None]
+        zA = np.sum(A * tz, axis=1) * inv_area[:, 0]
+        zB = np.sum(B * tz, axis=1) * inv_area[:, 0]
+        zC = np.sum(C * tz, axis=1) * inv_area[:, 0]
+        
+        # Reparto en tiles: un par (triángulo, tile) por cada tile que toca su caja
+        T = self.tamano_tile
+        tiles_x = (self.ancho + T - 1) // T
+        tx0, tx1 = px_min // T, px_max // T
+        ty0, ty1 = py_min // T, py_max // T
+        nx = tx1 - tx0 + 1
+        cuentas = nx * (ty1 - ty0 + 1)
+        triangulo = np.repeat(np.arange(len(cuentas)), cuentas)
+        desplazamiento = np.arange(len(triangulo)) - np.repeat(np.cumsum(cuentas) - cuentas, cuentas)
+        tile = ((ty0[triangulo] + desplazamiento // nx[triangulo]) * tiles_x
+                + tx0[triangulo] + desplazamiento % nx[triangulo])
+        
+        # Orden estable: dentro de cada tile se respeta el orden de dibujo
+        orden = np.argsort(tile, kind='stable')
+        tile, triangulo = tile[orden], triangulo[orden]
+        
+        # Los tiles se procesan en lotes de hasta `lote` pares (triángulo, tile);
+        # un tile con más triángulos se parte en trozos consecutivos, cada uno
+        # en su propio lote, así que un lote nunca tiene dos trozos del mismo tile
+        lote = max(1, MAXIMO_EVALUACIONES // (T * T))
+        cortes = np.flatnonzero(np.diff(tile)) + 1
+        inicios = np.concatenate(([0], cortes))
+        finales = np.append(cortes, len(tile))
+        
+        inicio_lote = 0
+        for inicio, fin in zip(inicios.tolist(), finales.tolist()):
+            if fin - inicio_lote <= lote:
+                continue  # El tile entra en el lote actual
+            self._rasterizar_lote(tile, triangulo, inicio_lote, inicio, tiles_x,
+                                  A, B, C, zA, zB, zC, colores)
+            inicio_lote = inicio
+            while fin - inicio_lote > lote:
+                self._rasterizar_lote(tile, triangulo, inicio_lote, inicio_lote + lote, tiles_x,
+                                      A, B, C, zA, zB, zC, colores)
+                inicio_lote += lote
+        self._rasterizar_lote(tile, triangulo, inicio_lote, len(tile), tiles_x,
+                              A, B, C, zA, zB, zC, colores)
+    
+    def _rasterizar_lote(self, tile, triangulo, inicio, fin, tiles_x, A, B, C, zA, zB, zC, colores):
+        """
+        Evalúa un lote de pares (triángulo, tile), ordenados por tile, contra
+        todos los píxeles de su tile y resuelve el más cercano por píxel
+        """
+        if fin <= inicio:
+            return
+        T = self.tamano_tile
+        t = triangulo[inicio:fin]
+        tiles = tile[inicio:fin]
+        
+        # Centros de píxel de cada par: (n, T*T)
+        desplazamiento_y, desplazamiento_x = np.divmod(np.arange(T * T), T)
+        fila, columna = np.divmod(tiles, tiles_x)
+        px = (columna * T)[:, None] + desplazamiento_x
+        py = (fila * T)[:, None] + desplazamiento_y
+        cx = px + 0.5
+        cy = py + 0.5
+        
+        dentro = (A[t, 0:1] * cx + B[t, 0:1] * cy + C[t, 0:1]) >= 0.0
+        dentro &= (A[t, 1:2] * cx + B[t, 1:2] * cy + C[t, 1:2]) >= 0.0
+        dentro &= (A[t, 2:3] * cx + B[t, 2:3] * cy + C[t, 2:3]) >= 0.0
+        z = np.where(dentro, zA[t, None] * cx + zB[t, None] * cy + zC[t, None], np.inf)
+        
+        # Mínimo por tile y píxel, y el primer par (en orden de dibujo) que lo alcanza
+        cortes = np.flatnonzero(np.diff(tiles)) + 1
+        inicios = np.concatenate(([0], cortes))
+        conteos = np.diff(np.append(inicios, len(tiles)))
+        z_min = np.minimum.reduceat(z, inicios, axis=0)
+        candidato = np.where(z == np.repeat(z_min, conteos, axis=0),
+                             np.arange(len(t))[:, None], len(t))
+        ganador = np.minimum.reduceat(candidato, inicios, axis=0)
+        
+        # Prueba de profundidad contra el z-buffer (solo píxeles dentro de la imagen)
+        px, py = px[inicios], py[inicios]
+        gana = (px < self.ancho) & (py < self.alto) & np.isfinite(z_min)
+        px, py, z_min, ganador = px[gana], py[gana], z_min[gana], ganador[gana]
+        gana = z_min < self.profundidad[py, px]
+        px, py = px[gana], py[gana]
+        self.profundidad[py, px] = z_min[gana]
+        self.color[py, px] = colores[t[ganador[gana]]]
+
+
+# ========== SALIDA PNG ==========
+
+def guardar_png(ruta, imagen, nivel_compresion=6):
+    """
+    Escribe una imagen RGB uint8 como PNG (solo con zlib, sin pygame ni PIL)
+    
+    Args:
+        ruta: Archivo de salida
+        imagen: Array uint8 (alto, ancho, 3), fila 0 arriba (ver Rasterizador.imagen)
+        nivel_compresion: Nivel de zlib (0-9)
+    """
+    alto, ancho, _ = imagen.shape
+    # Cada fila va precedida del tipo de filtro (0 = sin filtro)
+    filas = np.zeros((alto, 1 + ancho * 3), dtype=np.uint8)
+    filas[:, 1:] = imagen.reshape(alto, ancho * 3)
+    
+    def bloque(tipo, datos):
+        return (struct.pack('>I', len(datos)) + tipo + datos
+                + struct.pack('>I', zlib.crc32(tipo + datos) & 0xFFFFFFFF))
+    
+    with open(ruta, 'wb') as archivo:
+        archivo.write(b'\x89PNG\r\n\x1a\n')
+        archivo.write(bloque(b'IHDR', struct.pack('>IIBBBBB', ancho, alto, 8, 2, 0, 0, 0)))
+        archivo.write(bloque(b'IDAT', zlib.compress(filas.tobytes(), nivel_compresion)))
+        archivo.write(bloque(b'IEND', b''))
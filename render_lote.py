@@ -0,0 +1,324 @@
+"""
+Módulo: render_lote.py
+Render por lotes sin ventana (turntables y comparaciones de compuestos):
+la geometría se genera una vez, se comparte con los procesos trabajadores
+por memoria compartida y cada cuadro se escribe como PNG numerado
+
+Uso:
+    python render_lote.py --cuadros 36 --temas oscuro garage --compuestos soft medium hard
+    python render_lote.py --camara 20 0 -20 --camara 35 90 -14 --cuadros 48 --luz garage
+"""
+
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from materials import TEMAS, MATERIALES_PIRELLI, COLORES_LUZ, get_tema, get_material_neumatico, get_color_luz
+from geometry import Malla, generar_piso_array, mascara_caras_frontales
+from componentes import COMPONENTES_LLANTA, PISO, construir_mallas
+from cache_geometria import CacheGeometria
+from escena import NodoEscena
+from lighting import luces_escena, sombrear_luces
+from rasterizador import Rasterizador, matriz_vista, guardar_png, ANCHO_DEFECTO, ALTO_DEFECTO
+from transforms import matriz_rotacion_x, matriz_rotacion_y, matriz_rotacion_z
+
+
+# ========== GEOMETRÍA EN MEMORIA COMPARTIDA ==========
+
+class GeometriaCompartida:
+    """
+    Vértices, caras y normales de varias mallas en un solo bloque de
+    memoria compartida
+    
+    El proceso principal copia las mallas una vez con crear(); cada
+    trabajador las abre con adjuntar() como vistas de NumPy sobre el mismo
+    bloque, sin copiarlas ni regenerarlas.
+    """
+    
+    ALINEACION = 64  # Bytes; cada array empieza alineado
+    
+    def __init__(self, memoria, descriptor):
+        self.memoria = memoria
+        self.descriptor = descriptor
+    
+    @classmethod
+    def crear(cls, mallas):
+        """
+        Copia las mallas a un bloque nuevo de memoria compartida
+        
+        Args:
+            mallas: Diccionario nombre -> Malla
+        
+        Returns:
+            GeometriaCompartida (el llamador debe liberarla con liberar())
+        """
+        arrays = {nombre: (malla.vertices, malla.caras, malla.normales)
+                  for nombre, malla in mallas.items()}
+        
+        posiciones = {}
+        total = 0
+        for nombre, grupo in arrays.items():
+            posiciones[nombre] = []
+            for array in grupo:
+                total = -(-total // cls.ALINEACION) * cls.ALINEACION
+                posiciones[nombre].append((total, array.shape, array.dtype.str))
+                total += array.nbytes
+        
+        memoria = shared_memory.SharedMemory(create=True, size=max(total, 1))
+        for nombre, grupo in arrays.items():
+            for array, (inicio, forma, tipo) in zip(grupo, posiciones[nombre]):
+                destino = np.ndarray(forma, dtype=tipo, buffer=memoria.buf, offset=inicio)
+                destino[...] = array
+        
+        return cls(memoria, {'nombre': memoria.name, 'mallas': posiciones})
+    
+    @classmethod
+    def adjuntar(cls, descriptor):
+        """
+        Abre un bloque creado por otro proceso
+        
+        Args:
+            descriptor: Atributo `descriptor` de la GeometriaCompartida original
+        """
+        # Los trabajadores comparten el resource tracker del proceso principal,
+        # que es el único que destruye el bloque (ver liberar)
+        return cls(shared_memory.SharedMemory(name=descriptor['nombre']), descriptor)
+    
+    def mallas(self):
+        """Retorna un diccionario nombre -> Malla con vistas sobre el bloque"""
+        resultado = {}
+        for nombre, posiciones in self.descriptor['mallas'].items():
+            vertices, caras, normales = (
+                np.ndarray(forma, dtype=tipo, buffer=self.memoria.buf, offset=inicio)
+                for inicio, forma, tipo in posiciones)
+            resultado[nombre] = Malla(vertices, caras, normales)
+        return resultado
+    
+    def liberar(self):
+        """Cierra y destruye el bloque (solo en el proceso que lo creó)"""
+        self.memoria.close()
+        self.memoria.unlink()
+
+
+# ========== ESCENA ==========
+
+class EscenaLote:
+    """Escena de la llanta (piso + componentes) para el rasterizador por software"""
+    
+    def __init__(self, mallas, piso):
+        """
+        Args:
+            mallas: Diccionario nombre -> Malla con los componentes de COMPONENTES_LLANTA
+            piso: Malla del piso
+        """
+        self.mallas = mallas
+        self.piso = piso
+        
+        self.raiz = NodoEscena('escena')
+        self.nodo_piso = self.raiz.agregar_hijo(NodoEscena('piso'))
+        self.nodo_llanta = self.raiz.agregar_hijo(NodoEscena('llanta'))
+        self.nodos = {nombre: self.nodo_llanta.agregar_hijo(NodoEscena(nombre))
+                      for nombre in mallas}
+    
+    def renderizar(self, rasterizador, angulo_x, angulo_y, zoom, angulo_llanta,
+                   tema='oscuro', compuesto='soft', modo_luz='normal', color_luz='blanca',
+                   con_piso=True):
+        """
+        Renderiza un cuadro con la misma cámara, luces y materiales que main.py
+        
+        Args:
+            rasterizador: Rasterizador donde dibujar
+            angulo_x, angulo_y, zoom: Cámara orbital (ver rasterizador.matriz_vista)
+            angulo_llanta: Giro de la llanta en grados
+            tema: Nombre del tema (fondo y piso)
+            compuesto: Compuesto Pirelli de la banda ('soft', 'medium', 'hard')
+            modo_luz: 'normal', 'linterna' o 'garage' (ver lighting.luces_escena)
+            color_luz: Nombre del color de la luz principal
+            con_piso: Si es False no se dibuja el piso
+        
+        Returns:
+            Imagen uint8 (alto, ancho, 3)
+        """
+        tema_config = get_tema(tema)
+        camara_pos = (matriz_rotacion_y(-angulo_y) @ matriz_rotacion_x(-angulo_x)
+                      @ np.array([0.0, 0.0, -zoom, 1.0]))[:3]
+        luces, luz_ambiente = luces_escena(modo_luz, camara_pos, get_color_luz(color_luz))
+        
+        self.nodo_llanta.establecer_local(matriz_rotacion_z(angulo_llanta))
+        rasterizador.establecer_vista(matriz_vista(angulo_x, angulo_y, zoom))
+        rasterizador.limpiar(tema_config['fondo'])
+        
+        if con_piso:
+            self._dibujar(rasterizador, self.nodo_piso, self.piso, tema_config['piso'],
+                          luces, luz_ambiente, camara_pos)
+        
+        # Ojo en el espacio de la llanta para el back-face culling
+        ojo = (np.linalg.inv(self.nodo_llanta.mundo) @ np.append(camara_pos, 1.0))[:3]
+        for nombre, _, _, material, *_ in COMPONENTES_LLANTA:
+            if nombre == 'banda':
+                material = get_material_neumatico(compuesto)
+            self._dibujar(rasterizador, self.nodos[nombre], self.mallas[nombre], material,
+                          luces, luz_ambiente, camara_pos, ojo)
+        
+        return rasterizador.imagen()
+    
+    def _dibujar(self, rasterizador, nodo, malla, material, luces, luz_ambiente, camara_pos, ojo=None):
+        """Sombrea una malla en espacio de mundo y la rasteriza"""
+        centroides, normales = nodo.datos_sombreado(malla)
+        caras = malla.caras
+        if ojo is not None and malla.orientacion != 0:
+            indices = np.flatnonzero(mascara_caras_frontales(malla.centroides, malla.normales,
+                                                             ojo, malla.orientacion))
+            caras, centroides, normales = caras[indices], centroides[indices], normales[indices]
+        
+        colores = sombrear_luces(centroides, normales, material, luces, camara_pos,
+                                 luz_ambiente, nodo.esfera_mundo(malla))
+        rasterizador.dibujar_malla(malla, colores, nodo.mundo, caras)
+
+
+# ========== TRABAJADORES ==========
+
+# Estado de cada proceso trabajador (se arma una vez en _iniciar_trabajador)
+_trabajador = {}
+
+
+def _iniciar_trabajador(descriptor, ancho, alto, opciones):
+    """Abre la geometría compartida y prepara la escena y el rasterizador del proceso"""
+    compartida = GeometriaCompartida.adjuntar(descriptor)
+    mallas = compartida.mallas()
+    piso = mallas.pop('piso')
+    _trabajador['compartida'] = compartida  # Mantiene abierto el bloque
+    _trabajador['escena'] = EscenaLote(mallas, piso)
+    _trabajador['rasterizador'] = Rasterizador(ancho, alto)
+    _trabajador['opciones'] = opciones
+
+
+def _renderizar_trabajo(trabajo):
+    """Renderiza y guarda un cuadro; retorna (ruta, triángulos, segundos)"""
+    inicio = time.perf_counter()
+    rasterizador = _trabajador['rasterizador']
+    imagen = _trabajador['escena'].renderizar(
+        rasterizador, trabajo['angulo_x'], trabajo['angulo_y'], trabajo['zoom'],
+        trabajo['angulo_llanta'], trabajo['tema'], trabajo['compuesto'], **_trabajador['opciones'])
+    guardar_png(trabajo['ruta'], imagen)
+    return trabajo['ruta'], rasterizador.triangulos_dibujados, time.perf_counter() - inicio
+
+
+# ========== PLAN DE CUADROS ==========
+
+def interpolar_camara(claves, t):
+    """
+    Interpola linealmente un recorrido de cámara
+    
+    Args:
+        claves: Lista de (angulo_x, angulo_y, zoom), repartidas uniformemente en [0, 1]
+        t: Posición en el recorrido, de 0 a 1
+    
+    Returns:
+        Tupla (angulo_x, angulo_y, zoom)
+    """
+    claves = np.asarray(claves, dtype=np.float64).reshape(-1, 3)
+    if len(claves) == 1:
+        return tuple(claves[0])
+    posicion = np.clip(t, 0.0, 1.0) * (len(claves) - 1)
+    i = min(int(posicion), len(claves) - 2)
+    f = posicion - i
+    return tuple(claves[i] * (1.0 - f) + claves[i + 1] * f)
+
+
+def planificar_cuadros(salida, temas, compuestos, camaras, angulos_llanta):
+    """
+    Arma la lista de trabajos: cada combinación tema x compuesto recorre
+    todos los cuadros y se guarda en su propia carpeta
+    
+    Args:
+        salida: Carpeta base de salida
+        temas: Nombres de temas (claves de TEMAS)
+        compuestos: Compuestos Pirelli
+        camaras: Claves del recorrido de cámara (ver interpolar_camara)
+        angulos_llanta: Giro de la llanta en cada cuadro
+    
+    Returns:
+        Lista de diccionarios con los parámetros de cada cuadro
+    """
+    trabajos = []
+    n = len(angulos_llanta)
+    for tema in temas:
+        for compuesto in compuestos:
+            carpeta = os.path.join(salida, f"{tema}_{compuesto}")
+            os.makedirs(carpeta, exist_ok=True)
+            for i, angulo_llanta in enumerate(angulos_llanta):
+                angulo_x, angulo_y, zoom = interpolar_camara(camaras, i / max(n - 1, 1))
+                trabajos.append({
+                    'ruta': os.path.join(carpeta, f"cuadro_{i:04d}.png"),
+                    'tema': tema, 'compuesto': compuesto,
+                    'angulo_x': angulo_x, 'angulo_y': angulo_y, 'zoom': zoom,
+                    'angulo_llanta': float(angulo_llanta),
+                })
+    return trabajos
+
+
+# ========== LÍNEA DE COMANDOS ==========
+
+def _argumentos():
+    parser = argparse.ArgumentParser(description="Render por lotes de la llanta F1 (sin ventana)")
+    parser.add_argument('--salida', default='renders', help="Carpeta de salida")
+    parser.add_argument('--temas', nargs='+', default=['oscuro'], choices=list(TEMAS))
+    parser.add_argument('--compuestos', nargs='+', default=['soft'], choices=list(MATERIALES_PIRELLI))
+    parser.add_argument('--camara', nargs=3, type=float, action='append', metavar=('ANG_X', 'ANG_Y', 'ZOOM'),
+                        help="Clave del recorrido de cámara (se puede repetir); por defecto 20 45 -20")
+    parser.add_argument('--cuadros', type=int, default=36, help="Cuadros por combinación")
+    parser.add_argument('--vueltas', type=float, default=1.0, help="Vueltas de la llanta en el turntable")
+    parser.add_argument('--angulos', nargs='+', type=float,
+                        help="Ángulos de giro de la llanta explícitos (reemplaza --cuadros/--vueltas)")
+    parser.add_argument('--luz', default='normal', choices=['normal', 'linterna', 'garage'])
+    parser.add_argument('--color-luz', default='blanca', choices=list(COLORES_LUZ))
+    parser.add_argument('--sin-piso', action='store_true', help="No dibujar el piso")
+    parser.add_argument('--detalle', type=float, default=1.0, help="Factor de teselación (ver lod.py)")
+    parser.add_argument('--ancho', type=int, default=ANCHO_DEFECTO)
+    parser.add_argument('--alto', type=int, default=ALTO_DEFECTO)
+    parser.add_argument('--procesos', type=int, default=os.cpu_count(),
+                        help="Procesos trabajadores (por defecto uno por núcleo)")
+    return parser.parse_args()
+
+
+def main():
+    args = _argumentos()
+    camaras = args.camara or [[20.0, 45.0, -20.0]]
+    if args.angulos:
+        angulos_llanta = args.angulos
+    else:
+        angulos_llanta = [360.0 * args.vueltas * i / args.cuadros for i in range(args.cuadros)]
+    
+    print("🔧 Generando geometría...")
+    mallas = construir_mallas(CacheGeometria(), matriz_rotacion_x(90), args.detalle)
+    mallas['piso'] = Malla(*generar_piso_array(**PISO))
+    compartida = GeometriaCompartida.crear(mallas)
+    print(f"🧩 {sum(m.num_caras for m in mallas.values())} triángulos en memoria compartida "
+          f"({compartida.memoria.size / 1e6:.1f} MB)")
+    
+    trabajos = planificar_cuadros(args.salida, args.temas, args.compuestos, camaras, angulos_llanta)
+    opciones = {'modo_luz': args.luz, 'color_luz': args.color_luz, 'con_piso': not args.sin_piso}
+    
+    print(f"🎬 {len(trabajos)} cuadros de {args.ancho}x{args.alto} con {args.procesos} procesos")
+    inicio = time.perf_counter()
+    try:
+        with ProcessPoolExecutor(max_workers=args.procesos, initializer=_iniciar_trabajador,
+                                 initargs=(compartida.descriptor, args.ancho, args.alto, opciones)) as pool:
+            futuros = [pool.submit(_renderizar_trabajo, trabajo) for trabajo in trabajos]
+            for hechos, futuro in enumerate(as_completed(futuros), 1):
+                ruta, triangulos, segundos = futuro.result()
+                print(f"   [{hechos}/{len(trabajos)}] {ruta} ({triangulos} triángulos, {segundos:.2f} s)")
+    finally:
+        compartida.liberar()
+    
+    total = time.perf_counter() - inicio
+    print(f"✅ {len(trabajos)} cuadros en {total:.1f} s ({len(trabajos) / total:.2f} cuadros/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,115 +4,451 @@ Funciones de renderizado OpenGL
 Versión 5.1: Agregado soporte para spotlight
 """
 
+import ctypes
 import numpy as np
 from OpenGL.GL import *
-from lighting import phong_shading, spotlight_shading
+from lighting import sombrear_luces, combinar_terminos, CacheSombreado
+from geometry import mascara_caras_frontales, extraer_aristas
+from clipping import planos_frustum
+from perfilador import PERFILADOR
 
 
-def dibujar_malla_phong(vertices, caras, normales, material, luz_pos, camara_pos, 
-                       luz_color=None, luz_ambiente=None):
+# ========== BACKENDS DE ENVÍO A OPENGL ==========
+
+BACKEND_BUFFERS = 'buffers'      # Vertex arrays / VBOs con glDrawArrays/glDrawElements
+BACKEND_INMEDIATO = 'inmediato'  # glBegin/glEnd (fallback)
+
+_backend_actual = BACKEND_BUFFERS
+
+
+def establecer_backend(nombre):
     """
-    Dibuja una malla 3D con iluminación Phong
+    Selecciona cómo se envían las mallas a OpenGL
     
     Args:
-        vertices: Lista de vértices
-        caras: Lista de caras (triángulos)
-        normales: Lista de normales (una por cara)
-        material: Material de la malla
-        luz_pos: Posición de la luz
-        camara_pos: Posición de la cámara
-        luz_color: Color de la luz (opcional)
-        luz_ambiente: Color de luz ambiental (opcional)
+        nombre: BACKEND_BUFFERS o BACKEND_INMEDIATO
     """
-    if luz_color is None:
-        luz_color = np.array([1.0, 1.0, 1.0])
-    if luz_ambiente is None:
-        luz_ambiente = np.array([0.4, 0.4, 0.4])
+    global _backend_actual
+    if nombre not in (BACKEND_BUFFERS, BACKEND_INMEDIATO):
+        raise ValueError(f"Backend de render desconocido: {nombre}")
+    _backend_actual = nombre
+
+
+def get_backend():
+    """Retorna el backend de render activo"""
+    return _backend_actual
+
+
+class BufferMalla:
+    """
+    Buffers de OpenGL (VBOs) de una malla
     
-    glDisable(GL_LIGHTING)
-    glBegin(GL_TRIANGLES)
+    Guarda posiciones expandidas por cara con su color (para dibujar con
+    sombreado plano mediante glDrawArrays) y los índices de las aristas
+    únicas del wireframe (GL_LINES con glDrawElements). Cada array solo se vuelve a subir a la GPU
+    cuando cambia: la geometría se compara por identidad y por la versión
+    de su Malla (el clipping produce arrays nuevos, y Malla.actualizar
+    incrementa la versión aunque reciba los mismos arrays modificados) y
+    los colores por contenido.
     
-    for i, cara in enumerate(caras):
-        v1 = np.array(vertices[cara[0]])
-        v2 = np.array(vertices[cara[1]])
-        v3 = np.array(vertices[cara[2]])
-        centro = (v1 + v2 + v3) / 3.0
+    Si el contexto no soporta VBOs se usan vertex arrays del lado del
+    cliente con los mismos arrays.
+    """
+    
+    def __init__(self):
+        self._vbos = {}  # slot -> VBO; solo se crean los que se suben
+        self._usar_vbo = True
         
-        color = phong_shading(centro, normales[i], material, luz_pos, camara_pos,
-                             luz_color, luz_ambiente)
-        glColor3fv(color)
+        self._fuente_triangulos = None
+        self._posiciones = None
+        self._colores = None
         
-        for vertice_idx in cara:
-            glVertex3fv(vertices[vertice_idx])
+        self._fuente_lineas = None
+        self._vertices_lineas = None
+        self._indices_lineas = None
     
-    glEnd()
+    def _asegurar_vbo(self, slot):
+        if slot not in self._vbos and self._usar_vbo:
+            try:
+                self._vbos[slot] = int(np.atleast_1d(glGenBuffers(1))[0])
+            except Exception:
+                self._usar_vbo = False
+        return self._usar_vbo
+    
+    def _subir(self, slot, objetivo, datos):
+        if self._asegurar_vbo(slot):
+            glBindBuffer(objetivo, self._vbos[slot])
+            glBufferData(objetivo, datos.nbytes, datos, GL_STATIC_DRAW)
+            glBindBuffer(objetivo, 0)
+            PERFILADOR.contar('gl_llamadas', 3)
+            PERFILADOR.contar('gl_subidas')
+    
+    def cargar_triangulos(self, vertices, caras, colores, version=None):
+        """
+        Prepara posiciones y colores por vértice de cara; solo re-sube lo que cambió
+        
+        Args:
+            vertices: Array (N,3) de vértices
+            caras: Array (M,3) de caras
+            colores: Array (M,3) con el color de cada cara
+            version: Versión de la Malla de origen (opcional)
+        """
+        if self._fuente_triangulos is None or \
+                self._fuente_triangulos[0] is not vertices or \
+                self._fuente_triangulos[1] is not caras or \
+                self._fuente_triangulos[2] != version:
+            caras_array = np.asarray(caras, dtype=np.int32).reshape(-1, 3)
+            self._posiciones = np.ascontiguousarray(
+                np.asarray(vertices, dtype=np.float32)[caras_array].reshape(-1, 3))
+            self._fuente_triangulos = (vertices, caras, version)
+            self._subir(0, GL_ARRAY_BUFFER, self._posiciones)
+            self._colores = None
+        
+        colores = np.asarray(colores, dtype=np.float32)
+        if self._colores is None or self._colores.shape[0] != colores.shape[0] * 3 or \
+                not np.array_equal(self._colores[::3], colores):
+            self._colores = np.ascontiguousarray(np.repeat(colores, 3, axis=0))
+            self._subir(1, GL_ARRAY_BUFFER, self._colores)
+    
+    def cargar_lineas(self, vertices, aristas, version=None):
+        """
+        Prepara vértices e índices de aristas para GL_LINES
+        
+        Args:
+            vertices: Array (N,3) de vértices
+            aristas: Array (E,2) de aristas (ver geometry.extraer_aristas)
+            version: Versión de la Malla de origen (opcional)
+        """
+        if self._fuente_lineas is not None and \
+                self._fuente_lineas[0] is vertices and self._fuente_lineas[1] is aristas and \
+                self._fuente_lineas[2] == version:
+            return
+        
+        self._vertices_lineas = np.ascontiguousarray(vertices, dtype=np.float32)
+        self._indices_lineas = np.ascontiguousarray(np.asarray(aristas, dtype=np.uint32).reshape(-1))
+        self._fuente_lineas = (vertices, aristas, version)
+        self._subir(2, GL_ARRAY_BUFFER, self._vertices_lineas)
+        self._subir(3, GL_ELEMENT_ARRAY_BUFFER, self._indices_lineas)
+    
+    def dibujar_triangulos(self):
+        """Dibuja los triángulos cargados con una sola llamada glDrawArrays"""
+        if self._posiciones is None or len(self._posiciones) == 0:
+            return
+        
+        glEnableClientState(GL_VERTEX_ARRAY)
+        glEnableClientState(GL_COLOR_ARRAY)
+        if self._usar_vbo:
+            glBindBuffer(GL_ARRAY_BUFFER, self._vbos[0])
+            glVertexPointer(3, GL_FLOAT, 0, ctypes.c_void_p(0))
+            glBindBuffer(GL_ARRAY_BUFFER, self._vbos[1])
+            glColorPointer(3, GL_FLOAT, 0, ctypes.c_void_p(0))
+            glBindBuffer(GL_ARRAY_BUFFER, 0)
+        else:
+            glVertexPointer(3, GL_FLOAT, 0, self._posiciones)
+            glColorPointer(3, GL_FLOAT, 0, self._colores)
+        
+        glDrawArrays(GL_TRIANGLES, 0, len(self._posiciones))
+        
+        glDisableClientState(GL_COLOR_ARRAY)
+        glDisableClientState(GL_VERTEX_ARRAY)
+        PERFILADOR.contar('gl_llamadas', 10 if self._usar_vbo else 7)
+        PERFILADOR.contar('gl_dibujos')
+    
+    def dibujar_lineas(self):
+        """Dibuja las aristas cargadas con una sola llamada glDrawElements"""
+        if self._indices_lineas is None or len(self._indices_lineas) == 0:
+            return
+        
+        glEnableClientState(GL_VERTEX_ARRAY)
+        if self._usar_vbo:
+            glBindBuffer(GL_ARRAY_BUFFER, self._vbos[2])
+            glVertexPointer(3, GL_FLOAT, 0, ctypes.c_void_p(0))
+            glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, self._vbos[3])
+            glDrawElements(GL_LINES, len(self._indices_lineas), GL_UNSIGNED_INT,
+                           ctypes.c_void_p(0))
+            glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, 0)
+            glBindBuffer(GL_ARRAY_BUFFER, 0)
+        else:
+            glVertexPointer(3, GL_FLOAT, 0, self._vertices_lineas)
+            glDrawElements(GL_LINES, len(self._indices_lineas), GL_UNSIGNED_INT,
+                           self._indices_lineas)
+        glDisableClientState(GL_VERTEX_ARRAY)
+        PERFILADOR.contar('gl_llamadas', 8 if self._usar_vbo else 4)
+        PERFILADOR.contar('gl_dibujos')
+    
+    def liberar(self):
+        """Libera los VBOs de la GPU"""
+        if self._vbos:
+            glDeleteBuffers(len(self._vbos), list(self._vbos.values()))
+            self._vbos = {}
+
+
+# Buffers persistentes por malla (clave -> BufferMalla)
+_buffers = {}
+
+
+def _obtener_buffer(clave):
+    """Retorna el BufferMalla asociado a una clave (uno temporal si clave es None)"""
+    if clave is None:
+        buffer = BufferMalla()
+        buffer._usar_vbo = False
+        return buffer
+    if clave not in _buffers:
+        _buffers[clave] = BufferMalla()
+    return _buffers[clave]
 
 
-def dibujar_malla_spotlight(vertices, caras, normales, material, luz_pos, luz_dir, 
-                           camara_pos, luz_color=None, luz_ambiente=None, 
-                           apertura=20.0, suavizado=5.0):
+def liberar_buffers():
+    """Libera todos los buffers persistentes (llamar antes de cerrar el contexto)"""
+    for buffer in _buffers.values():
+        buffer.liberar()
+    _buffers.clear()
+    _cache_sombreado.limpiar()
+
+
+def _enviar_triangulos(vertices, caras, colores, clave=None, version=None):
     """
-    🔦 NUEVO: Dibuja una malla 3D con iluminación tipo spotlight/linterna
+    Envía una malla con un color por cara usando el backend activo
     
     Args:
-        vertices: Lista de vértices
-        caras: Lista de caras (triángulos)
-        normales: Lista de normales (una por cara)
-        material: Material de la malla
-        luz_pos: Posición de la luz
-        luz_dir: Dirección del spotlight
-        camara_pos: Posición de la cámara
-        luz_color: Color de la luz (opcional)
-        luz_ambiente: Color de luz ambiental (opcional)
-        apertura: Ángulo del cono del spotlight
-        suavizado: Suavizado del borde
+        vertices: Vértices de la malla
+        caras: Caras (triángulos)
+        colores: Array (M,3) con el color de cada cara
+        clave: Identificador para reutilizar buffers entre frames
+        version: Versión de la Malla de origen (ver BufferMalla)
     """
-    if luz_color is None:
-        luz_color = np.array([1.0, 1.0, 1.0])
-    if luz_ambiente is None:
-        luz_ambiente = np.array([0.2, 0.2, 0.2])  # Más oscuro para spotlight
-    
     glDisable(GL_LIGHTING)
-    glBegin(GL_TRIANGLES)
+    PERFILADOR.contar('gl_llamadas')
+    
+    if _backend_actual == BACKEND_BUFFERS:
+        buffer = _obtener_buffer(clave)
+        buffer.cargar_triangulos(vertices, caras, colores, version)
+        buffer.dibujar_triangulos()
+        return
     
+    glBegin(GL_TRIANGLES)
     for i, cara in enumerate(caras):
-        v1 = np.array(vertices[cara[0]])
-        v2 = np.array(vertices[cara[1]])
-        v3 = np.array(vertices[cara[2]])
-        centro = (v1 + v2 + v3) / 3.0
-        
-        color = spotlight_shading(centro, normales[i], material, luz_pos, luz_dir,
-                                 camara_pos, luz_color, luz_ambiente, 
-                                 apertura, suavizado)
-        glColor3fv(color)
-        
+        glColor3fv(colores[i])
         for vertice_idx in cara:
             glVertex3fv(vertices[vertice_idx])
-    
     glEnd()
+    PERFILADOR.contar('gl_llamadas', 2 + 4 * len(caras))
+    PERFILADOR.contar('gl_dibujos')
+
+
+# ========== DIBUJO DE MALLAS ==========
 
+# Aristas únicas por clave de malla (para dibujar_wireframe con arrays sueltos)
+_aristas_wireframe = {}
 
-def dibujar_wireframe(vertices, caras, color, grosor=1.5):
+
+def dibujar_wireframe(vertices, caras, color, grosor=1.5, clave=None, aristas=None, version=None):
     """
     Dibuja la malla en modo wireframe (solo aristas)
     
+    Cada arista compartida se dibuja una sola vez, en un único lote GL_LINES.
+    
     Args:
         vertices: Lista de vértices
         caras: Lista de caras
         color: Color RGB del wireframe
         grosor: Grosor de las líneas
+        clave: Identificador de la malla para reutilizar sus buffers (opcional)
+        aristas: Aristas (E,2) a dibujar; por defecto las aristas únicas de las caras
+        version: Versión de la Malla de origen (ver BufferMalla)
     """
+    if aristas is None:
+        entrada = _aristas_wireframe.get(clave) if clave is not None else None
+        if entrada is not None and entrada[0] is caras:
+            aristas = entrada[1]
+        else:
+            aristas = extraer_aristas(caras)
+            if clave is not None:
+                _aristas_wireframe[clave] = (caras, aristas)
+    
     glDisable(GL_LIGHTING)
     glLineWidth(grosor)
     glColor3fv(color)
     
-    for cara in caras:
-        glBegin(GL_LINE_LOOP)
-        for vertice_idx in cara:
-            glVertex3fv(vertices[vertice_idx])
+    if _backend_actual == BACKEND_BUFFERS:
+        if len(aristas) > 0:
+            buffer = _obtener_buffer(None if clave is None else (clave, 'wireframe'))
+            buffer.cargar_lineas(vertices, aristas, version)
+            buffer.dibujar_lineas()
+    else:
+        glBegin(GL_LINES)
+        for inicio, fin in aristas:
+            glVertex3fv(vertices[inicio])
+            glVertex3fv(vertices[fin])
         glEnd()
+        PERFILADOR.contar('gl_llamadas', 2 + 2 * len(aristas))
+        PERFILADOR.contar('gl_dibujos')
     
     glLineWidth(1.0)
+    PERFILADOR.contar('gl_llamadas', 4)
+
+
+def planos_frustum_actuales():
+    """
+    Planos del frustum en el espacio de los objetos que se dibujan con las
+    matrices de proyección y modelview actuales de OpenGL
+    
+    Returns:
+        Lista de PlanoClipping (ver clipping.planos_frustum)
+    """
+    # OpenGL guarda las matrices por columnas
+    proyeccion = np.array(glGetDoublev(GL_PROJECTION_MATRIX)).reshape(4, 4).T
+    modelview = np.array(glGetDoublev(GL_MODELVIEW_MATRIX)).reshape(4, 4).T
+    return planos_frustum(proyeccion @ modelview)
+
+
+def aplicar_matriz(matriz):
+    """
+    Multiplica la matriz modelview actual por una matriz 4x4 de numpy
+    (p. ej. la matriz de mundo de un NodoEscena)
+    
+    Args:
+        matriz: Matriz 4x4 en convención de vectores columna
+    """
+    # OpenGL espera la matriz por columnas
+    glMultMatrixf(np.ascontiguousarray(np.asarray(matriz).T, dtype=np.float32))
+
+
+def posicion_camara_actual():
+    """
+    Posición de la cámara en el espacio de los objetos que se dibujan con
+    la matriz modelview actual
+    
+    Returns:
+        Array (3,) con la posición del ojo
+    """
+    modelview = np.array(glGetDoublev(GL_MODELVIEW_MATRIX)).reshape(4, 4).T
+    return np.linalg.inv(modelview)[:3, 3]
+
+
+# Caras frontales por clave de malla: se reutilizan mientras la malla, su
+# versión, la posición del ojo y la orientación no cambien
+_caras_frontales = {}
+
+# Términos geométricos del sombreado por clave de malla (ver CacheSombreado)
+_cache_sombreado = CacheSombreado()
+
+
+def _seleccionar_caras_frontales(malla, ojo, orientacion, clave=None):
+    """
+    Back-face culling en CPU
+    
+    Returns:
+        Tupla (caras, indices) con las caras frontales y su posición en malla.caras
+    """
+    ojo = tuple(round(float(c), 4) for c in ojo)
+    entrada = _caras_frontales.get(clave) if clave is not None else None
+    if entrada is not None:
+        malla_origen, version, ojo_origen, orientacion_origen, resultado = entrada
+        if (malla_origen is malla and version == malla.version
+                and ojo_origen == ojo and orientacion_origen == orientacion):
+            return resultado
+    
+    indices = np.flatnonzero(mascara_caras_frontales(malla.centroides, malla.normales,
+                                                     ojo, orientacion))
+    resultado = (np.ascontiguousarray(malla.caras[indices]), indices)
+    if clave is not None:
+        _caras_frontales[clave] = (malla, malla.version, ojo, orientacion, resultado)
+    return resultado
+
+
+def dibujar_malla(malla, material, luces, camara_pos, luz_ambiente=None, clave=None,
+                  ojo=None, orientacion=0, datos_sombreado=None, esfera=None):
+    """
+    Dibuja una Malla sombreada con una lista de luces, usando sus normales
+    y centroides guardados
+    
+    Si la malla se dibuja bajo una transformación (p. ej. un nodo de
+    escena.py), `datos_sombreado` debe traer sus centroides y normales en
+    el mismo espacio que las luces y camara_pos.
+    
+    Si se da la posición del ojo y la orientación de la malla es 1 o -1
+    (ver Malla.orientacion), las caras traseras se descartan antes de
+    sombrear. Para mallas abiertas, o recortadas y vistas por el lado del
+    corte, se debe pasar orientacion=0 para dibujar también el interior.
+    
+    Args:
+        malla: Malla a dibujar
+        material: Material de la malla
+        luces: Lista de Luz (puntuales y/o spotlights), ver lighting.py
+        camara_pos: Posición de la cámara
+        luz_ambiente: Color de luz ambiental (opcional)
+        clave: Identificador de la malla para reutilizar sus buffers y
+               términos de sombreado (opcional)
+        ojo: Posición del ojo en el espacio de la malla para el back-face culling (opcional)
+        orientacion: Orientación de la malla para el back-face culling
+        datos_sombreado: Tupla (centroides, normales) para sombrear (opcional;
+                         por defecto los de la malla, en su espacio local)
+        esfera: Esfera envolvente (centro, radio) en el espacio de datos_sombreado,
+                para descartar los spotlights cuyo cono no la alcanza (opcional;
+                por defecto la de la malla si no se dan datos_sombreado)
+    """
+    if malla.num_caras == 0:
+        return
+    if luz_ambiente is None:
+        luz_ambiente = np.array([0.4, 0.4, 0.4])
+    
+    if datos_sombreado is None:
+        centroides, normales = malla.centroides, malla.normales
+        if esfera is None:
+            esfera = malla.esfera
+    else:
+        centroides, normales = datos_sombreado
+    
+    indices = None
+    if ojo is not None and orientacion != 0:
+        with PERFILADOR.etapa('culling'):
+            caras, indices = _seleccionar_caras_frontales(malla, ojo, orientacion, clave)
+        if len(caras) == 0:
+            return
+    else:
+        caras = malla.caras
+    PERFILADOR.contar('triangulos_dibujados', len(caras))
+    
+    with PERFILADOR.etapa('sombreado'):
+        if clave is None:
+            if indices is not None:
+                centroides, normales = centroides[indices], normales[indices]
+            colores = sombrear_luces(centroides, normales, material, luces, camara_pos,
+                                     luz_ambiente, esfera)
+        else:
+            # Cambiar el color de la luz o el material solo recombina los términos
+            difuso, especular = _cache_sombreado.obtener(clave, centroides, normales, luces,
+                                                         camara_pos, material.shininess, indices,
+                                                         esfera)
+            colores = combinar_terminos(difuso, especular, material, luces, luz_ambiente)
+    
+    with PERFILADOR.etapa('envio_gl'):
+        _enviar_triangulos(malla.vertices, caras, colores, clave, malla.version)
+
+
+def dibujar_wireframe_malla(malla, color, grosor=1.5, clave=None, angulo_contorno=None):
+    """
+    Dibuja las aristas únicas de una Malla
+    
+    Args:
+        malla: Malla a dibujar
+        color: Color RGB del wireframe
+        grosor: Grosor de las líneas
+        clave: Identificador de la malla para reutilizar sus buffers (opcional)
+        angulo_contorno: Si se da, solo se dibujan bordes abiertos y aristas
+                         con ángulo diedro mayor a este valor (modo contorno)
+    """
+    if malla.num_caras == 0:
+        return
+    
+    with PERFILADOR.etapa('wireframe'):
+        if angulo_contorno is None:
+            aristas = malla.aristas
+        else:
+            aristas = malla.aristas_contorno(angulo_contorno)
+        dibujar_wireframe(malla.vertices, malla.caras, color, grosor, clave, aristas=aristas,
+                          version=malla.version)
 
 
 def dibujar_plano_corte(posicion_y, tamano=5.0):
@@ -160,4 +496,29 @@ def dibujar_plano_corte_z(posicion_z, tamano=5.0):
     glEnd()
     
     glDisable(GL_BLEND)
-    glEnable(GL_DEPTH_TEST)
\ No newline at end of file
+    glEnable(GL_DEPTH_TEST)
+
+
+# ========== HUD ==========
+
+def dibujar_hud(pixeles, ancho, alto, x=10, y=10):
+    """
+    Dibuja una imagen RGBA en coordenadas de ventana, encima de la escena
+    
+    Args:
+        pixeles: Bytes RGBA de la imagen, con la fila inferior primero
+        ancho: Ancho de la imagen en píxeles
+        alto: Alto de la imagen en píxeles
+        x: Posición de la esquina inferior izquierda (desde la izquierda)
+        y: Posición de la esquina inferior izquierda (desde abajo)
+    """
+    glDisable(GL_DEPTH_TEST)
+    glDisable(GL_LIGHTING)
+    glEnable(GL_BLEND)
+    glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
+    
+    glWindowPos2d(x, y)
+    glDrawPixels(ancho, alto, GL_RGBA, GL_UNSIGNED_BYTE, pixeles)
+    
+    glDisable(GL_BLEND)
+    glEnable(GL_DEPTH_TEST)
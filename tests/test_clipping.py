@@ -0,0 +1,42 @@
+"""
+Pruebas de clipping.py: la versión por lotes contra la versión por cara
+"""
+
+import numpy as np
+import pytest
+
+from clipping import (PlanoClipping, IndiceIntervalos, recortar_malla_con_plano,
+                      recortar_malla_con_plano_lote)
+from geometry import generar_toroide_array
+from transforms import aplicar_transformacion, matriz_rotacion_x
+
+
+def _triangulos_ordenados(vertices, caras):
+    """Coordenadas de cada triángulo, rotado para empezar en su menor esquina y ordenado"""
+    vertices = np.asarray(vertices, dtype=np.float64).reshape(-1, 3)
+    triangulos = vertices[np.asarray(caras, dtype=np.int64).reshape(-1, 3)]
+    claves = np.round(triangulos, 4)
+    inicio = np.array([min(range(3), key=lambda k: tuple(tri[k])) for tri in claves], dtype=np.int64)
+    filas = np.arange(len(triangulos))
+    rotados = np.stack([triangulos[filas, (inicio + k) % 3] for k in range(3)], axis=1).reshape(-1, 9)
+    return rotados[np.lexsort(np.round(rotados, 4).T[::-1])]
+
+
+@pytest.mark.parametrize('plano', [
+    PlanoClipping(0, 0, 1, 0),    # Pasa por un anillo completo de vértices
+    PlanoClipping(0, 1, 0, 0),    # Pasa por vértices con distancias de ~1e-16
+    PlanoClipping(1, 2, 3, -0.5),
+])
+@pytest.mark.parametrize('con_indice', [False, True])
+def test_lote_igual_a_por_cara_con_plano_por_vertices(plano, con_indice):
+    vertices, caras = generar_toroide_array(2.8, 0.5, 32, 12)
+    vertices = aplicar_transformacion(vertices, matriz_rotacion_x(90))
+    indice = IndiceIntervalos(vertices, caras) if con_indice else None
+    
+    vertices_cara, caras_cara = recortar_malla_con_plano(vertices.tolist(), caras.tolist(), plano)
+    vertices_lote, caras_lote = recortar_malla_con_plano_lote(vertices, caras, plano, indice)
+    
+    assert len(caras_lote) == len(caras_cara)
+    assert len(vertices_lote) == len(vertices_cara)
+    np.testing.assert_allclose(_triangulos_ordenados(vertices_lote, caras_lote),
+                               _triangulos_ordenados(vertices_cara, caras_cara), atol=1e-5)
@@ -0,0 +1,37 @@
+"""
+Pruebas del grafo de escena (escena.py)
+"""
+
+import numpy as np
+import pytest
+
+from escena import NodoEscena
+from geometry import Malla
+from transforms import matriz_traslacion, matriz_rotacion_y
+
+
+def _octaedro():
+    """Octaedro centrado en el origen con las caras en sentido antihorario visto desde afuera"""
+    vertices = np.array([[1, 0, 0], [-1, 0, 0], [0, 1, 0],
+                         [0, -1, 0], [0, 0, 1], [0, 0, -1]], dtype=np.float32)
+    caras = np.array([[0, 2, 4], [2, 1, 4], [1, 3, 4], [3, 0, 4],
+                      [2, 0, 5], [1, 2, 5], [3, 1, 5], [0, 3, 5]], dtype=np.int32)
+    return Malla(vertices, caras)
+
+
+@pytest.mark.parametrize('matriz', [
+    np.diag([-1.0, 1.0, 1.0, 1.0]),
+    np.diag([1.0, -2.0, 1.0, 1.0]),
+    matriz_traslacion(3, -1, 2) @ matriz_rotacion_y(30) @ np.diag([1.0, 1.0, -1.0, 1.0]),
+])
+def test_normales_con_reflejo_apuntan_hacia_afuera(matriz):
+    malla = _octaedro()
+    centroides = malla.centroides
+    assert np.all(np.einsum('ij,ij->i', malla.normales, centroides) > 0)
+    
+    nodo = NodoEscena('espejo', matriz)
+    centroides_mundo, normales_mundo = nodo.datos_sombreado(malla)
+    
+    centro = matriz[:3, 3]
+    hacia_afuera = np.einsum('ij,ij->i', normales_mundo, centroides_mundo - centro)
+    assert np.all(hacia_afuera > 0)
@@ -0,0 +1,39 @@
+"""
+Pruebas de rendering.py que no necesitan contexto de OpenGL: las llamadas a
+GL se reemplazan por funciones que no hacen nada
+"""
+
+import numpy as np
+import pytest
+
+import rendering
+from geometry import generar_toroide_array, extraer_aristas
+
+
+@pytest.fixture
+def gl_nulo(monkeypatch):
+    """Reemplaza las llamadas a GL del modo inmediato y registra los vértices enviados"""
+    enviados = []
+    for nombre in ('glDisable', 'glLineWidth', 'glColor3fv', 'glBegin', 'glEnd'):
+        monkeypatch.setattr(rendering, nombre, lambda *args: None)
+    monkeypatch.setattr(rendering, 'glVertex3fv', enviados.append)
+    monkeypatch.setattr(rendering, '_backend_actual', rendering.BACKEND_INMEDIATO)
+    monkeypatch.setattr(rendering, '_aristas_wireframe', {})
+    return enviados
+
+
+def test_wireframe_con_clave_sin_aristas(gl_nulo):
+    vertices, caras = generar_toroide_array(2.8, 0.5, 8, 4)
+    
+    rendering.dibujar_wireframe(vertices, caras, [1.0, 1.0, 1.0], clave='x')
+    
+    aristas = extraer_aristas(caras)
+    assert len(gl_nulo) == 2 * len(aristas)
+    caras_guardadas, aristas_guardadas = rendering._aristas_wireframe['x']
+    assert caras_guardadas is caras
+    np.testing.assert_array_equal(aristas_guardadas, aristas)
+    
+    # La segunda llamada con las mismas caras reutiliza las aristas guardadas
+    rendering.dibujar_wireframe(vertices, caras, [1.0, 1.0, 1.0], clave='x')
+    assert rendering._aristas_wireframe['x'][1] is aristas_guardadas
+    assert len(gl_nulo) == 4 * len(aristas)
@@ -0,0 +1,44 @@
+"""
+Pruebas de las transformaciones de mallas (transforms.py)
+"""
+
+import numpy as np
+import pytest
+
+from geometry import Malla, calcular_normales_array
+from transforms import transformar_malla, matriz_traslacion, matriz_rotacion_y
+
+
+def _octaedro():
+    """Octaedro centrado en el origen con las caras en sentido antihorario visto desde afuera"""
+    vertices = np.array([[1, 0, 0], [-1, 0, 0], [0, 1, 0],
+                         [0, -1, 0], [0, 0, 1], [0, 0, -1]], dtype=np.float32)
+    caras = np.array([[0, 2, 4], [2, 1, 4], [1, 3, 4], [3, 0, 4],
+                      [2, 0, 5], [1, 2, 5], [3, 1, 5], [0, 3, 5]], dtype=np.int32)
+    return Malla(vertices, caras)
+
+
+@pytest.mark.parametrize('matriz', [
+    matriz_traslacion(3, -1, 2) @ matriz_rotacion_y(30),
+    np.diag([-1.0, 1.0, 1.0, 1.0]),
+    np.diag([1.0, -2.0, 1.0, 1.0]),
+    matriz_traslacion(3, -1, 2) @ matriz_rotacion_y(30) @ np.diag([1.0, 1.0, -1.0, 1.0]),
+])
+def test_transformar_malla(matriz):
+    malla = _octaedro()
+    nueva = transformar_malla(malla, matriz)
+    assert isinstance(nueva, Malla)
+    
+    # Volúmenes envolventes: contienen todos los vértices transformados
+    minimo, maximo = nueva.limites
+    assert np.all(nueva.vertices >= minimo - 1e-5)
+    assert np.all(nueva.vertices <= maximo + 1e-5)
+    centro, radio = nueva.esfera
+    np.testing.assert_allclose(centro, matriz[:3, 3], atol=1e-6)
+    assert np.all(np.linalg.norm(nueva.vertices - centro, axis=1) <= radio + 1e-5)
+    
+    # Normales hacia afuera y coherentes con el sentido de giro de las caras
+    hacia_afuera = np.einsum('ij,ij->i', nueva.normales, nueva.centroides - matriz[:3, 3])
+    assert np.all(hacia_afuera > 0)
+    np.testing.assert_allclose(nueva.normales, calcular_normales_array(nueva.vertices, nueva.caras), atol=1e-5)
+    assert nueva.orientacion == malla.orientacion
@@ -5,6 +5,8 @@ Transformaciones geométricas con matrices y coordenadas homogéneas
 
 import numpy as np
 
+from geometry import Malla
+
 
 def crear_matriz_identidad():
     """
@@ -169,17 +171,97 @@ def de_coordenadas_homogeneas(vertices_h):
         return vertices_array[:, :3] / w
 
 
+def es_afin(matriz):
+    """
+    Indica si una matriz 4x4 es afín (última fila [0, 0, 0, 1]), es decir,
+    si se puede aplicar como R @ v + t sin dividir por w
+    
+    Args:
+        matriz: Matriz 4x4
+    
+    Returns:
+        True si la matriz es afín
+    """
+    fila = np.asarray(matriz)[3]
+    return fila[0] == 0 and fila[1] == 0 and fila[2] == 0 and fila[3] == 1
+
+
+def transformar_vertices(vertices, matriz, out=None):
+    """
+    Aplica una matriz 4x4 a un array de vértices sin salir de numpy
+    
+    Para matrices afines calcula v @ R^T + t directamente (sin columna de
+    unos ni división por w); las matrices proyectivas usan el camino en
+    coordenadas homogéneas.
+    
+    Args:
+        vertices: Array (N,3) de vértices
+        matriz: Matriz de transformación 4x4
+        out: Array (N,3) donde escribir el resultado (opcional; puede ser
+             el mismo array de entrada para transformar en el lugar)
+    
+    Returns:
+        Array (N,3) con el dtype de `out`, o el de la entrada si es flotante
+        (float32 en otro caso)
+    """
+    vertices = np.asarray(vertices)
+    if out is None:
+        dtype = vertices.dtype if np.issubdtype(vertices.dtype, np.floating) else np.float32
+        out = np.empty(vertices.shape, dtype=dtype)
+    
+    matriz = np.asarray(matriz, dtype=np.float64)
+    if es_afin(matriz):
+        lineal = matriz[:3, :3].T.astype(out.dtype)
+        np.matmul(vertices, lineal, out=out)
+        np.add(out, matriz[:3, 3].astype(out.dtype), out=out)
+    else:
+        vertices_h = np.dot(a_coordenadas_homogeneas(vertices), matriz.T)
+        out[...] = de_coordenadas_homogeneas(vertices_h)
+    
+    return out
+
+
+def transformar_normales(normales, matriz, out=None):
+    """
+    Transforma normales con la inversa transpuesta de la parte lineal y
+    las vuelve a normalizar
+    
+    Args:
+        normales: Array (M,3) de normales
+        matriz: Matriz de transformación 4x4 (se usa su bloque 3x3)
+        out: Array (M,3) donde escribir el resultado (opcional)
+    
+    Returns:
+        Array (M,3) de normales unitarias
+    """
+    normales = np.asarray(normales)
+    if out is None:
+        dtype = normales.dtype if np.issubdtype(normales.dtype, np.floating) else np.float32
+        out = np.empty(normales.shape, dtype=dtype)
+    
+    # (M^-T) aplicado a vectores fila es n @ M^-1
+    inversa = np.linalg.inv(np.asarray(matriz, dtype=np.float64)[:3, :3]).astype(out.dtype)
+    np.matmul(normales, inversa, out=out)
+    longitudes = np.linalg.norm(out, axis=1, keepdims=True)
+    np.divide(out, longitudes, out=out, where=longitudes > 0)
+    return out
+
+
 def aplicar_transformacion(vertices, matriz):
     """
     Aplica una matriz de transformación a un conjunto de vértices
     
     Args:
-        vertices: Lista de vértices 3D [[x,y,z], ...]
+        vertices: Lista de vértices 3D [[x,y,z], ...] o array numpy (N,3)
         matriz: Matriz de transformación 4x4
     
     Returns:
-        Lista de vértices transformados
+        Lista de vértices transformados (array del mismo dtype si la
+        entrada ya era un array numpy, ver transformar_vertices)
     """
+    if isinstance(vertices, np.ndarray) and vertices.ndim == 2:
+        return transformar_vertices(vertices, matriz)
+    
     # Convertir a coordenadas homogéneas
     vertices_h = a_coordenadas_homogeneas(vertices)
     
@@ -189,9 +271,53 @@ def aplicar_transformacion(vertices, matriz):
     # Convertir de vuelta a coordenadas 3D
     vertices_transformados = de_coordenadas_homogeneas(vertices_transformados_h)
     
+    if isinstance(vertices, np.ndarray):
+        return np.ascontiguousarray(vertices_transformados, dtype=vertices.dtype)
     return vertices_transformados.tolist()
 
 
+def transformar_malla(malla, matriz):
+    """
+    Aplica una matriz de transformación a una Malla
+    
+    Si la matriz es afín, las normales y los volúmenes envolventes se transforman
+    directamente (la caja a partir de sus 8 esquinas, así que puede quedar
+    algo más holgada que la exacta); si es proyectiva se recalculan bajo
+    demanda a partir de los vértices. Una reflexión invierte el sentido de
+    giro de las caras, así que en ese caso se invierte el orden de sus
+    vértices: las normales (inversa transpuesta) siguen apuntando hacia el
+    mismo lado y coinciden con el nuevo sentido de giro.
+    
+    Args:
+        malla: Malla de origen (no se modifica)
+        matriz: Matriz de transformación 4x4
+    
+    Returns:
+        Nueva Malla con los vértices transformados
+    """
+    matriz = np.asarray(matriz, dtype=np.float64)
+    afin = es_afin(matriz)
+    caras = malla.caras
+    if np.linalg.det(matriz[:3, :3]) < 0:
+        caras = np.ascontiguousarray(caras[:, ::-1])
+    normales = transformar_normales(malla.normales, matriz) if afin else None
+    nueva = Malla(transformar_vertices(malla.vertices, matriz), caras, normales)
+    
+    if afin and malla.num_vertices > 0:
+        minimo, maximo = malla.limites
+        esquinas = np.array([[x, y, z] for x in (minimo[0], maximo[0])
+                                       for y in (minimo[1], maximo[1])
+                                       for z in (minimo[2], maximo[2])], dtype=np.float64)
+        esquinas = esquinas @ matriz[:3, :3].T + matriz[:3, 3]
+        
+        centro, radio = malla.esfera
+        nueva.fijar_volumenes(
+            (esquinas.min(axis=0), esquinas.max(axis=0)),
+            (matriz[:3, :3] @ centro + matriz[:3, 3], radio * np.linalg.norm(matriz[:3, :3], 2)))
+    
+    return nueva
+
+
 def componer_transformaciones(*matrices):
     """
     Compone múltiples matrices de transformación